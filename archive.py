@@ -0,0 +1,338 @@
+"""
+Searchable transcript archive for Duet LLM.
+
+Indexes the markdown logs and JSONL transcripts in logs/ into SQLite: one
+row per run (topic, start time, cast, models) and one per turn (speaker,
+role, model, turn number, text), with an FTS5 full-text index over the
+text. Indexing is incremental: files are re-read only when their size or
+modification time changed, and deleted files drop out of the index.
+
+Usage:
+    python archive.py index                          # (re)index logs/
+    python archive.py search forgeries --persona Jamie
+    python archive.py search '"free will" NOT quantum' --since 2025-01-01 --model mistral
+    python archive.py stats                          # per-persona turns, runs, models
+    python archive.py stats --persona Jamie          # plus their most used words
+"""
+
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+
+from replay import load_any
+from topics import STOPWORDS
+
+WORD = re.compile(r"[a-z0-9']+")
+
+
+class TranscriptArchive:
+    """
+    SQLite/FTS5 index of conversation logs.
+
+    Usage:
+        archive = TranscriptArchive(".cache/archive.sqlite")
+        archive.index(["logs"])
+        rows = archive.search("forgeries", persona="Jamie")
+        archive.close()
+    """
+
+    def __init__(self, path=".cache/archive.sqlite"):
+        """
+        Args:
+            path: SQLite file location
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                topic TEXT NOT NULL,
+                started TEXT NOT NULL,
+                turns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS turns (
+                id INTEGER PRIMARY KEY,
+                run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+                turn INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                speaker TEXT NOT NULL,
+                short TEXT,
+                model TEXT,
+                ts REAL,
+                words INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_turns_run ON turns(run_id, turn);
+            CREATE INDEX IF NOT EXISTS idx_turns_speaker ON turns(speaker);
+            CREATE INDEX IF NOT EXISTS idx_turns_model ON turns(model);
+            CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started);
+            CREATE INDEX IF NOT EXISTS idx_runs_topic ON runs(topic);
+            CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+                text, content='turns', content_rowid='id', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS turns_ai AFTER INSERT ON turns BEGIN
+                INSERT INTO turns_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS turns_ad AFTER DELETE ON turns BEGIN
+                INSERT INTO turns_fts(turns_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+            """
+        )
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.commit()
+
+    @staticmethod
+    def discover(paths):
+        """Log and transcript files under paths (files or directories), skipping derived files."""
+        found = []
+        for path in paths:
+            if os.path.isdir(path):
+                candidates = []
+                for pattern in ("*.md", "*.jsonl", "*.md.gz", "*.jsonl.gz"):  # .gz: rotated segments
+                    candidates += glob.glob(os.path.join(path, "**", pattern), recursive=True)
+            else:
+                candidates = [path]
+            for candidate in candidates:
+                name = os.path.basename(candidate)
+                if name.endswith((".branches.md", ".scores.jsonl")):
+                    continue  # Branch summaries and judge scores are not conversations
+                found.append(os.path.abspath(candidate))
+        # A run with both a log and a transcript is indexed once, from the richer transcript
+        stem = lambda p: os.path.splitext(p.removesuffix(".gz"))[0]
+        is_transcript = lambda p: p.removesuffix(".gz").endswith(".jsonl")
+        transcripts = {stem(p) for p in found if is_transcript(p)}
+        return sorted(p for p in set(found) if is_transcript(p) or stem(p) not in transcripts)
+
+    def index(self, paths, prune=True):
+        """
+        Bring the index up to date with the files under paths.
+
+        Returns {"added", "updated", "unchanged", "removed", "failed"} counts.
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+        known = {row["path"]: row for row in self._conn.execute("SELECT id, path, size, mtime FROM runs")}
+        files = self.discover(paths)
+        with self._conn:  # One transaction: thousands of small commits would dominate the run time
+            for path in files:
+                stat = os.stat(path)
+                row = known.get(path)
+                if row and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+                    counts["unchanged"] += 1
+                    continue
+                try:
+                    transcript = load_any(path)
+                except (OSError, EOFError, ValueError, UnicodeDecodeError) as e:
+                    print(f"[Archive] Skipping unreadable {path} ({type(e).__name__})")
+                    counts["failed"] += 1
+                    continue
+                if row:
+                    self._conn.execute("DELETE FROM runs WHERE id = ?", (row["id"],))
+                self._add(path, stat, transcript)
+                counts["updated" if row else "added"] += 1
+
+            if prune:
+                # Only forget files that were under the indexed paths and are gone now
+                roots = [os.path.abspath(p) for p in paths]
+                current = set(files)
+                for path, row in known.items():
+                    under = any(path == r or path.startswith(r.rstrip(os.sep) + os.sep) for r in roots)
+                    if under and path not in current:
+                        self._conn.execute("DELETE FROM runs WHERE id = ?", (row["id"],))
+                        counts["removed"] += 1
+        return counts
+
+    def _add(self, path, stat, transcript):
+        """Insert one run and its turns (inside the caller's transaction)."""
+        started = transcript.get("started") or datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds")
+        messages = transcript["messages"]
+        cursor = self._conn.execute(
+            "INSERT INTO runs (path, size, mtime, topic, started, turns) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime, transcript["topic"], started, len(messages)),
+        )
+        run_id = cursor.lastrowid
+        models = transcript.get("models", {})
+        self._conn.executemany(
+            "INSERT INTO turns (run_id, turn, role, speaker, short, model, ts, words, text) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (run_id, turn, m["role"], m["speaker"], m.get("short"), models.get(m["role"]), m["ts"],
+                 len(m["text"].split()), m["text"])
+                for turn, m in enumerate(messages, 1)
+            ],
+        )
+
+    @staticmethod
+    def _filters(persona=None, model=None, topic=None, since=None, until=None, role=None):
+        """WHERE clauses and parameters shared by search and stats."""
+        clauses, params = [], []
+        if persona:
+            clauses.append("(t.speaker LIKE ? OR t.short LIKE ?)")
+            params += [f"%{persona}%"] * 2
+        if model:
+            clauses.append("t.model LIKE ?")
+            params.append(f"%{model}%")
+        if topic:
+            clauses.append("r.topic LIKE ?")
+            params.append(f"%{topic}%")
+        if since:
+            clauses.append("r.started >= ?")
+            params.append(since)
+        if until:
+            clauses.append("r.started < ?")
+            params.append(until)
+        if role:
+            clauses.append("t.role = ?")
+            params.append(role)
+        return clauses, params
+
+    def search(self, query, limit=50, **filters):
+        """
+        Turns matching an FTS5 query (words, "phrases", AND/OR/NOT, prefix*), best match first.
+
+        Returns rows with path, started, topic, turn, speaker, model and a highlighted snippet.
+        """
+        clauses, params = self._filters(**filters)
+        where = " AND ".join(["turns_fts MATCH ?"] + clauses)
+        return self._conn.execute(
+            f"""
+            SELECT r.path, r.started, r.topic, t.turn, t.role, t.speaker, t.model,
+                   snippet(turns_fts, 0, '[', ']', '...', 16) AS snippet
+            FROM turns_fts
+            JOIN turns t ON t.id = turns_fts.rowid
+            JOIN runs r ON r.id = t.run_id
+            WHERE {where}
+            ORDER BY bm25(turns_fts), r.started DESC
+            LIMIT ?
+            """,
+            [query] + params + [limit],
+        ).fetchall()
+
+    def persona_stats(self, **filters):
+        """Per speaker: turns, runs, mean words per turn, models used, first and last run."""
+        clauses, params = self._filters(**filters)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return self._conn.execute(
+            f"""
+            SELECT t.speaker, COUNT(*) AS turns, COUNT(DISTINCT t.run_id) AS runs,
+                   AVG(t.words) AS words, GROUP_CONCAT(DISTINCT t.model) AS models,
+                   MIN(r.started) AS first, MAX(r.started) AS last
+            FROM turns t JOIN runs r ON r.id = t.run_id
+            {where}
+            GROUP BY t.speaker
+            ORDER BY turns DESC
+            """,
+            params,
+        ).fetchall()
+
+    def top_words(self, count=15, **filters):
+        """Most used content words in the matching turns."""
+        clauses, params = self._filters(**filters)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        counter = Counter()
+        for (text,) in self._conn.execute(f"SELECT t.text FROM turns t JOIN runs r ON r.id = t.run_id {where}", params):
+            counter.update(w for w in WORD.findall(text.lower()) if w not in STOPWORDS and len(w) > 2)
+        return counter.most_common(count)
+
+    def totals(self):
+        row = self._conn.execute(
+            "SELECT (SELECT COUNT(*) FROM runs) AS runs, (SELECT COUNT(*) FROM turns) AS turns"
+        ).fetchone()
+        return dict(row)
+
+    def close(self):
+        self._conn.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Index Duet LLM logs/transcripts into SQLite and query them.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--db", default=".cache/archive.sqlite", help="Archive database path.")
+    parser.add_argument("--path", action="append", dest="paths", help="Log directory or file to index (repeatable; default: logs).")
+    parser.add_argument("--no-update", action="store_true", help="Query the index as it is, without refreshing it.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("index", help="Bring the index up to date.")
+
+    def add_filters(sub):
+        sub.add_argument("--persona", help="Speaker name or short name (substring).")
+        sub.add_argument("--model", help="Backend, e.g. 'mistral' or 'anthropic:' (substring).")
+        sub.add_argument("--topic", help="Run topic (substring).")
+        sub.add_argument("--role", help="Role: a, b, judge, user, room (other for untagged logs).")
+        sub.add_argument("--since", help="Runs started on or after this date (YYYY-MM-DD).")
+        sub.add_argument("--until", help="Runs started before this date (YYYY-MM-DD).")
+
+    search = commands.add_parser("search", help="Full-text search over turns.")
+    search.add_argument("query", help="FTS5 query: words, \"phrases\", AND/OR/NOT, prefix*.")
+    search.add_argument("--limit", type=int, default=20, help="Maximum results.")
+    add_filters(search)
+
+    stats = commands.add_parser("stats", help="Per-persona statistics.")
+    stats.add_argument("--words", type=int, default=15, help="Top words shown when --persona is given.")
+    add_filters(stats)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.paths = args.paths or ["logs"]
+    archive = TranscriptArchive(args.db)
+    try:
+        if args.command == "index" or not args.no_update:
+            started = time.perf_counter()
+            counts = archive.index(args.paths)
+            changed = counts["added"] + counts["updated"] + counts["removed"]
+            if args.command == "index" or changed:
+                totals = archive.totals()
+                print(
+                    f"Indexed: {counts['added']} added, {counts['updated']} updated, {counts['removed']} removed, "
+                    f"{counts['unchanged']} unchanged, {counts['failed']} failed in {time.perf_counter() - started:.1f}s "
+                    f"({totals['runs']} runs, {totals['turns']} turns in {args.db})"
+                )
+        if args.command == "index":
+            return
+
+        filters = {k: getattr(args, k) for k in ("persona", "model", "topic", "role", "since", "until")}
+        if args.command == "search":
+            try:
+                rows = archive.search(args.query, limit=args.limit, **filters)
+            except sqlite3.OperationalError as e:
+                print(f"Error: bad search query ({e})")
+                return
+            for row in rows:
+                model = f" ({row['model']})" if row["model"] else ""
+                print(f"{row['started'][:16]}  {os.path.relpath(row['path'])} #{row['turn']}  {row['speaker']}{model}")
+                print(f"    {row['snippet']}")
+            print(f"{len(rows)} result{'s' if len(rows) != 1 else ''}")
+
+        elif args.command == "stats":
+            rows = archive.persona_stats(**filters)
+            print(f"{'Speaker':<40} {'Turns':>6} {'Runs':>5} {'Words':>6}  {'First':<10} {'Last':<10}  Models")
+            for row in rows:
+                print(
+                    f"{row['speaker'][:40]:<40} {row['turns']:>6} {row['runs']:>5} {row['words']:>6.1f}  "
+                    f"{row['first'][:10]:<10} {row['last'][:10]:<10}  {row['models'] or '-'}"
+                )
+            if args.persona and rows:
+                words = ", ".join(f"{w} {n}" for w, n in archive.top_words(args.words, **filters))
+                print(f"\nTop words: {words}")
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
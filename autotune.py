@@ -0,0 +1,254 @@
+"""
+Ollama option autotuner for Duet LLM.
+
+Runs a short, reproducible benchmark against the local Ollama for every
+model the roles use. It sweeps num_thread, then num_batch, then num_ctx,
+one option at a time and keeping the best value so far. Each setting gets
+a warm-up request (option changes reload the model) and then --repeats
+timed runs with a fixed seed and temperature 0. Time to first token and
+generation speed come from Ollama's own eval counters.
+
+Settings are ranked by the time a typical short reply takes (first token
+plus --reply-tokens at the measured speed). The winners are written to
+the options profile that duet.py loads at startup (--ollama-profile).
+
+Usage:
+    python autotune.py                                   # --model for every role
+    python autotune.py --roles a=llama3,b=mistral,room=mistral
+    python autotune.py --threads 4,8,16 --contexts 2048,4096 --repeats 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+from duet import DEFAULT_OLLAMA_OPTIONS, ROLE_NAMES, parse_role_map
+from ollama_profile import OptionsProfile
+
+# Smallest context each role gets; the agents' history needs the default window
+ROLE_MIN_CTX = {"room": 1024}
+
+BENCH_SYSTEM = (
+    "You are Dr. Lena Hart, a skeptical physicist in a live two-person debate. "
+    "Keep replies under 20 words, concrete and a little provocative."
+)
+
+BENCH_TURN = (
+    "Mira says consciousness might be a property of all matter, like mass or charge, "
+    "and that our instruments are simply not built to notice it. "
+)
+
+
+def parse_args():
+    cpus = os.cpu_count() or 4
+    threads = sorted({max(1, cpus // 4), max(1, cpus // 2), cpus})
+    parser = argparse.ArgumentParser(
+        description="Benchmark Ollama options per model and write the profile duet.py loads.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--model", default="mistral", help="Model for every role unless --roles overrides it.")
+    parser.add_argument("--roles", help="Per-role models, e.g. 'a=llama3,b=mistral,room=mistral'.")
+    parser.add_argument("--profile", default=".cache/ollama-profile.json", help="Profile file to write.")
+    parser.add_argument(
+        "--threads",
+        default="0," + ",".join(str(t) for t in threads),
+        help="num_thread values to try (0 = Ollama's choice).",
+    )
+    parser.add_argument("--batches", default="0,128,256,512", help="num_batch values to try (0 = Ollama's default).")
+    parser.add_argument("--contexts", default="2048,4096,8192", help="num_ctx values to try.")
+    parser.add_argument("--keep-alive", default="30m", help="How long Ollama keeps each model loaded between turns.")
+    parser.add_argument("--predict", type=int, default=64, help="Tokens generated per timed run.")
+    parser.add_argument("--prompt-turns", type=int, default=12, help="Conversation turns in the benchmark prompt.")
+    parser.add_argument("--repeats", type=int, default=2, help="Timed runs per setting (median is used).")
+    parser.add_argument("--reply-tokens", type=int, default=40, help="Reply length used to rank settings.")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds per request (model loads included).")
+    return parser.parse_args()
+
+
+def parse_values(spec):
+    return [int(v) for v in spec.split(",") if v.strip()]
+
+
+def bench_messages(turns, run):
+    """Fixed prompt shaped like a duet turn; the run number defeats Ollama's prompt-prefix cache."""
+    messages = [{"role": "system", "content": f"[Run {run}] {BENCH_SYSTEM}"}]
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": BENCH_TURN})
+    messages.append({"role": "user", "content": BENCH_TURN + "Respond."})
+    return messages
+
+
+class Bench:
+    """Timed streaming requests against one Ollama endpoint."""
+
+    def __init__(self, url, args):
+        self.url = url
+        self.args = args
+        self.runs = 0
+
+    def request(self, model, options, predict):
+        """One streamed request. Returns (first_token_seconds, tokens_per_second)."""
+        self.runs += 1
+        options = dict(options, seed=42, temperature=0, num_predict=predict)
+        keep_alive = options.pop("keep_alive", None)
+        payload = {
+            "model": model,
+            "messages": bench_messages(self.args.prompt_turns, self.runs),
+            "stream": True,
+            "options": options,
+        }
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        started = time.perf_counter()
+        first = None
+        tokens = 0
+        final = {}
+        with requests.post(self.url, json=payload, timeout=self.args.timeout, stream=True) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("message", {}).get("content"):
+                    tokens += 1
+                    if first is None:
+                        first = time.perf_counter() - started
+                if chunk.get("done"):
+                    final = chunk
+                    break
+        total = time.perf_counter() - started
+        first = first if first is not None else total
+        # Ollama's eval counters exclude network and streaming overhead
+        if final.get("eval_duration") and final.get("eval_count"):
+            speed = final["eval_count"] / (final["eval_duration"] / 1e9)
+        else:
+            speed = tokens / max(total - first, 1e-6)
+        return first, speed
+
+    def measure(self, model, options):
+        """Warm up (loads the model with these options), then time --repeats runs."""
+        self.request(model, options, predict=1)
+        samples = [self.request(model, options, self.args.predict) for _ in range(max(1, self.args.repeats))]
+        first = statistics.median(s[0] for s in samples)
+        speed = statistics.median(s[1] for s in samples)
+        reply = first + self.args.reply_tokens / max(speed, 1e-6)
+        return {"first_token_seconds": round(first, 3), "tokens_per_second": round(speed, 1), "reply_seconds": round(reply, 3)}
+
+
+def describe(options):
+    return " ".join(f"{k}={options[k]}" for k in ("num_thread", "num_batch", "num_ctx") if k in options) or "defaults"
+
+
+def tune_model(bench, model, args):
+    """
+    Coordinate sweep for one model.
+
+    Returns (best_options, best_result, baseline_result, {num_ctx: (options, result)}).
+    """
+    best = {"num_ctx": DEFAULT_OLLAMA_OPTIONS["num_ctx"], "keep_alive": args.keep_alive}
+    baseline = bench.measure(model, best)
+    best_result = baseline
+    print(f"  {describe(best):<40} {baseline['first_token_seconds']:>6.2f}s first token  "
+          f"{baseline['tokens_per_second']:>6.1f} tok/s  {baseline['reply_seconds']:>6.2f}s reply (baseline)")
+
+    by_ctx = {}
+    for key, values in (
+        ("num_thread", parse_values(args.threads)),
+        ("num_batch", parse_values(args.batches)),
+        ("num_ctx", parse_values(args.contexts)),
+    ):
+        stage_best = (best, best_result)
+        for value in values:
+            options = dict(best)
+            if value:
+                options[key] = value
+            else:
+                options.pop(key, None)  # Let Ollama choose
+            if options == best:
+                result = best_result
+            else:
+                result = bench.measure(model, options)
+                print(f"  {describe(options):<40} {result['first_token_seconds']:>6.2f}s first token  "
+                      f"{result['tokens_per_second']:>6.1f} tok/s  {result['reply_seconds']:>6.2f}s reply")
+            if key == "num_ctx":
+                by_ctx[value] = (options, result)
+            if result["reply_seconds"] < stage_best[1]["reply_seconds"]:
+                stage_best = (options, result)
+        if key != "num_ctx":
+            best, best_result = stage_best
+    return best, best_result, baseline, by_ctx
+
+
+def pick_context(by_ctx, min_ctx, fallback):
+    """Fastest swept context that still holds min_ctx tokens."""
+    eligible = [(result["reply_seconds"], ctx, options) for ctx, (options, result) in by_ctx.items() if ctx >= min_ctx]
+    if not eligible:
+        return fallback
+    return min(eligible, key=lambda e: e[0])
+
+
+def main():
+    args = parse_args()
+    url = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/chat")
+
+    try:
+        role_models = parse_role_map(args.roles)
+    except ValueError as e:
+        print(f"Error: --roles: {e}")
+        return
+    models = {role: role_models.get(role, args.model) for role in ROLE_NAMES}
+    models.update(role_models)  # Extra cast members (c, d, ...) may be listed too
+
+    profile = OptionsProfile(args.profile)
+    bench = Bench(url, args)
+    started = time.perf_counter()
+    failed = []
+    for model in dict.fromkeys(models.values()):
+        print(f"Tuning {model} on {url}")
+        try:
+            best, result, baseline, by_ctx = tune_model(bench, model, args)
+        except requests.RequestException as e:
+            print(f"Error: benchmark of {model} failed ({e}); skipping it\n")
+            failed.append(model)
+            continue
+
+        # The model entry keeps the agents' context; smaller-context roles get their own entry
+        default_ctx = DEFAULT_OLLAMA_OPTIONS["num_ctx"]
+        reply, _, model_options = pick_context(by_ctx, default_ctx, (result["reply_seconds"], 0, best))
+        model_result = next((r for o, r in by_ctx.values() if o == model_options), result)
+        profile.set_model(model, model_options, baseline=baseline, **model_result)
+        speedup = baseline["reply_seconds"] / max(model_result["reply_seconds"], 1e-6)
+        print(f"  Best: {describe(model_options)} ({speedup:.2f}x faster replies than the defaults)")
+
+        for role, role_model in models.items():
+            if role_model != model or role not in ROLE_MIN_CTX:
+                continue
+            _, _, role_options = pick_context(by_ctx, ROLE_MIN_CTX[role], (reply, 0, model_options))
+            if role_options != model_options:
+                profile.set_role(role, model, role_options)
+                print(f"  {role}: {describe(role_options)}")
+        print()
+
+    # Models that finished are kept even if others failed: each can take minutes to benchmark
+    if len(failed) < len(dict.fromkeys(models.values())):
+        profile.save(
+            created=datetime.now().isoformat(timespec="seconds"),
+            ollama_url=url,
+            cpu_count=os.cpu_count(),
+        )
+        print(f"Profile saved to: {args.profile} ({bench.runs} requests, {time.perf_counter() - started:.0f}s)")
+    if failed:
+        print(f"Error: {len(failed)} model{'s' if len(failed) != 1 else ''} not tuned: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
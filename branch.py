@@ -0,0 +1,439 @@
+"""
+Conversation branching for Duet LLM.
+
+Forks a saved conversation (a JSONL transcript or markdown log) after any
+reply into K continuations, each with its own changes: a room whisper, a
+different persona for one agent, another model, a sampling temperature or
+seed. The saved replies are reused as history instead of being
+regenerated, so a branch only pays for its new replies. Every branch
+starts from the same history, which is evaluated once up front (Ollama
+keeps it in its prompt cache). The branches then run concurrently.
+
+Each branch is written next to the source as a log and a JSONL transcript
+(history plus continuation, replayable and branchable again). A summary
+file compares the continuations side by side.
+
+Usage:
+    python branch.py logs/run.jsonl --k 3                       # three samples of the same continuation
+    python branch.py logs/run.jsonl --at 12 --turns 8 \\
+        --branch "whisper=What about forgeries?" \\
+        --branch "b=personas/jack.md" \\
+        --branch "model=ollama:llama3;temperature=1.1"
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+
+from conversation import TranscriptStore
+from duet import (
+    AGENT_IDS,
+    DEFAULT_STOP_SEQUENCES,
+    DEFAULT_WORD_BUDGETS,
+    HAS_ANTHROPIC,
+    Colors,
+    RoleChat,
+    agent_color,
+    append_log,
+    append_transcript,
+    build_cast_prompts,
+    chat,
+    clean_response,
+    create_log_file,
+    cwrap,
+    format_pairs,
+    load_persona,
+    opening_prompt,
+    prompt_tokens_estimate,
+    whisper_nudge,
+)
+from interrupts import Interrupted
+from replay import load_any
+from topics import similarity, topic_words
+from usage import UsageMeter
+
+# Branch spec keys besides agent ids (a=personas/x.md swaps that agent's persona)
+BRANCH_KEYS = ("whisper", "model", "temperature", "seed")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Fork a saved Duet LLM conversation into parallel continuations.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("source", help="JSONL transcript (--transcript) or markdown log to branch from.")
+    parser.add_argument("--at", type=int, default=0, help="Fork after this many agent replies (0 = at the end).")
+    parser.add_argument("--turns", type=int, default=6, help="Replies generated per branch.")
+    parser.add_argument(
+        "--branch",
+        action="append",
+        default=[],
+        metavar="SPEC",
+        help="One branch per flag: ';'-separated KEY=VALUE changes, with keys whisper, model (PROVIDER:MODEL), "
+             "temperature, seed, or an agent id with a persona file (b=personas/jack.md).",
+    )
+    parser.add_argument("--k", type=int, default=3, help="Unchanged branches to sample when no --branch is given.")
+    parser.add_argument("--agentA", default="personas/agent_a.md", help="Persona file of agent a in the source.")
+    parser.add_argument("--agentB", default="personas/agent_b.md", help="Persona file of agent b in the source.")
+    parser.add_argument("--cast", nargs="+", metavar="PERSONA", help="Persona files of a group conversation, in order.")
+    parser.add_argument("--provider", choices=["ollama", "anthropic"], default="ollama", help="Default provider.")
+    parser.add_argument("--model", default="mistral", help="Default Ollama model.")
+    parser.add_argument("--anthropic-model", default="claude-haiku-4-5-20251001", help="Default Anthropic model.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--retries", type=int, default=2, help="Retries after transient errors.")
+    parser.add_argument("--parallel", type=int, default=0, help="Branches running at once (0 = all).")
+    parser.add_argument("--no-prime", action="store_true", help="Skip evaluating the shared history once up front.")
+    parser.add_argument("--no-color", action="store_true", help="Disable colored terminal output.")
+    return parser.parse_args()
+
+
+def parse_branch(spec, agent_ids):
+    """'model=ollama:llama3;whisper=What about coffee?' -> {"model": ..., "whisper": ...}."""
+    changes = {}
+    for item in spec.split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, value = item.partition("=")
+        key, value = key.strip(), value.strip()
+        if not sep or not value:
+            raise ValueError(f"expected KEY=VALUE, got '{item}'")
+        if key == "model":
+            provider, _, model = value.partition(":")
+            if provider not in ("ollama", "anthropic") or not model:
+                raise ValueError("model must look like 'ollama:MODEL' or 'anthropic:MODEL'")
+        elif key == "temperature":
+            value = float(value)
+        elif key == "seed":
+            value = int(value)
+        elif key in agent_ids:
+            if not os.path.exists(value):
+                raise ValueError(f"persona file not found: {value}")
+        elif key not in BRANCH_KEYS:
+            raise ValueError(f"unknown key '{key}' (use {', '.join(BRANCH_KEYS + tuple(agent_ids))})")
+        changes[key] = value
+    return changes
+
+
+def describe(changes):
+    return "; ".join(f"{k}={v}" for k, v in changes.items()) or "unchanged"
+
+
+def shared_history(messages, agent_ids, at):
+    """
+    Replay the source up to the at-th agent reply as store events.
+
+    Returns (events, whisper, last_speaker, replies) where events are
+    ("prompt" | "say", agent_id, text) and whisper is a room whisper given
+    after the last reply (it goes to the first speaker of every branch).
+    Judge and user lines are private in a live run and are left out.
+    """
+    events = [("prompt", "a", None)]  # Opening prompt, filled in per branch (it names the cast)
+    whisper = None
+    last = None
+    replies = 0
+    for msg in messages:
+        if replies >= at:
+            break
+        if msg["role"] == "room":
+            whisper = msg["text"]
+        elif msg["role"] in agent_ids:
+            if whisper:
+                events.append(("prompt", msg["role"], whisper_nudge(whisper)))
+                whisper = None
+            events.append(("say", msg["role"], msg["text"]))
+            last = msg["role"]
+            replies += 1
+    return events, whisper, last, replies
+
+
+class Branch:
+    """One continuation: its cast, backends, transcript store and output files."""
+
+    def __init__(self, number, changes, personas, args, meter, stop=None):
+        self.number = number
+        self.changes = changes
+        self.source_personas = personas  # Who said the shared history
+        self.personas = dict(personas)
+        for agent_id in personas:
+            if agent_id in changes:
+                self.personas[agent_id] = load_persona(changes[agent_id])
+        self.names = {agent_id: p["name"] for agent_id, p in self.personas.items()}
+        self.meter = meter
+        self.stop = stop  # threading.Event shared by all branches; set on Ctrl-C
+        self.replies = []  # (agent_id, text) generated by this branch
+        self.seconds = 0.0
+        self.error = None
+        self.store = None
+        self.system_prompts = {}
+        self.log_path = None
+        self.transcript_path = None
+
+        provider, ollama_model, anthropic_model = args.provider, args.model, args.anthropic_model
+        if "model" in changes:
+            provider, _, model = changes["model"].partition(":")
+            if provider == "anthropic":
+                anthropic_model = model
+            else:
+                ollama_model = model
+        options = {"seed": changes["seed"]} if "seed" in changes else None
+        ollama_url = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/chat")
+        self.roles = {}
+        for agent_id in personas:
+            max_words = DEFAULT_WORD_BUDGETS.get(agent_id, DEFAULT_WORD_BUDGETS["a"])
+            backend = RoleChat(
+                agent_id, provider, ollama_url, ollama_model, anthropic_model,
+                timeout=args.timeout, retries=args.retries, max_words=max_words,
+                stop=DEFAULT_STOP_SEQUENCES, meter=meter, options=options,
+            )
+            backend.temperature = changes.get("temperature")
+            backend.cancel = stop  # Closes an in-flight stream on Ctrl-C
+            self.roles[agent_id] = backend
+
+    @property
+    def label(self):
+        return f"{self.number}: {describe(self.changes)}"
+
+    def seed(self, events, topic):
+        """Build the branch's store from the shared history and its system prompts."""
+        self.system_prompts = build_cast_prompts(self.personas, topic)
+        self.store = TranscriptStore(self.names)
+        agent_ids = list(self.personas)
+        for kind, agent_id, text in events:
+            if kind == "say":
+                self.store.say(agent_id, text)
+            else:
+                self.store.prompt(agent_id, text or opening_prompt(self.names[a] for a in agent_ids[1:]))
+
+
+def open_outputs(branch, base, topic, source, at, events):
+    """Sibling log and transcript holding the shared history, ready for the continuation."""
+    cast = dict(branch.names)
+    models = {agent_id: backend.key for agent_id, backend in branch.roles.items()}
+    branch.log_path = create_log_file(
+        topic, f"{base}.branch{branch.number}.md", {"Cast": format_pairs(cast), "Models": format_pairs(models)}
+    )
+    branch.transcript_path = f"{base}.branch{branch.number}.jsonl"
+    header = {
+        "topic": topic,
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "cast": cast,
+        "models": models,
+        "branched_from": source,
+        "at": at,
+        "changes": branch.changes,
+    }
+    with open(branch.transcript_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header, ensure_ascii=False) + "\n")
+    for kind, agent_id, text in events:
+        if kind == "say":
+            persona = branch.source_personas[agent_id]
+            append_log(branch.log_path, persona["name"], text)
+            append_transcript(branch.transcript_path, agent_id, persona, text)
+    with open(branch.log_path, "a", encoding="utf-8") as f:
+        f.write(f"*Branch {branch.label} (forked after reply {at})*\n\n")
+
+
+def run_branch(branch, order, whisper, turns, print_lock, use_color):
+    """Generate the continuation; errors end the branch without stopping the others."""
+    started = time.perf_counter()
+    try:
+        for i in range(turns):
+            if branch.stop and branch.stop.is_set():
+                break
+            agent_id = order[i % len(order)]
+            if i == 0 and (whisper or branch.changes.get("whisper")):
+                branch.store.prompt(agent_id, whisper_nudge(branch.changes.get("whisper") or whisper))
+            system_prompt = branch.system_prompts[agent_id]
+            reply = branch.roles[agent_id].chat(system_prompt, branch.store.view(agent_id, system_prompt))
+            branch.store.say(agent_id, reply)
+            text = clean_response(reply)
+            branch.replies.append((agent_id, text))
+            persona = branch.personas[agent_id]
+            append_log(branch.log_path, persona["name"], text)
+            append_transcript(branch.transcript_path, agent_id, persona, text)
+            with print_lock:
+                print(cwrap(f"[{branch.number} {persona['short_name']}]:", agent_color(agent_id), use_color), text, "\n")
+    except Interrupted:
+        branch.error = "Ctrl-C"  # The cut-off reply is dropped; the summary says where the branch stopped
+    except Exception as e:
+        branch.error = f"{type(e).__name__}: {e}"
+        with print_lock:
+            print(f"[Branch {branch.number}] stopped after {len(branch.replies)} replies ({branch.error})")
+    branch.seconds = time.perf_counter() - started
+
+
+def prime(branches, first_speaker):
+    """
+    Evaluate the shared history once per Ollama model before the branches fan out,
+    so their first requests find it in the prompt cache instead of all computing it at once.
+    """
+    seen = set()
+    for branch in branches:
+        backend = branch.roles[first_speaker]
+        system_prompt = branch.system_prompts[first_speaker]
+        key = (backend.ollama_url, backend.ollama_model, system_prompt)
+        if backend.provider != "ollama" or key in seen:
+            continue
+        seen.add(key)
+        messages = branch.store.view(first_speaker, system_prompt)
+        started = time.perf_counter()
+        try:
+            chat("ollama", backend.ollama_url, backend.ollama_model, None, system_prompt, messages,
+                 timeout=backend.timeout, max_tokens=1, options=backend.options)
+        except Exception as e:
+            print(f"Warning: priming {backend.ollama_model} failed ({type(e).__name__}), branching anyway")
+            continue
+        print(f"Primed {backend.ollama_model} with the shared history "
+              f"(~{prompt_tokens_estimate(messages)} tokens, {time.perf_counter() - started:.1f}s)")
+
+
+def cell(text):
+    """Text safe for a markdown table cell."""
+    return text.replace("|", "\\|").replace("\n", " ")
+
+
+def write_summary(path, source, topic, at, total, branches, prefix_tokens):
+    """Side-by-side markdown comparison of the branches."""
+    words = {b.number: set().union(*(topic_words(t) for _, t in b.replies)) if b.replies else set() for b in branches}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"# Branches of {os.path.basename(source)}\n\n")
+        f.write(f"- **Topic:** {topic}\n")
+        f.write(f"- **Forked after:** reply {at} of {total}\n")
+        f.write(f"- **Shared history:** ~{prefix_tokens} tokens, {at} replies reused by each of "
+                f"{len(branches)} branches instead of regenerated\n")
+        f.write(f"- **Created:** {datetime.now().isoformat(timespec='seconds')}\n\n")
+
+        f.write("| Branch | Changes | Replies | Words/reply | Tokens in/out | Time | Log |\n")
+        f.write("|--------|---------|---------|-------------|---------------|------|-----|\n")
+        for b in branches:
+            totals = b.meter.totals()
+            mean_words = sum(len(t.split()) for _, t in b.replies) / len(b.replies) if b.replies else 0
+            status = f" (stopped: {b.error})" if b.error else ""
+            f.write(
+                f"| {b.number} | {cell(describe(b.changes))}{cell(status)} | {len(b.replies)} | {mean_words:.1f} | "
+                f"{totals['input_tokens']}/{totals['output_tokens']} | {b.seconds:.1f}s | "
+                f"{os.path.basename(b.log_path)} |\n"
+            )
+
+        if len(branches) > 1:
+            f.write("\n## Overlap\n\nShared content words between continuations (Jaccard, 1.00 = same vocabulary):\n\n")
+            f.write("| | " + " | ".join(str(b.number) for b in branches) + " |\n")
+            f.write("|---" * (len(branches) + 1) + "|\n")
+            for a in branches:
+                row = [f"{similarity(words[a.number], words[b.number]):.2f}" if a is not b else "-" for b in branches]
+                f.write(f"| {a.number} | " + " | ".join(row) + " |\n")
+
+        f.write("\n## Side by side\n\n")
+        f.write("| Reply | " + " | ".join(cell(b.label) for b in branches) + " |\n")
+        f.write("|---" * (len(branches) + 1) + "|\n")
+        for i in range(max((len(b.replies) for b in branches), default=0)):
+            row = []
+            for b in branches:
+                if i < len(b.replies):
+                    agent_id, text = b.replies[i]
+                    row.append(f"**{cell(b.personas[agent_id]['short_name'])}:** {cell(text)}")
+                else:
+                    row.append("")
+            f.write(f"| {at + i + 1} | " + " | ".join(row) + " |\n")
+
+
+def main():
+    args = parse_args()
+    use_color = not args.no_color
+
+    if not os.path.exists(args.source):
+        print(f"Error: transcript not found: {args.source}")
+        return
+    persona_paths = args.cast or [args.agentA, args.agentB]
+    if len(persona_paths) < 2 or len(persona_paths) > len(AGENT_IDS):
+        print(f"Error: --cast needs 2 to {len(AGENT_IDS)} persona files")
+        return
+    for path in persona_paths:
+        if not os.path.exists(path):
+            print(f"Error: Persona file not found: {path}")
+            return
+    agent_ids = list(AGENT_IDS[:len(persona_paths)])
+    personas = {agent_id: load_persona(path) for agent_id, path in zip(agent_ids, persona_paths)}
+
+    try:
+        specs = [parse_branch(spec, agent_ids) for spec in args.branch] or [{} for _ in range(max(1, args.k))]
+    except ValueError as e:
+        print(f"Error: --branch: {e}")
+        return
+    if (args.provider == "anthropic" or any(s.get("model", "").startswith("anthropic:") for s in specs)) \
+            and not HAS_ANTHROPIC:
+        print("Error: anthropic package not installed. Run: pip install anthropic")
+        return
+
+    transcript = load_any(args.source)
+    topic = transcript["topic"] or os.path.basename(args.source)
+    speakers = {}
+    for msg in transcript["messages"]:
+        if msg["role"] in agent_ids:
+            speakers.setdefault(msg["role"], msg["speaker"])
+    total = sum(1 for m in transcript["messages"] if m["role"] in agent_ids)
+    if not total:
+        print(f"Error: no agent replies in {args.source}")
+        return
+    for agent_id, speaker in speakers.items():
+        if speaker != personas[agent_id]["name"]:
+            print(f"Warning: {agent_id} is {speaker} in the source but {personas[agent_id]['name']} here")
+    at = min(args.at or total, total)
+    events, whisper, last, at = shared_history(transcript["messages"], agent_ids, at)
+    start = (agent_ids.index(last) + 1) % len(agent_ids)
+    order = agent_ids[start:] + agent_ids[:start]
+
+    base = os.path.splitext(args.source)[0]
+    branches = []
+    stop = threading.Event()
+    for number, changes in enumerate(specs, 1):
+        branch = Branch(number, changes, personas, args, UsageMeter(), stop)
+        branch.seed(events, topic)
+        open_outputs(branch, base, topic, args.source, at, events)
+        branches.append(branch)
+
+    baseline_view = branches[0].store.view(order[0], branches[0].system_prompts[order[0]])
+    prefix_tokens = prompt_tokens_estimate(baseline_view)
+    print(f"Branching {args.source} after reply {at} of {total} into {len(branches)} continuations "
+          f"of {args.turns} replies (shared history ~{prefix_tokens} tokens)\n")
+    if not args.no_prime:
+        prime(branches, order[0])
+
+    print_lock = threading.Lock()
+    started = time.perf_counter()
+    workers = args.parallel or len(branches)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="branch") as pool:
+        futures = [pool.submit(run_branch, branch, order, whisper, args.turns, print_lock, use_color)
+                   for branch in branches]
+        try:
+            wait(futures)
+        except KeyboardInterrupt:
+            # Close the running streams and drop queued branches; leaving the block waits for the workers
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            print("\n\nStopping (Ctrl-C); writing what the branches have so far.")
+    for branch, future in zip(branches, futures):
+        if future.cancelled():
+            branch.error = "Ctrl-C before it started"
+    elapsed = time.perf_counter() - started
+
+    summary_path = f"{base}.branches.md"
+    write_summary(summary_path, args.source, topic, at, total, branches, prefix_tokens)
+    for branch in branches:
+        with open(branch.log_path, "a", encoding="utf-8") as f:
+            f.write("---\n\nBranch finished.\n")
+            f.write(f"\n- **Usage:** {branch.meter.summary_line()}\n")
+        totals = branch.meter.totals()
+        print(cwrap(f"[Branch {branch.label}]:", Colors.GREEN, use_color),
+              f"{len(branch.replies)} replies, {totals['input_tokens']} in / {totals['output_tokens']} out tokens, "
+              f"{branch.seconds:.1f}s -> {branch.log_path}")
+    print(f"\n{len(branches)} branches in {elapsed:.1f}s. Summary saved to: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Turn cadence controller for Duet LLM (--turn-deadline).
+
+Watches how long each round takes (every agent speaking once, plus any
+interjections and whispers) against a target deadline. When the rolling
+mean runs over, it degrades one step at a time:
+
+1. short_replies      - word budgets scaled down
+2. skip_interjections - inline judge and user interjections skipped
+3. small_model        - every role switched to a smaller fallback model
+4. template_whispers  - room whispers from templates instead of an LLM call
+
+When rounds come in well under the deadline it recovers one step at a
+time. A recovery that is undone straight away doubles the calm stretch
+needed before the next one, so the level does not flap. Steps that do not
+apply (no word budgets, no fallback model, no room persona) are left out. For a live exhibit
+steady pacing matters more than peak quality.
+"""
+
+import zlib
+from collections import deque
+
+STEPS = ("short_replies", "skip_interjections", "small_model", "template_whispers")
+
+STEP_LABELS = {
+    "short_replies": "shorter replies",
+    "skip_interjections": "no judge/user interjections",
+    "small_model": "smaller model",
+    "template_whispers": "template whispers",
+}
+
+WHISPER_TEMPLATES = (
+    "Someone nearby is wondering: {topic}",
+    "A voice in the room drifts over: {topic}",
+    "Did someone just mention {topic}?",
+    "Overheard, half a sentence: {topic}",
+)
+
+
+def template_whisper(topic):
+    """A room whisper without an LLM call (same template for the same topic)."""
+    topic = topic.strip().rstrip(".")
+    return WHISPER_TEMPLATES[zlib.crc32(topic.encode("utf-8")) % len(WHISPER_TEMPLATES)].format(topic=topic)
+
+
+class CadenceController:
+    """
+    Step-wise degradation to hold a per-round deadline.
+
+    Usage:
+        cadence = CadenceController(deadline=12.0, fallback=("ollama", "qwen2.5:0.5b"))
+        change = cadence.observe(round_seconds)  # +1 degraded, -1 recovered, 0 unchanged
+        if change:
+            cadence.apply(backends)
+        if cadence.active("skip_interjections"):
+            ...
+    """
+
+    def __init__(self, deadline, steps=STEPS, window=3, recover_ratio=0.7, short_factor=0.5, fallback=None,
+                 budgets=True):
+        """
+        Args:
+            deadline: Target seconds per round
+            steps: Degradation steps available, in order
+            window: Rounds averaged before degrading (the window restarts after a change)
+            recover_ratio: Recover a step after consecutive rounds under deadline * recover_ratio
+            short_factor: Word budget multiplier for short_replies
+            fallback: (provider, model) for small_model
+            budgets: Whether any role has a word budget (without one short_replies changes nothing)
+        """
+        self.deadline = deadline
+        self.steps = tuple(
+            s for s in steps
+            if (s != "small_model" or fallback) and (s != "short_replies" or budgets)
+        )
+        self.window = window
+        self.recover_ratio = recover_ratio
+        self.short_factor = short_factor
+        self.fallback = fallback
+        self.level = 0
+        self.last_mean = 0.0  # Rolling mean behind the latest decision
+        self.recover_after = window  # Calm rounds needed to recover a step (doubles on flapping)
+        self._samples = deque(maxlen=window)
+        self._calm = 0  # Consecutive rounds under the recovery threshold
+        self._last_change = 0
+        self._saved = {}  # RoleChat -> settings before degradation
+
+        # Stats
+        self.rounds = 0
+        self.over = 0  # Rounds over the deadline
+        self.changes = 0
+        self.max_level = 0
+        self.skipped = 0  # Interjections skipped
+        self.rounds_at = [0] * (len(self.steps) + 1)
+
+    def active(self, step):
+        return step in self.steps[: self.level]
+
+    def mean(self):
+        return sum(self._samples) / len(self._samples) if self._samples else 0.0
+
+    def observe(self, seconds):
+        """Record one round. Returns +1 after degrading a step, -1 after recovering one, else 0."""
+        self.rounds += 1
+        self.rounds_at[self.level] += 1
+        if seconds > self.deadline:
+            self.over += 1
+        self._samples.append(seconds)
+        self._calm = self._calm + 1 if seconds < self.deadline * self.recover_ratio else 0
+        mean = self.mean()
+        change = 0
+        if len(self._samples) >= self.window and mean > self.deadline and self.level < len(self.steps):
+            change = 1
+            if self._last_change < 0:
+                self.recover_after = min(2 * self.recover_after, 8 * self.window)
+        elif self._calm >= self.recover_after and self.level > 0:
+            change = -1
+        if change:
+            self.last_mean = mean
+            self.level += change
+            self.changes += 1
+            self.max_level = max(self.max_level, self.level)
+            self._last_change = change
+            self._samples.clear()  # Judge the new level on its own rounds
+            self._calm = 0
+        return change
+
+    def apply(self, backends):
+        """
+        Bring RoleChat backends in line with the current level (idempotent).
+
+        Word budgets are scaled for short_replies; small_model points every
+        backend at the fallback model and restores the previous one on
+        recovery, unless something else (a budget downgrade) moved it since.
+        """
+        short = self.active("short_replies")
+        small = self.active("small_model")
+        for backend in backends:
+            saved = self._saved.setdefault(backend, {"max_words": backend.max_words, "state": None})
+            if saved["max_words"]:
+                backend.max_words = saved["max_words"]
+                if short:
+                    backend.max_words = max(5, round(saved["max_words"] * self.short_factor))
+            if small and saved["state"] is None:
+                saved["state"] = (backend.provider, backend.ollama_model, backend.anthropic_model, backend.options)
+                backend.downgrade(*self.fallback)
+            elif not small and saved["state"] is not None:
+                if backend.key == ":".join(self.fallback):
+                    backend.provider, backend.ollama_model, backend.anthropic_model, backend.options = saved["state"]
+                saved["state"] = None
+
+    def describe(self):
+        if not self.level:
+            return "full quality"
+        return ", ".join(STEP_LABELS[s] for s in self.steps[: self.level])
+
+    def summary_line(self):
+        spread = " / ".join(f"L{level} {count}" for level, count in enumerate(self.rounds_at) if count)
+        return (
+            f"{self.over}/{self.rounds} rounds over {self.deadline:.1f}s, {self.changes} level changes "
+            f"(max {self.max_level}/{len(self.steps)}), {self.skipped} interjections skipped"
+            + (f", rounds per level: {spread}" if spread else "")
+        )
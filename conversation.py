@@ -0,0 +1,156 @@
+"""
+Shared transcript store and turn scheduling for Duet LLM.
+
+Every utterance, nudge and private prompt is stored once in an append-only
+TranscriptStore. Each participant's chat history (system prompt, its own
+lines as "assistant", everyone else's as "user") is built on demand, so
+memory grows with turns rather than agents x turns.
+"""
+
+import random
+import time
+from collections import namedtuple
+
+# speaker: participant id, or None for the host (prompts and nudges)
+# audience: None = every duet agent, otherwise the one participant id that sees it
+Entry = namedtuple("Entry", ["speaker", "audience", "text", "ts"])
+
+# Appended to every message an agent receives from the others
+# (square brackets get cleaned by clean_response)
+BREVITY_NUDGE = "\n\n[Keep your reply short. One thought only.]"
+
+# Opens a view whose start was trimmed away, so it still begins with a user turn
+# (the Anthropic API rejects a history that opens with the assistant)
+TRIMMED_NOTE = "(The conversation has been going on for a while; earlier lines are omitted.)"
+
+
+class TranscriptStore:
+    """
+    Append-only conversation record shared by all participants.
+
+    Usage:
+        store = TranscriptStore({"a": "Jamie", "b": "Riley"})
+        store.prompt("a", "Start the conversation...")
+        store.say("a", reply)
+        messages = store.view("b", system_prompt_b)
+    """
+
+    def __init__(self, names):
+        """
+        Args:
+            names: Participant id -> display name for the duet agents
+        """
+        self.names = dict(names)
+        self.entries = []
+        self.trimmed = 0  # Entries dropped by trim()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def say(self, speaker, text, private=False):
+        """Record an utterance. Private lines (judge, user persona) are seen only by their speaker."""
+        self.entries.append(Entry(speaker, speaker if private else None, text, time.time()))
+
+    def prompt(self, audience, text):
+        """Record a host prompt or nudge addressed to one participant."""
+        self.entries.append(Entry(None, audience, text, time.time()))
+
+    def recent(self, count):
+        """The last count public utterances as (speaker, text), oldest first."""
+        found = []
+        for entry in reversed(self.entries):
+            if entry.audience is None and entry.speaker is not None:
+                found.append((entry.speaker, entry.text))
+                if len(found) == count:
+                    break
+        return found[::-1]
+
+    def view(self, participant, system_prompt, public=True, nudge=BREVITY_NUDGE):
+        """
+        Build the chat history for one participant.
+
+        Args:
+            participant: Participant id
+            system_prompt: System prompt placed first
+            public: Include the shared conversation (False for judge/user, who only see their prompts)
+            nudge: Appended after each batch of other agents' lines
+        """
+        messages = [{"role": "system", "content": system_prompt}]
+        lines = []  # Other agents' lines since this participant last spoke
+        notes = []  # Prompts/nudges addressed to this participant
+
+        def flush():
+            if not lines and not notes:
+                return
+            if len(self.names) > 2:
+                # With a larger cast, say who said what
+                content = "\n\n".join(f"{self.names.get(s, s)}: {t}" for s, t in lines)
+            else:
+                content = "\n\n".join(t for _, t in lines)
+            if lines:
+                content += nudge
+            for note in notes:
+                content = f"{content}\n\n{note}" if content else note
+            messages.append({"role": "user", "content": content})
+            lines.clear()
+            notes.clear()
+
+        for entry in self.entries:
+            if entry.speaker == participant:
+                flush()
+                messages.append({"role": "assistant", "content": entry.text})
+            elif entry.audience == participant:
+                notes.append(entry.text)
+            elif public and entry.audience is None and entry.speaker is not None:
+                lines.append((entry.speaker, entry.text))
+        flush()
+        if self.trimmed and len(messages) > 1 and messages[1]["role"] == "assistant":
+            messages.insert(1, {"role": "user", "content": TRIMMED_NOTE})
+        return messages
+
+    def trim(self, keep):
+        """Drop all but the last keep entries (for bounded memory on long runs)."""
+        if keep > 0 and len(self.entries) > keep:
+            self.trimmed += len(self.entries) - keep
+            del self.entries[:-keep]
+
+
+class TurnScheduler:
+    """
+    Decides who speaks next in an N-agent conversation.
+
+    The first agent opens; each round then gives every agent exactly one turn.
+    "round-robin" keeps a fixed order (for two agents: B, A, B, A...);
+    "shuffle" draws a new order each round without the same agent speaking twice in a row.
+    """
+
+    ORDERS = ("round-robin", "shuffle")
+
+    def __init__(self, agent_ids, order="round-robin", seed=None):
+        if order not in self.ORDERS:
+            raise ValueError(f"Unknown turn order '{order}' (expected one of {', '.join(self.ORDERS)})")
+        self.agent_ids = list(agent_ids)
+        self.order = order
+        self._random = random.Random(seed)
+        self._round = []
+        self.last = self.agent_ids[0]  # The opener
+
+    def _next_round(self):
+        if self.order == "round-robin":
+            start = self.agent_ids.index(self.last) + 1
+            ids = self.agent_ids
+            return [ids[(start + i) % len(ids)] for i in range(len(ids))]
+        order = self.agent_ids[:]
+        self._random.shuffle(order)
+        if len(order) > 1 and order[0] == self.last:
+            order.append(order.pop(0))
+        return order
+
+    def start_round(self):
+        """Return the speaking order for the next round."""
+        self._round = self._next_round()
+        return list(self._round)
+
+    def spoke(self, agent_id):
+        """Note who just spoke (the next round is arranged around them)."""
+        self.last = agent_id
@@ -0,0 +1,335 @@
+"""
+Browser display server for Duet LLM (--display-port).
+
+Serves a small HTML page plus a WebSocket feed of conversation events, so
+any number of browsers or kiosk screens can draw the comic balloons
+themselves. Each event is encoded once and handed to every client's
+bounded queue. A client that falls behind is dropped, so a slow screen
+never stalls the conversation loop.
+
+Standard library only: just enough of RFC 6455 is implemented (text
+frames out; ping/pong and close in both directions). Text the browsers
+send is read and ignored.
+"""
+
+import base64
+import hashlib
+import json
+import queue
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC11B85"
+PING_INTERVAL = 15.0  # Seconds of silence before a keepalive ping
+SEND_TIMEOUT = 5.0  # A client socket that blocks this long is dropped
+MAX_CLIENT_FRAME = 64 * 1024  # Browsers only send control frames; anything bigger ends the connection
+
+
+def ws_frame(payload, opcode=0x1):
+    """Encode one unmasked, unfragmented server frame."""
+    header = bytearray([0x80 | opcode])
+    n = len(payload)
+    if n < 126:
+        header.append(n)
+    elif n < 65536:
+        header.append(126)
+        header += n.to_bytes(2, "big")
+    else:
+        header.append(127)
+        header += n.to_bytes(8, "big")
+    return bytes(header) + payload
+
+
+def ws_read_frame(recv_exact):
+    """
+    Decode one client frame. recv_exact(n) returns exactly n bytes (or raises).
+    Returns (opcode, payload) with the payload unmasked.
+    """
+    first, second = recv_exact(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(recv_exact(2), "big")
+    elif length == 127:
+        length = int.from_bytes(recv_exact(8), "big")
+    if length > MAX_CLIENT_FRAME:
+        raise ValueError(f"client frame of {length} bytes")
+    mask = recv_exact(4) if second & 0x80 else None
+    payload = recv_exact(length) if length else b""
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+PING_FRAME = ws_frame(b"", opcode=0x9)
+CLOSE_FRAME = ws_frame(b"", opcode=0x8)
+
+
+class _Client:
+    __slots__ = ("queue", "dropped", "address", "close_frame")
+
+    def __init__(self, address, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)  # Frames to send; None ends the connection
+        self.dropped = False
+        self.address = address
+        self.close_frame = None  # Reply to a close the browser sent (ends the connection)
+
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Duet LLM</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<style>
+html, body { margin: 0; height: 100%; background: #000; overflow: hidden; }
+#stage { position: absolute; inset: 0; margin: auto; aspect-ratio: var(--ratio, 16 / 9);
+         max-width: 100vw; max-height: 100vh; background: center / contain no-repeat url(/background); }
+.balloon { position: absolute; display: flex; align-items: center; overflow: hidden;
+           font-family: "Marker Felt", "Comic Sans MS", cursive; color: #000; line-height: 1.15; }
+#caption { position: absolute; left: 0; right: 0; bottom: 0; padding: 0.6vh 2vw; color: #eee;
+           font-family: sans-serif; font-size: 2.2vh; background: rgba(0, 0, 0, 0.55); min-height: 1em; }
+#caption:empty { display: none; }
+</style></head>
+<body><div id="stage"><div class="balloon" id="left"></div><div class="balloon" id="right"></div>
+<div id="caption"></div></div>
+<script>
+const stage = document.getElementById("stage");
+const box = {left: document.getElementById("left"), right: document.getElementById("right")};
+const caption = document.getElementById("caption");
+let showBoth = false;
+const clean = t => t.replace(/\\[.*?\\]/g, "").replace(/\\s+/g, " ").trim();
+function fit(el) {
+  let size = stage.clientHeight * 0.045;
+  el.style.fontSize = size + "px";
+  while (el.scrollHeight > el.clientHeight && size > 8) { size -= 1; el.style.fontSize = size + "px"; }
+}
+function say(side, text) {
+  if (!box[side]) { caption.textContent = text; return; }
+  box[side].textContent = clean(text);
+  if (!showBoth) box[side === "left" ? "right" : "left"].textContent = "";
+  fit(box[side]);
+}
+function connect(delay) {
+  const ws = new WebSocket((location.protocol === "https:" ? "wss://" : "ws://") + location.host + "/ws");
+  ws.onmessage = e => {
+    const ev = JSON.parse(e.data);
+    if (ev.type === "hello") {
+      showBoth = ev.show_both;
+      stage.style.setProperty("--ratio", ev.width + " / " + ev.height);
+      for (const side of ["left", "right"]) {
+        const [x1, y1, x2, y2] = ev.balloons[side];
+        Object.assign(box[side].style, {left: x1 + "%", top: y1 + "%", width: (x2 - x1) + "%", height: (y2 - y1) + "%"});
+      }
+      for (const side in ev.state) if (ev.state[side]) say(side, ev.state[side]);
+    } else if (ev.type === "token" || ev.type === "message") {
+      say(ev.side, ev.type === "message" && !ev.side ? "[" + ev.speaker + "] " + ev.text : ev.text);
+    }
+  };
+  ws.onopen = () => { delay = 500; };
+  ws.onclose = () => setTimeout(() => connect(Math.min(delay * 2, 10000)), delay);
+}
+window.addEventListener("resize", () => { fit(box.left); fit(box.right); });
+connect(500);
+</script></body></html>
+"""
+
+
+class DisplayServer:
+    """
+    HTTP page + WebSocket event fan-out.
+
+    Usage:
+        display = DisplayServer("Artboard 1.png", ComicVisualizer.LEFT_BALLOON, ComicVisualizer.RIGHT_BALLOON,
+                                scale=ComicVisualizer.SCALE)
+        display.start(8765)
+        display.token("left", "partial reply so far")
+        display.message("a", "left", "Jamie", "final reply")
+        display.stop()
+    """
+
+    def __init__(self, image_path, left_balloon, right_balloon, scale=1.0, show_both=False, max_queue=64):
+        """
+        Args:
+            image_path: Background image served to the browsers
+            left_balloon, right_balloon: (x1, y1, x2, y2) balloon boxes in scaled-image pixels
+            scale: Scale the balloon boxes were measured at (ComicVisualizer.SCALE)
+            show_both: Keep both balloons filled instead of clearing the other side
+            max_queue: Events buffered per client before it is considered too slow and dropped
+        """
+        with open(image_path, "rb") as f:
+            self.image_bytes = f.read()
+        with Image.open(image_path) as img:
+            width, height = img.size
+        self.image_type = "image/png" if image_path.lower().endswith(".png") else "image/jpeg"
+
+        def percent(bbox):
+            x1, y1, x2, y2 = bbox
+            w, h = width * scale, height * scale
+            return [round(100 * x1 / w, 2), round(100 * y1 / h, 2), round(100 * x2 / w, 2), round(100 * y2 / h, 2)]
+
+        self.layout = {
+            "width": width,
+            "height": height,
+            "show_both": show_both,
+            "balloons": {"left": percent(left_balloon), "right": percent(right_balloon)},
+        }
+        self.show_both = show_both
+        self.max_queue = max_queue
+        self.state = {"left": "", "right": ""}  # Sent to clients that connect mid-conversation
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._server = None
+
+        # Counters
+        self.connected = 0
+        self.dropped = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._clients)
+
+    def _publish(self, event):
+        frame = ws_frame(json.dumps(event, ensure_ascii=False).encode("utf-8"))  # Encoded once for all clients
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            if client.dropped:
+                continue
+            try:
+                client.queue.put_nowait(frame)
+            except queue.Full:
+                client.dropped = True
+                with self._lock:
+                    self.dropped += 1
+                print(f"[Display] Dropped slow client {client.address}")
+
+    def _set_state(self, side, text):
+        if side in self.state:
+            self.state[side] = text
+            if not self.show_both:
+                self.state["right" if side == "left" else "left"] = ""
+
+    def token(self, side, text):
+        """Partial reply while a balloon role is still generating (text so far)."""
+        self._publish({"type": "token", "side": side, "text": text})
+
+    def message(self, role, side, speaker, text):
+        """Final reply. side is 'left'/'right' for balloon roles, None for the caption bar."""
+        self._set_state(side, text)
+        self._publish({"type": "message", "role": role, "side": side, "speaker": speaker, "text": text})
+
+    def start(self, port, host="127.0.0.1"):
+        """Serve the page on / and the event feed on /ws from daemon threads."""
+        display = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # The WebSocket handshake must answer 'HTTP/1.1 101'
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/ws":
+                    self._websocket()
+                elif path in ("/", "/index.html"):
+                    self._send(PAGE.encode("utf-8"), "text/html; charset=utf-8")
+                elif path == "/background":
+                    self._send(display.image_bytes, display.image_type, cache=True)
+                else:
+                    self.send_error(404)
+
+            def _send(self, body, content_type, cache=False):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if cache:
+                    self.send_header("Cache-Control", "max-age=3600")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _websocket(self):
+                key = self.headers.get("Sec-WebSocket-Key")
+                if not key or "websocket" not in self.headers.get("Upgrade", "").lower():
+                    self.send_error(400, "Expected a WebSocket upgrade")
+                    return
+                accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+                self.send_response(101, "Switching Protocols")
+                self.send_header("Upgrade", "websocket")
+                self.send_header("Connection", "Upgrade")
+                self.send_header("Sec-WebSocket-Accept", accept)
+                self.end_headers()
+                self.wfile.flush()
+                self.close_connection = True
+
+                client = _Client(f"{self.client_address[0]}:{self.client_address[1]}", display.max_queue)
+                hello = dict(display.layout, type="hello", state=dict(display.state))
+                client.queue.put_nowait(ws_frame(json.dumps(hello, ensure_ascii=False).encode("utf-8")))
+                with display._lock:
+                    display._clients.add(client)
+                    display.connected += 1
+                sock = self.connection
+                sock.settimeout(SEND_TIMEOUT)
+                threading.Thread(target=self._read, args=(sock, client), name="display-read", daemon=True).start()
+                try:
+                    while not client.dropped and client.close_frame is None and display._server is not None:
+                        try:
+                            frame = client.queue.get(timeout=PING_INTERVAL)
+                        except queue.Empty:
+                            frame = PING_FRAME
+                        if frame is None:
+                            break
+                        sock.sendall(frame)
+                    sock.sendall(client.close_frame or CLOSE_FRAME)
+                except (OSError, socket.timeout):
+                    pass  # Client went away or stalled
+                finally:
+                    client.dropped = True  # Stops the reader
+                    with display._lock:
+                        display._clients.discard(client)
+
+            def _read(self, sock, client):
+                """Answer the browser's pings and close; the sending loop above does the writing."""
+                def recv_exact(n):
+                    data = b""
+                    while len(data) < n:
+                        try:
+                            chunk = sock.recv(n - len(data))
+                        except socket.timeout:  # Shared with the send timeout; quiet clients are fine
+                            if client.dropped:
+                                raise
+                            continue
+                        if not chunk:
+                            raise ConnectionError("client closed the socket")
+                        data += chunk
+                    return data
+
+                try:
+                    while not client.dropped:
+                        opcode, payload = ws_read_frame(recv_exact)
+                        if opcode == 0x9:  # Ping
+                            try:
+                                client.queue.put_nowait(ws_frame(payload, opcode=0xA))
+                            except queue.Full:
+                                pass  # Too slow anyway; _publish drops it
+                        elif opcode == 0x8:  # Close: echo the status code, then end the connection
+                            client.close_frame = ws_frame(payload[:2], opcode=0x8)
+                            break
+                except (OSError, ValueError):
+                    pass  # Socket closed, timed out after the writer stopped, or a malformed frame
+                try:
+                    client.queue.put_nowait(None)  # Wake the sending loop so it can finish
+                except queue.Full:
+                    client.dropped = True
+
+            def log_message(self, format, *args):
+                pass  # Keep requests out of the conversation output
+
+        self._server = ThreadingHTTPServer((host, port), Handler)  # OSError if the port is taken
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="display", daemon=True).start()
+
+    def stop(self):
+        if self._server:
+            server, self._server = self._server, None
+            server.shutdown()
+            server.server_close()
+
@@ -1,6 +1,8 @@
 import argparse
+import json
 import os
 import re
+import sys
 import time
 from datetime import datetime
 
@@ -8,6 +10,25 @@ import pygame
 import requests
 from PIL import Image, ImageDraw, ImageFont
 
+from llm_cache import MODES as CACHE_MODES, CacheMiss, ResponseCache
+from loops import HAS_NUMPY, INTERVENTIONS, LoopDetector
+from longrun import EXIT_RESTART, INSTALLATION_DEFAULTS, LogRotator, MemoryMonitor, Watchdog, format_mb
+from ollama_pool import OllamaPool
+from ollama_profile import PERFORMANCE_OPTIONS, OptionsProfile
+from metrics import RENDER_BUCKETS, metrics
+from profiler import profiler
+from resilience import LatencyTracker, call_with_retries, either, hedged_call
+from cadence import STEPS as CADENCE_STEPS, CadenceController, template_whisper
+from conversation import TranscriptStore, TurnScheduler
+from display import DisplayServer
+from interrupts import Interrupted, SpeechInterrupts
+from judging import BatchJudge
+from routing import ROUTE_MODES, RoutedChat, Router
+from registry import PersonaRegistry
+from topics import TopicScheduler
+from usage import BUDGET_KEYS, BudgetExceeded, UsageMeter, estimate_tokens, price
+from whispers import WhisperCache, WhisperPrefetcher
+
 # Optional Anthropic support
 try:
     import anthropic
@@ -43,6 +64,21 @@ def parse_args():
         help="Path to persona file for Agent B (e.g. mystic panpsychist).",
     )
 
+    parser.add_argument(
+        "--cast",
+        nargs="+",
+        metavar="PERSONA",
+        help="Two or more persona files for a group conversation (overrides -A/-B). "
+             "Agents get roles a, b, c, ... in order; the first opens.",
+    )
+
+    parser.add_argument(
+        "--turn-order",
+        choices=list(TurnScheduler.ORDERS),
+        default="round-robin",
+        help="Who speaks next each round: fixed rotation, or a fresh random order (never the same agent twice in a row).",
+    )
+
     # Base/shared model
     parser.add_argument(
         "-m",
@@ -89,6 +125,30 @@ def parse_args():
         help="Optional: specific Anthropic model for Agent B.",
     )
 
+    # Per-role provider/model assignment
+    parser.add_argument(
+        "--role-providers",
+        help="Per-role provider overrides, e.g. 'a=anthropic,b=ollama' (roles: a, b, judge, user, room).",
+    )
+
+    parser.add_argument(
+        "--role-models",
+        help="Per-role model overrides for the role's provider, e.g. 'a=claude-sonnet-4-20250514,room=qwen2.5:0.5b'.",
+    )
+
+    parser.add_argument(
+        "--route",
+        choices=["off"] + list(ROUTE_MODES),
+        default="off",
+        help="Route side-channel roles to the backend with the lowest observed latency or cost.",
+    )
+
+    parser.add_argument(
+        "--route-roles",
+        default="room,judge",
+        help="Comma-separated roles eligible for --route.",
+    )
+
     # Judge / referee
     parser.add_argument(
         "--judge-persona",
@@ -107,6 +167,26 @@ def parse_args():
         help="Every N turns, the judge comments on the last exchange (0 disables judge).",
     )
 
+    parser.add_argument(
+        "--judge-mode",
+        choices=["inline", "batch"],
+        default="inline",
+        help="inline: free-text comment every --judge-interval turns, blocking the loop. "
+             "batch: score every exchange (rigor, novelty, repetition) in background windows.",
+    )
+
+    parser.add_argument(
+        "--judge-window",
+        type=int,
+        default=4,
+        help="Exchanges scored per judge call in batch mode.",
+    )
+
+    parser.add_argument(
+        "--judge-results",
+        help="JSONL file for batch judge scores (default: next to the log, *.scores.jsonl).",
+    )
+
     # User persona (you)
     parser.add_argument(
         "--user-persona",
@@ -125,7 +205,7 @@ def parse_args():
         "--max-turns",
         type=int,
         default=0,
-        help="Maximum number of A↔B turns (0 = infinite until Ctrl-C).",
+        help="Maximum number of turns, i.e. rounds where every agent speaks once (0 = infinite until Ctrl-C).",
     )
 
     parser.add_argument(
@@ -133,6 +213,11 @@ def parse_args():
         help="Optional explicit log file path. If omitted, a timestamped .md file in logs/ is used.",
     )
 
+    parser.add_argument(
+        "--transcript",
+        help="Optional JSONL transcript path (structured log, playable with replay.py).",
+    )
+
     parser.add_argument(
         "--no-color",
         action="store_true",
@@ -165,6 +250,27 @@ def parse_args():
         help="Show both speech balloons simultaneously (default: show one at a time).",
     )
 
+    # Browser display server
+    parser.add_argument(
+        "--display-port",
+        type=int,
+        default=0,
+        help="Serve a browser view of the balloons at http://HOST:PORT/ for any number of screens (0 disables).",
+    )
+
+    parser.add_argument(
+        "--display-host",
+        default="127.0.0.1",
+        help="Interface for the display server (use 0.0.0.0 to reach it from other machines).",
+    )
+
+    parser.add_argument(
+        "--display-queue",
+        type=int,
+        default=64,
+        help="Events buffered per browser before a slow client is dropped.",
+    )
+
     # Ambient listening mode
     parser.add_argument(
         "--listen",
@@ -179,6 +285,20 @@ def parse_args():
         help="Room whispers a topic every N turns when speech is detected (default: 3).",
     )
 
+    parser.add_argument(
+        "--interrupt",
+        action="store_true",
+        help="When speech is heard, cut off the agent that is speaking, whisper the topic at once "
+             "and restart its turn (needs --listen).",
+    )
+
+    parser.add_argument(
+        "--interrupt-cooldown",
+        type=float,
+        default=20.0,
+        help="Minimum seconds between interrupts; speech heard sooner waits for the next --listen-interval.",
+    )
+
     parser.add_argument(
         "--whisper-model",
         default="base",
@@ -197,7 +317,324 @@ def parse_args():
         help="Path to icebreakers markdown file with structured topic list.",
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--whisper-cache",
+        default=".cache/whispers.json",
+        help="On-disk cache of room whispers for icebreaker topics ('off' disables).",
+    )
+
+    parser.add_argument(
+        "--precompute-workers",
+        type=int,
+        default=4,
+        help="Parallel room-persona calls when precomputing icebreaker whispers at startup.",
+    )
+
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=1.0,
+        help="Check persona/icebreaker files for edits at most every N seconds, at turn boundaries (0 disables hot reload).",
+    )
+
+    parser.add_argument(
+        "--topic-ttl",
+        type=float,
+        default=180.0,
+        help="Seconds an overheard topic stays queued before it is considered stale (0 = never).",
+    )
+
+    parser.add_argument(
+        "--topic-queue-size",
+        type=int,
+        default=10,
+        help="Maximum queued topics; the oldest lowest-priority topic is dropped when full.",
+    )
+
+    # Timeouts, retries and hedging
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="Default per-request timeout in seconds for every role.",
+    )
+
+    parser.add_argument(
+        "--role-timeouts",
+        help="Per-role timeout overrides, e.g. 'room=10,judge=120' (roles: a, b, judge, user, room).",
+    )
+
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Retries after a timeout, connection error, rate limit or 5xx (0 disables).",
+    )
+
+    parser.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=1.0,
+        help="Base backoff in seconds; doubles each retry (with jitter).",
+    )
+
+    parser.add_argument(
+        "--hedge-to",
+        help="Fallback as PROVIDER:MODEL (e.g. 'ollama:llama3.2:1b'). When a request runs past the "
+             "primary's recent p95, a duplicate goes here and the first answer wins.",
+    )
+
+    parser.add_argument(
+        "--hedge-min-samples",
+        type=int,
+        default=5,
+        help="Latency samples needed before hedging kicks in for a backend.",
+    )
+
+    parser.add_argument(
+        "--ollama-urls",
+        help="Comma-separated pool of Ollama endpoints (host:port or URL) used instead of OLLAMA_URL. "
+             "Agents stick to one warm endpoint; other roles go to the least busy one.",
+    )
+
+    parser.add_argument(
+        "--ollama-pins",
+        help="Pin roles to pool endpoints by index or URL, e.g. 'a=0,b=1,judge=http://box3:11434'.",
+    )
+
+    parser.add_argument(
+        "--pool-health-interval",
+        type=float,
+        default=10.0,
+        help="Seconds between pool health checks (0 = only at startup and on failures).",
+    )
+
+    parser.add_argument(
+        "--ollama-profile",
+        default=".cache/ollama-profile.json",
+        help="Tuned per-role/per-model Ollama options written by autotune.py, if present ('off' ignores it).",
+    )
+
+    # Early stop
+    parser.add_argument(
+        "--word-budgets",
+        help="Per-role word budgets overriding the defaults (a=20,b=20,user=30,room=10; 0 disables), "
+             "e.g. 'a=15,judge=60'. Replies stop at the first complete sentence past the budget.",
+    )
+
+    parser.add_argument(
+        "--no-early-stop",
+        action="store_true",
+        help="Disable word budgets and stop sequences (fixed token limits only).",
+    )
+
+    # Loop detection
+    parser.add_argument(
+        "--loop-threshold",
+        type=float,
+        default=0.55,
+        help="Similarity (0-1) to a recent reply that counts as repeating it; 0 disables loop detection.",
+    )
+
+    parser.add_argument(
+        "--loop-window",
+        type=int,
+        default=8,
+        help="Recent replies each new reply is compared against.",
+    )
+
+    parser.add_argument(
+        "--loop-patience",
+        type=int,
+        default=2,
+        help="Consecutive repeating replies before the loop is broken.",
+    )
+
+    parser.add_argument(
+        "--loop-cooldown",
+        type=int,
+        default=2,
+        help="Rounds after an intervention before another loop is reported (and a temperature bump lasts).",
+    )
+
+    parser.add_argument(
+        "--loop-interventions",
+        default=",".join(INTERVENTIONS),
+        help="Interventions to escalate through when loops recur; unavailable ones "
+             "(no room persona, no icebreakers) are skipped.",
+    )
+
+    parser.add_argument(
+        "--loop-temp-bump",
+        type=float,
+        default=0.3,
+        help="Temperature added to the agents (Ollama) by the 'temperature' intervention.",
+    )
+
+    # Token/cost accounting and budgets
+    parser.add_argument(
+        "--budget",
+        help="Hard budget; the run stops when any limit is reached, e.g. 'usd=5,tokens=500000,seconds=3600' "
+             "(seconds = total local model compute time; Anthropic calls count toward usd and tokens only).",
+    )
+
+    parser.add_argument(
+        "--soft-budget",
+        help="Soft budget with the same keys; when first reached, paid roles switch to --downgrade-to "
+             "(or a warning is printed).",
+    )
+
+    parser.add_argument(
+        "--downgrade-to",
+        help="Backend as PROVIDER:MODEL that paid roles switch to at the soft budget (e.g. 'ollama:mistral').",
+    )
+
+    # Turn cadence
+    parser.add_argument(
+        "--turn-deadline",
+        type=float,
+        default=0.0,
+        help="Target seconds per round; when rounds run over, quality is reduced step by step "
+             "(shorter replies, no interjections, smaller model, template whispers) and restored as "
+             "latency recovers. 0 disables.",
+    )
+
+    parser.add_argument(
+        "--cadence-window",
+        type=int,
+        default=3,
+        help="Rounds averaged before each degrade/recover decision.",
+    )
+
+    parser.add_argument(
+        "--cadence-model",
+        help="Smaller backend as PROVIDER:MODEL for the 'smaller model' step (e.g. 'ollama:qwen2.5:0.5b'); "
+             "without it that step is skipped.",
+    )
+
+    parser.add_argument(
+        "--cadence-short-factor",
+        type=float,
+        default=0.5,
+        help="Word budget multiplier for the 'shorter replies' step.",
+    )
+
+    parser.add_argument(
+        "--usage-interval",
+        type=int,
+        default=1,
+        help="Print running token/cost totals every N turns (0 = only at the end).",
+    )
+
+    # Profiling
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every phase (LLM calls, logging, rendering, sleeps, listener) and write a Chrome trace.",
+    )
+
+    parser.add_argument(
+        "--profile-path",
+        help="Chrome trace output for --profile (default: next to the log, *.trace.json).",
+    )
+
+    # Metrics endpoint
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve Prometheus metrics at http://HOST:PORT/metrics (0 disables).",
+    )
+
+    parser.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="Interface for the metrics endpoint.",
+    )
+
+    # Response cache
+    parser.add_argument(
+        "--cache",
+        choices=["off"] + list(CACHE_MODES),
+        default="off",
+        help="LLM response cache: readwrite (read-through), record (always call, store), replay (cache only).",
+    )
+
+    parser.add_argument(
+        "--cache-path",
+        default=".cache/responses.sqlite",
+        help="SQLite file for the response cache.",
+    )
+
+    parser.add_argument(
+        "--cache-size-mb",
+        type=float,
+        default=64.0,
+        help="Evict least recently used cached responses beyond this size.",
+    )
+
+    # Long-running installations (defaults of None are filled in by --installation, else off)
+    parser.add_argument(
+        "--installation",
+        action="store_true",
+        help="Unattended multi-day preset: bounded history, log rotation, memory reports and a watchdog. "
+             "Options below that are given explicitly still win.",
+    )
+
+    parser.add_argument(
+        "--max-history",
+        type=int,
+        help="Keep at most N entries of shared conversation history in memory (0 = unlimited; "
+             f"--installation: {INSTALLATION_DEFAULTS['max_history']}).",
+    )
+
+    parser.add_argument(
+        "--rotate-mb",
+        type=float,
+        help="Start a new log/transcript segment when one reaches this size; closed segments are gzipped "
+             f"(0 = off; --installation: {INSTALLATION_DEFAULTS['rotate_mb']:g}).",
+    )
+
+    parser.add_argument(
+        "--rotate-hours",
+        type=float,
+        help="Start a new log/transcript segment after this many hours "
+             f"(0 = off; --installation: {INSTALLATION_DEFAULTS['rotate_hours']:g}).",
+    )
+
+    parser.add_argument(
+        "--log-keep",
+        type=int,
+        help="Compressed segments kept per log file, oldest deleted first "
+             f"(0 = keep all; --installation: {INSTALLATION_DEFAULTS['log_keep']}).",
+    )
+
+    parser.add_argument(
+        "--rss-interval",
+        type=float,
+        help="Report process memory (RSS) every N seconds "
+             f"(0 = only at the end; --installation: {INSTALLATION_DEFAULTS['rss_interval']:g}).",
+    )
+
+    parser.add_argument(
+        "--max-rss",
+        type=float,
+        help=f"Stop with exit status {EXIT_RESTART} (supervise.py restarts the run) once RSS passes this many MB "
+             "(0 = never).",
+    )
+
+    parser.add_argument(
+        "--watchdog",
+        type=float,
+        help="Exit with a stack dump when no agent turn completes for this many seconds, so supervise.py "
+             f"can restart the run (0 = off; --installation: {INSTALLATION_DEFAULTS['watchdog']:g}).",
+    )
+
+    args = parser.parse_args()
+    for key, value in INSTALLATION_DEFAULTS.items():
+        if getattr(args, key) is None:
+            setattr(args, key, value if args.installation else type(value)())
+    return args
 
 
 # Colors / formatting helpers
@@ -207,6 +644,7 @@ class Colors:
     GREEN = "\033[92m"
     CYAN = "\033[96m"
     YELLOW = "\033[93m"
+    RED = "\033[91m"
     RESET = "\033[0m"
 
 
@@ -227,19 +665,25 @@ class ComicVisualizer:
     LEFT_BALLOON = (210, 50, 580, 150)   # Person 1 (man, upper balloon)
     RIGHT_BALLOON = (310, 250, 670, 365)  # Person 2 (woman, lower balloon) - more left
 
-    def __init__(self, image_path, show_both=False):
+    def __init__(self, image_path, show_both=False, scale=None):
         self.image_path = image_path
         self.show_both = show_both  # Whether to show both balloons simultaneously
-        original = Image.open(image_path)
+        self.scale = scale or self.SCALE  # e.g. 1.0 for full-resolution video frames
+        original = Image.open(image_path).convert("RGB")
 
         # Scale down large images
-        new_width = int(original.width * self.SCALE)
-        new_height = int(original.height * self.SCALE)
+        new_width = int(original.width * self.scale)
+        new_height = int(original.height * self.scale)
         self.base_image = original.resize((new_width, new_height), Image.Resampling.LANCZOS)
         self.width, self.height = self.base_image.size
 
+        # Balloon boxes and font size are tuned at SCALE; adjust them to this scale
+        factor = self.scale / self.SCALE
+        self.left_balloon = tuple(int(v * factor) for v in self.LEFT_BALLOON)
+        self.right_balloon = tuple(int(v * factor) for v in self.RIGHT_BALLOON)
+
         # Try to load a nice font for Pillow text rendering
-        self.font = self._load_font(22)
+        self.font = self._load_font(int(22 * factor))
 
         # Text state
         self.left_text = ""
@@ -298,24 +742,30 @@ class ComicVisualizer:
 
         return '\n'.join(lines)
 
-    def _render(self):
-        """Render current text onto the image and return pygame surface."""
+    def compose(self, left_text, right_text):
+        """Draw balloon text onto a copy of the artwork and return the PIL image (no display needed)."""
         # Start with base image copy
         img = self.base_image.copy()
         draw = ImageDraw.Draw(img)
 
         # Draw left balloon text
-        if self.left_text:
-            wrapped = self._wrap_text(self.left_text, self.LEFT_BALLOON, draw)
-            x1, y1, x2, y2 = self.LEFT_BALLOON
+        if left_text:
+            wrapped = self._wrap_text(left_text, self.left_balloon, draw)
+            x1, y1, x2, y2 = self.left_balloon
             draw.text((x1 + 5, y1 + 3), wrapped, fill="black", font=self.font)
 
         # Draw right balloon text
-        if self.right_text:
-            wrapped = self._wrap_text(self.right_text, self.RIGHT_BALLOON, draw)
-            x1, y1, x2, y2 = self.RIGHT_BALLOON
+        if right_text:
+            wrapped = self._wrap_text(right_text, self.right_balloon, draw)
+            x1, y1, x2, y2 = self.right_balloon
             draw.text((x1 + 5, y1 + 3), wrapped, fill="black", font=self.font)
 
+        return img
+
+    def _render(self):
+        """Render current text onto the image and return pygame surface."""
+        img = self.compose(self.left_text, self.right_text)
+
         # Convert PIL image to pygame surface
         img_bytes = img.tobytes()
         return pygame.image.fromstring(img_bytes, img.size, img.mode)
@@ -323,9 +773,14 @@ class ComicVisualizer:
     def _update_display(self):
         """Update the pygame display."""
         if self.screen and self._running:
-            surface = self._render()
-            self.screen.blit(surface, (0, 0))
-            pygame.display.flip()
+            started = time.perf_counter()
+            with profiler.span("render", cat="visual"):
+                surface = self._render()
+            with profiler.span("flip", cat="visual"):
+                self.screen.blit(surface, (0, 0))
+                pygame.display.flip()
+            metrics.observe("duet_render_seconds", time.perf_counter() - started, buckets=RENDER_BUCKETS,
+                            help="Comic frame render and display time")
 
     def start(self):
         """Start the visualization window."""
@@ -360,7 +815,9 @@ class ComicVisualizer:
     def process_events(self):
         """Process pygame events (call periodically from main loop)."""
         if self._running:
-            for event in pygame.event.get():
+            with profiler.span("process_events", cat="visual"):
+                events = pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
                     self._running = False
 
@@ -449,61 +906,556 @@ def load_persona(path):
     }
 
 
-def chat_with_ollama(ollama_url, model_name, messages):
-    """Send chat request to Ollama."""
-    payload = {
-        "model": model_name,
-        "messages": messages,
-        "stream": False,
-        "options": {
-            "num_ctx": 4096,
-            "num_predict": 250,  # Limit response length for conversational brevity
-            "temperature": 0.8,  # Slightly higher for more natural variation
-        },
-    }
-    resp = requests.post(ollama_url, json=payload)
-    resp.raise_for_status()
-    data = resp.json()
-    return data["message"]["content"]
+DEFAULT_OLLAMA_OPTIONS = {
+    "num_ctx": 4096,
+    "num_predict": 250,  # Limit response length for conversational brevity
+    "temperature": 0.8,  # Slightly higher for more natural variation
+}
 
+DEFAULT_CLAUDE_MAX_TOKENS = 50
 
-def chat_with_claude(model_name, system_prompt, messages, max_tokens=50):
-    """Send chat request to Anthropic Claude API."""
-    client = anthropic.Anthropic()  # uses ANTHROPIC_API_KEY env var
-    response = client.messages.create(
-        model=model_name,
-        max_tokens=max_tokens,
-        system=system_prompt,
-        messages=messages,
-    )
-    return response.content[0].text
+# Per-role word budgets: generation stops at the first complete sentence past
+# the budget (0 = no budget, use the fixed token limits above)
+DEFAULT_WORD_BUDGETS = {"a": 20, "b": 20, "judge": 0, "user": 30, "room": 10}
 
+# Stop sequences for budgeted roles - a blank line means the model is starting
+# a second paragraph, a bracket means meta-commentary clean_response drops anyway
+DEFAULT_STOP_SEQUENCES = ["\n\n", "\n["]
 
-def chat(provider, ollama_url, ollama_model, anthropic_model, system_prompt, messages):
-    """Provider-agnostic chat wrapper."""
-    if provider == "anthropic":
-        if not HAS_ANTHROPIC:
-            raise RuntimeError(
-                "anthropic package not installed. Run: pip install anthropic"
-            )
-        # Claude takes system separately; filter it out of messages
-        user_assistant_msgs = [m for m in messages if m["role"] != "system"]
-        return chat_with_claude(anthropic_model, system_prompt, user_assistant_msgs)
-    else:
-        return chat_with_ollama(ollama_url, ollama_model, messages)
+SENTENCE_END = re.compile(r'[.!?…]+["\'\u201d)]*')
 
 
-def create_log_file(topic, explicit_path=None):
-    if explicit_path:
-        # If explicit path has a directory component, ensure it exists
-        directory = os.path.dirname(explicit_path)
-        if directory:
-            os.makedirs(directory, exist_ok=True)
-        path = explicit_path
-    else:
-        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-        safe_topic = "".join(
-            c for c in topic[:40] if c.isalnum() or c in (" ", "-", "_")
+def budget_cut(text, max_words, final=False):
+    """
+    Find where a budgeted reply should end.
+
+    Returns the text cut after the first complete sentence that reaches
+    max_words, cut at 2x max_words if no sentence ends by then, or None if
+    generation should continue. With final=True a trailing sentence end
+    counts even without following whitespace.
+    """
+    for match in SENTENCE_END.finditer(text):
+        end = match.end()
+        if end == len(text) and not final:
+            break  # Could be "3." of "3.5" - wait for the next chunk
+        if end < len(text) and not text[end].isspace():
+            continue
+        if len(text[:end].split()) >= max_words:
+            return text[:end]
+
+    words = text.split()
+    if len(words) > max_words * 2:
+        return " ".join(words[:max_words * 2])
+    return None
+
+
+def budget_tokens(max_words):
+    """Generous token cap for a word budget (the stream is cut well before it)."""
+    return max(64, max_words * 4)
+
+
+def prompt_tokens_estimate(messages):
+    return estimate_tokens("".join(m["content"] for m in messages))
+
+
+def chat_with_ollama(ollama_url, model_name, messages, options=None, timeout=None, max_words=0, stop=None,
+                     usage=None, on_token=None, cancel=None):
+    """
+    Send chat request to Ollama.
+
+    With max_words, the reply is streamed and the connection closed at the
+    first complete sentence past the budget, which stops generation.
+    If a usage dict is given it receives input_tokens/output_tokens (estimated
+    when the stream was cut before Ollama reported counts). on_token is called
+    with the text so far after each streamed chunk. With cancel (a
+    threading.Event) the reply is always streamed, and setting the event
+    closes the stream and raises Interrupted.
+    """
+    if usage is None:
+        usage = {}
+    options = dict(options or DEFAULT_OLLAMA_OPTIONS)
+    keep_alive = options.pop("keep_alive", None)  # A request field, not a model option
+    if stop:
+        options["stop"] = stop
+    if cancel is not None and cancel.is_set():
+        raise Interrupted()
+    if not max_words and cancel is None:
+        payload = {
+            "model": model_name,
+            "messages": messages,
+            "stream": False,
+            "options": options,
+        }
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        resp = requests.post(ollama_url, json=payload, timeout=timeout)
+        resp.raise_for_status()
+        data = resp.json()
+        text = data["message"]["content"]
+        usage.update(
+            input_tokens=data.get("prompt_eval_count", prompt_tokens_estimate(messages)),
+            output_tokens=data.get("eval_count", estimate_tokens(text)),
+            estimated="eval_count" not in data,
+        )
+        return text
+
+    if max_words:
+        options["num_predict"] = budget_tokens(max_words)
+    payload = {
+        "model": model_name,
+        "messages": messages,
+        "stream": True,
+        "options": options,
+    }
+    if keep_alive:
+        payload["keep_alive"] = keep_alive
+    text = ""
+    # Each streamed chunk is one token; the final chunk carries exact counts
+    usage.update(input_tokens=prompt_tokens_estimate(messages), output_tokens=0, estimated=True)
+    with requests.post(ollama_url, json=payload, timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            text += chunk.get("message", {}).get("content", "")
+            usage["output_tokens"] += 1
+            if on_token:
+                on_token(text)
+            if cancel is not None and cancel.is_set():
+                raise Interrupted(text)  # Closes the stream like an early stop
+            cut = budget_cut(text, max_words) if max_words else None
+            if cut is not None:
+                return cut  # Leaving the block closes the stream; Ollama stops generating
+            if chunk.get("done"):
+                if "eval_count" in chunk:
+                    usage.update(
+                        input_tokens=chunk.get("prompt_eval_count", usage["input_tokens"]),
+                        output_tokens=chunk["eval_count"],
+                        estimated=False,
+                    )
+                break
+    if not max_words:
+        return text
+    return budget_cut(text, max_words, final=True) or text
+
+
+def chat_with_claude(model_name, system_prompt, messages, max_tokens=DEFAULT_CLAUDE_MAX_TOKENS, timeout=None,
+                     max_words=0, stop=None, usage=None, on_token=None, temperature=None, cancel=None):
+    """
+    Send chat request to Anthropic Claude API.
+
+    With max_words, the reply is streamed and the stream closed at the first
+    complete sentence past the budget instead of cutting at max_tokens.
+    If a usage dict is given it receives input_tokens/output_tokens. on_token
+    is called with the text so far after each streamed delta. temperature
+    overrides the API default (None = leave it unset). cancel works as for
+    chat_with_ollama.
+    """
+    if usage is None:
+        usage = {}
+    # uses ANTHROPIC_API_KEY env var; retries are handled by RoleChat, not the SDK
+    client = anthropic.Anthropic(max_retries=0, timeout=timeout or anthropic.DEFAULT_TIMEOUT)
+    # The API rejects whitespace-only stop sequences
+    stop_sequences = [s for s in (stop or []) if s.strip()]
+    extra = {}
+    if stop_sequences:
+        extra["stop_sequences"] = stop_sequences
+    if temperature is not None:
+        extra["temperature"] = temperature
+    if cancel is not None and cancel.is_set():
+        raise Interrupted()
+    if not max_words and cancel is None:
+        response = client.messages.create(
+            model=model_name,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=messages,
+            **extra,
+        )
+        usage.update(input_tokens=response.usage.input_tokens, output_tokens=response.usage.output_tokens)
+        return response.content[0].text
+
+    text = ""
+    with client.messages.stream(
+        model=model_name,
+        max_tokens=budget_tokens(max_words) if max_words else max_tokens,
+        system=system_prompt,
+        messages=messages,
+        **extra,
+    ) as stream:
+        deltas = 0
+        cut = None
+        interrupted = False
+        for delta in stream.text_stream:
+            text += delta
+            deltas += 1
+            if on_token:
+                on_token(text)
+            if cancel is not None and cancel.is_set():
+                interrupted = True
+                break
+            cut = budget_cut(text, max_words) if max_words else None
+            if cut is not None or (stop and any(s in text for s in stop)):
+                break
+        # A stream closed early has only partial output counts; a delta is at least one token
+        snapshot = stream.current_message_snapshot.usage
+        usage.update(input_tokens=snapshot.input_tokens, output_tokens=max(snapshot.output_tokens, deltas))
+    if interrupted:
+        raise Interrupted(text)
+    if cut is not None:
+        return cut
+    for s in stop or []:
+        text = text.split(s, 1)[0]
+    if not max_words:
+        return text
+    return budget_cut(text, max_words, final=True) or text
+
+
+def chat(provider, ollama_url, ollama_model, anthropic_model, system_prompt, messages, cache=None, timeout=None,
+         max_words=0, stop=None, max_tokens=None, usage=None, on_token=None, temperature=None, options=None,
+         cancel=None):
+    """
+    Provider-agnostic chat wrapper. Goes through the response cache when one is given.
+
+    max_tokens overrides the default length limit (num_predict for Ollama) for
+    roles that need a longer reply, such as batched judge scores. usage (a dict)
+    is filled with token counts when a model was actually called (not on cache hits).
+    on_token receives partial text while a budgeted (streamed) reply is generated.
+    temperature overrides the sampling temperature (None = provider default).
+    options are tuned Ollama options (autotune.py) layered over DEFAULT_OLLAMA_OPTIONS.
+    cancel (a threading.Event) aborts the reply with Interrupted once set.
+    """
+    ollama_options = dict(DEFAULT_OLLAMA_OPTIONS, **(options or {}))
+    if max_tokens:
+        ollama_options["num_predict"] = max_tokens
+    if temperature is not None:
+        ollama_options["temperature"] = temperature
+    if cache is not None:
+        if provider == "anthropic":
+            model, key_options = anthropic_model, {"max_tokens": max_tokens or DEFAULT_CLAUDE_MAX_TOKENS}
+            if temperature is not None:
+                key_options["temperature"] = temperature
+        else:
+            # Speed-only options stay out of the key so retuning keeps cached replies
+            model = ollama_model
+            key_options = {k: v for k, v in ollama_options.items() if k not in PERFORMANCE_OPTIONS}
+        if max_words:
+            key_options.update(max_words=max_words, stop=stop or [])
+        key = cache.make_key(provider, model, key_options, system_prompt, messages)
+        return cache.fetch(
+            key, provider, model,
+            lambda: chat(provider, ollama_url, ollama_model, anthropic_model, system_prompt, messages,
+                         timeout=timeout, max_words=max_words, stop=stop, max_tokens=max_tokens, usage=usage,
+                         on_token=on_token, temperature=temperature, options=options, cancel=cancel),
+        )
+
+    if provider == "anthropic":
+        if not HAS_ANTHROPIC:
+            raise RuntimeError(
+                "anthropic package not installed. Run: pip install anthropic"
+            )
+        # Claude takes system separately; filter it out of messages
+        user_assistant_msgs = [m for m in messages if m["role"] != "system"]
+        return chat_with_claude(
+            anthropic_model, system_prompt, user_assistant_msgs,
+            max_tokens=max_tokens or DEFAULT_CLAUDE_MAX_TOKENS,
+            timeout=timeout, max_words=max_words, stop=stop, usage=usage, on_token=on_token,
+            temperature=temperature, cancel=cancel,
+        )
+    else:
+        return chat_with_ollama(
+            ollama_url, ollama_model, messages, options=ollama_options,
+            timeout=timeout, max_words=max_words, stop=stop, usage=usage, on_token=on_token, cancel=cancel,
+        )
+
+
+ROLE_NAMES = ("a", "b", "judge", "user", "room")
+
+# Duet agent roles in cast order (a and b are the classic pair)
+AGENT_IDS = "abcdefgh"
+
+# Terminal colors cycled over the cast
+AGENT_COLORS = (Colors.BLUE, Colors.MAGENTA, Colors.RED)
+
+
+def agent_color(agent_id):
+    return AGENT_COLORS[AGENT_IDS.index(agent_id) % len(AGENT_COLORS)]
+
+
+def agent_side(agent_id):
+    """Comic balloon for an agent: a, c, e... on the left, b, d, f... on the right (None for other roles)."""
+    if len(agent_id) != 1 or agent_id not in AGENT_IDS:
+        return None
+    return "left" if AGENT_IDS.index(agent_id) % 2 == 0 else "right"
+
+
+def should_failover(exc):
+    """
+    False for errors a second backend must not answer: a replay cache miss, a hard
+    budget stop and an audience interrupt end the turn instead of costing another call.
+    """
+    return not isinstance(exc, (CacheMiss, BudgetExceeded, Interrupted))
+
+
+class RoleChat:
+    """
+    Chat backend for one conversation role (a, b, judge, user, room).
+
+    Bundles provider/model selection with the role's timeout, bounded
+    exponential-backoff retries and optional hedging: when the primary is
+    slower than its recent p95, a duplicate request goes to the fallback
+    and whichever answers first wins.
+    """
+
+    def __init__(
+        self,
+        role,
+        provider,
+        ollama_url,
+        ollama_model,
+        anthropic_model,
+        timeout=60.0,
+        retries=2,
+        backoff=1.0,
+        cache=None,
+        tracker=None,
+        fallback=None,
+        hedge_min_samples=5,
+        max_words=0,
+        stop=None,
+        max_tokens=None,
+        meter=None,
+        options=None,
+        pool=None,
+    ):
+        self.role = role
+        self.provider = provider
+        self.ollama_url = ollama_url
+        self.ollama_model = ollama_model
+        self.anthropic_model = anthropic_model
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.tracker = tracker
+        self.fallback = fallback  # Another RoleChat to hedge against, or None
+        self.hedge_min_samples = hedge_min_samples
+        self.max_words = max_words  # Word budget for early stop (0 = none)
+        self.stop = stop
+        self.max_tokens = max_tokens  # Length limit override (None = provider default)
+        self.meter = meter  # UsageMeter for token/cost accounting and budgets, or None
+        self.options = options  # Tuned Ollama options from the profile, or None for the defaults
+        self.pool = pool  # OllamaPool choosing the endpoint per request, or None for ollama_url
+        self.on_token = None  # Callable(partial_text) for live displays (primary backend only)
+        self.temperature = None  # Sampling temperature override (None = provider default)
+        self.cancel = None  # threading.Event that interrupts an in-flight reply (--interrupt), or None
+
+    @property
+    def model(self):
+        return self.anthropic_model if self.provider == "anthropic" else self.ollama_model
+
+    @property
+    def key(self):
+        """Backend key, shared by every role on the same backend (routing, usage, metrics)."""
+        return f"{self.provider}:{self.model}"
+
+    @property
+    def hedge_key(self):
+        """Latency key for this role's hedge threshold: long judge replies and short agent lines differ."""
+        return f"{self.role}:{self.key}"
+
+    def _send(self, system_prompt, messages, cancel=None, quiet=False):
+        """One request. cancel (a hedge attempt's event) stops it like an interrupt; quiet drops on_token."""
+        if self.meter:
+            self.meter.guard()
+        key = self.key  # Before the call, in case the role is downgraded meanwhile
+        usage = {}
+        started = time.perf_counter()
+
+        def send(ollama_url):
+            return chat(
+                self.provider, ollama_url, self.ollama_model, self.anthropic_model,
+                system_prompt, messages, cache=self.cache, timeout=self.timeout,
+                max_words=self.max_words, stop=self.stop, max_tokens=self.max_tokens, usage=usage,
+                on_token=None if quiet else self.on_token, temperature=self.temperature, options=self.options,
+                cancel=either(self.cancel, cancel),
+            )
+
+        try:
+            if self.pool and self.provider == "ollama":
+                with self.pool.lease(self.role, self.ollama_model) as ollama_url:
+                    return send(ollama_url)
+            return send(self.ollama_url)
+        except Interrupted:
+            raise  # Cut off on purpose, not a failure
+        except Exception:
+            metrics.inc("duet_llm_errors_total", help="Failed LLM requests", role=self.role, backend=key)
+            raise
+        finally:
+            # Failed and cut-off calls still cost whatever was generated; cache hits leave usage empty
+            if usage:
+                seconds = time.perf_counter() - started
+                output_tokens = usage.get("output_tokens", 0)
+                if self.meter:
+                    self.meter.record(
+                        self.role, key, usage.get("input_tokens", 0), output_tokens,
+                        seconds, estimated=usage.get("estimated", False),
+                    )
+                metrics.observe("duet_llm_latency_seconds", seconds, help="LLM request latency",
+                                role=self.role, backend=key)
+                metrics.inc("duet_llm_output_tokens_total", output_tokens, help="Generated tokens",
+                            role=self.role, backend=key)
+                if seconds > 0:
+                    metrics.set("duet_llm_tokens_per_second", round(output_tokens / seconds, 2),
+                                help="Generation speed of the latest request", role=self.role, backend=key)
+
+    def downgrade(self, provider, model):
+        """Switch this role to a cheaper backend (soft budget reached)."""
+        self.options = None  # Tuned for the previous model
+        self.provider = provider
+        if provider == "anthropic":
+            self.anthropic_model = model
+        else:
+            self.ollama_model = model
+
+    def _call_once(self, system_prompt, messages, cancel=None, quiet=False):
+        with profiler.span(f"llm {self.role}", cat="llm", backend=self.key):
+            if not self.tracker:
+                return self._send(system_prompt, messages, cancel, quiet)
+            started = time.perf_counter()
+            key = self.key
+            self.tracker.begin(key)
+            try:
+                reply = self._send(system_prompt, messages, cancel, quiet)
+            finally:
+                self.tracker.end(key)
+            seconds = time.perf_counter() - started
+            self.tracker.record(key, seconds)  # Per backend, for the router
+            self.tracker.record(self.hedge_key, seconds)
+            return reply
+
+    def _call(self, system_prompt, messages, cancel=None, quiet=False):
+        return call_with_retries(
+            lambda: self._call_once(system_prompt, messages, cancel, quiet),
+            retries=self.retries,
+            backoff=self.backoff,
+            label=f"{self.role} ({self.key})",
+        )
+
+    def chat(self, system_prompt, messages):
+        """Send one request for this role, applying its timeout/retry/hedge policy."""
+        hedge_after = None
+        if self.fallback and self.tracker and self.tracker.count(self.hedge_key) >= self.hedge_min_samples:
+            hedge_after = self.tracker.p95(self.hedge_key)
+
+        if hedge_after is None:
+            try:
+                return self._call(system_prompt, messages)
+            except Exception as e:
+                if not self.fallback or not should_failover(e):
+                    raise
+                print(f"[Failover] {self.role}: {self.key} failed ({type(e).__name__}), trying {self.fallback.key}")
+                return self.fallback._call(system_prompt, messages)
+
+        # The loser is cancelled once the winner returns; the fallback never streams into the display
+        reply, winner = hedged_call(
+            lambda cancel: self._call(system_prompt, messages, cancel),
+            lambda cancel: self.fallback._call(system_prompt, messages, cancel, quiet=True),
+            hedge_after,
+            should_failover=should_failover,
+            label=f"{self.role} ({self.key} / {self.fallback.key})",
+        )
+        if winner == "fallback":
+            print(f"[Hedge] {self.role}: {self.fallback.key} answered before {self.key} (p95 {hedge_after:.1f}s)")
+        return reply
+
+
+def downgrade_roles(roles, provider, model):
+    """
+    Point every backend at provider:model unless it is already cheaper per token.
+    Returns the roles that changed.
+    """
+    target = f"{provider}:{model}"
+    target_rate = sum(price(target))
+    changed = []
+    for role, chat_role in roles.items():
+        backends = chat_role.backends if isinstance(chat_role, RoutedChat) else [chat_role]
+        for backend in backends:
+            if backend.key != target and sum(price(backend.key)) >= target_rate:
+                backend.downgrade(provider, model)
+                if role not in changed:
+                    changed.append(role)
+    return changed
+
+
+def stable_key(chat_role):
+    """
+    Configured backend identity of a role, for on-disk caches: a RoutedChat's sorted
+    backend list rather than its key, which is whichever backend answered last.
+    """
+    if isinstance(chat_role, RoutedChat):
+        return "+".join(sorted(backend.key for backend in chat_role.backends))
+    return chat_role.key
+
+
+def iter_backends(roles, role_ids=None):
+    """Every RoleChat behind the given roles (all by default): routed backends and hedge fallbacks included."""
+    for role in role_ids or roles:
+        chat_role = roles[role]
+        for backend in chat_role.backends if isinstance(chat_role, RoutedChat) else [chat_role]:
+            yield backend
+            if backend.fallback:
+                yield backend.fallback
+
+
+def bump_temperature(roles, role_ids, bump=None):
+    """
+    Raise the sampling temperature of role_ids by bump over the provider default,
+    on every backend and hedge fallback. bump=None restores the defaults.
+    """
+    for target in iter_backends(roles, role_ids):
+        if bump is None:
+            target.temperature = None
+        elif target.provider != "anthropic":  # Claude already samples at its maximum (1.0) by default
+            target.temperature = min(2.0, DEFAULT_OLLAMA_OPTIONS["temperature"] + bump)
+
+
+def parse_role_map(spec, cast=str):
+    """
+    Parse a 'role=value,role=value' CLI spec into a dict.
+
+    Example: parse_role_map("room=10,judge=90", float) -> {"room": 10.0, "judge": 90.0}
+    """
+    result = {}
+    if not spec:
+        return result
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if "=" not in item:
+            raise ValueError(f"Expected role=value, got '{item}'")
+        role, value = item.split("=", 1)
+        result[role.strip().lower()] = cast(value.strip())
+    return result
+
+
+def create_log_file(topic, explicit_path=None, details=None):
+    """
+    Create the markdown log with its header and return the path.
+    details adds '- **Key:** value' header lines (cast, models) for archive.py.
+    """
+    if explicit_path:
+        # If explicit path has a directory component, ensure it exists
+        directory = os.path.dirname(explicit_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        path = explicit_path
+    else:
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        safe_topic = "".join(
+            c for c in topic[:40] if c.isalnum() or c in (" ", "-", "_")
         ).strip()
         safe_topic = safe_topic.replace(" ", "_") or "conversation"
         os.makedirs("logs", exist_ok=True)
@@ -512,11 +1464,35 @@ def create_log_file(topic, explicit_path=None):
     with open(path, "w", encoding="utf-8") as f:
         f.write(f"# LLM Duet Conversation\n\n")
         f.write(f"- **Start time:** {datetime.now().isoformat(timespec='seconds')}\n")
-        f.write(f"- **Topic:** {topic}\n\n")
-        f.write("---\n\n")
+        f.write(f"- **Topic:** {topic}\n")
+        for key, value in (details or {}).items():
+            f.write(f"- **{key}:** {value}\n")
+        f.write("\n---\n\n")
     return path
 
 
+def format_pairs(mapping):
+    """{'a': 'Jamie', 'b': 'Riley'} -> 'a=Jamie; b=Riley' (log header values, read back by parse_pairs)."""
+    return "; ".join(f"{k}={v}" for k, v in mapping.items())
+
+
+def parse_pairs(text):
+    """Inverse of format_pairs."""
+    pairs = {}
+    for item in text.split(";"):
+        key, sep, value = item.partition("=")
+        if sep and key.strip():
+            pairs[key.strip()] = value.strip()
+    return pairs
+
+
+def backend_label(chat_role):
+    """'ollama:mistral', or 'route(ollama:mistral|anthropic:...)' for a routed role."""
+    if isinstance(chat_role, RoutedChat):
+        return "route(" + "|".join(b.key for b in chat_role.backends) + ")"
+    return chat_role.key
+
+
 def clean_response(text):
     """Remove bracketed meta-commentary and word counts from model output."""
     # Remove [bracketed content] and (parenthetical meta-commentary)
@@ -539,12 +1515,200 @@ def append_log(log_path, speaker_name, text):
         f.write("\n\n")
 
 
+def create_transcript(transcript_path, header):
+    """Start a JSONL transcript with its header record (topic, started, cast, models)."""
+    directory = os.path.dirname(transcript_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(transcript_path, "w", encoding="utf-8") as f:
+        record = dict(header, started=datetime.now().isoformat(timespec="seconds"))
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def append_transcript(transcript_path, role, persona, text):
+    """Append one structured message record (role is a, b, judge, user or room)."""
+    if not transcript_path:
+        return
+    record = {
+        "ts": round(time.time(), 3),
+        "role": role,
+        "speaker": persona["name"],
+        "short": persona["short_name"],
+        "text": clean_response(text),
+    }
+    with open(transcript_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# Conversational style guidelines (shared by all agents)
+CONVO_GUIDELINES = """
+*** KEEP IT SHORT. TALK LIKE YOU'RE TEXTING. ***
+
+You're friends debating over drinks. Fast, messy, casual.
+
+RULES:
+- Keep responses under 20 words.
+- Short punchy sentences. No clause-chaining.
+- No em-dashes to connect thoughts. No "and also" or "but also."
+- Talk like texting. Fragments OK.
+- MEANDER. Go on tangents. Bring up random related things. Don't stay on one point.
+- No meta-openers like "Here's my question" or "Let me be real" or "OK so." Just say it.
+
+BAD (meta-opener): "OK so here's my actual question: what's missing?"
+BAD (looping): Restating the same point about consciousness again.
+
+GOOD: "What's missing though?"
+GOOD: "That reminds me of something totally different actually."
+GOOD: "Forget that. What about forgeries?"
+
+*** NEVER OUTPUT WORD COUNTS, BRACKETS, OR META-COMMENTARY. JUST SPEAK NATURALLY. ***
+"""
+
+
+def join_names(names):
+    """'A', 'A and B', 'A, B and C'."""
+    names = list(names)
+    if len(names) <= 1:
+        return "".join(names)
+    return ", ".join(names[:-1]) + " and " + names[-1]
+
+
+def build_agent_prompt(persona, other_names, topic):
+    """System prompt for a duet agent talking with the other_names about topic."""
+    if len(other_names) == 1:
+        cast_line = (
+            f"The other participant in this conversation is {other_names[0]}. "
+            "You are having a back-and-forth dialogue with them.\n\n"
+        )
+    else:
+        cast_line = (
+            f"The other participants in this conversation are {join_names(other_names)}. "
+            "You are having a group discussion, taking turns to speak.\n\n"
+        )
+    return (
+        persona["text"]
+        + "\n\n"
+        + cast_line
+        + CONVO_GUIDELINES
+        + "\nThe human provided this starting topic. Use it as the thread for the dialogue:\n"
+        + topic
+    )
+
+
+def build_cast_prompts(personas, topic):
+    """System prompt per agent id, each naming the rest of the cast."""
+    return {
+        agent_id: build_agent_prompt(
+            persona, [p["name"] for other_id, p in personas.items() if other_id != agent_id], topic
+        )
+        for agent_id, persona in personas.items()
+    }
+
+
+def opening_prompt(other_names):
+    """Host prompt that has the first agent open the conversation."""
+    return (
+        "The human has just given the topic above. "
+        f"Start the conversation by making the first move and inviting {join_names(other_names)} to respond."
+    )
+
+
+def whisper_nudge(whisper, first=True):
+    """Prompt that puts a room whisper in front of an agent: forceful the first time, subtler when reinforcing."""
+    if first:
+        return f"[IMPORTANT: Someone nearby just said \"{whisper}\" — acknowledge this and shift your conversation toward it. Don't ignore it.]"
+    return f"[Keep weaving in the topic of \"{whisper}\" — stay with it for now.]"
+
+
+def build_judge_prompt(judge_persona, names):
+    """System prompt for the judge/referee."""
+    return (
+        judge_persona["text"]
+        + "\n\nYou are a neutral judge/referee analyzing the dialogue "
+        f"between {join_names(names)}. You comment only when asked, "
+        "and you focus on clarity, rigor, and synthesis."
+    )
+
+
+def build_user_prompt(user_persona):
+    """System prompt for the user persona."""
+    return (
+        user_persona["text"]
+        + "\n\nYou are a third voice occasionally stepping into the dialogue. "
+        "You represent the human who started the topic, asking sharp questions, "
+        "connecting ideas, or redirecting when helpful."
+    )
+
+
+def build_room_prompt(room_persona, names):
+    """System prompt for the whispering room."""
+    return (
+        room_persona["text"]
+        + f"\n\nYou are whispering to {join_names(names)}. "
+        "When given something you overheard, turn it into a brief whisper that might nudge their conversation. "
+        "Keep it to ONE sentence, max 15 words. Be subtle and poetic."
+    )
+
+
+def generate_whisper(room_chat, system_prompt_r, topic):
+    """Turn an overheard topic into a one-line room whisper."""
+    # Fresh conversation per whisper keeps the Room focused on one topic
+    # (an accumulating history makes it dump several topics at once)
+    prompt = (
+        f"You overheard: \"{topic}\"\n\n"
+        "Output ONE short sentence (under 10 words). No formatting. Just the whisper."
+    )
+    conversation_r = [
+        {"role": "system", "content": system_prompt_r},
+        {"role": "user", "content": prompt},
+    ]
+    r_reply = room_chat.chat(system_prompt_r, conversation_r)
+    r_reply_clean = clean_response(r_reply)
+    # Extra cleanup - strip markdown formatting the model might add
+    r_reply_clean = r_reply_clean.lstrip('#*-123456789. ')
+    r_reply_clean = r_reply_clean.replace('**', '').replace('*', '')
+    return r_reply_clean
+
+
 def main():
     args = parse_args()
 
-    # Validate provider
+    # The cast: -A/-B, or any number of personas with --cast
+    cast_paths = args.cast or [args.agentA, args.agentB]
+    if not 2 <= len(cast_paths) <= len(AGENT_IDS):
+        print(f"Error: --cast needs between 2 and {len(AGENT_IDS)} persona files")
+        return
+    for path in cast_paths:
+        if not os.path.exists(path):
+            print(f"Error: Persona not found: {path}")
+            return
+    agent_paths = dict(zip(AGENT_IDS, cast_paths))
+    agent_ids = list(agent_paths)
+    # Agents beyond a and b are configured like any other role (c=..., d=...)
+    role_names = ROLE_NAMES + tuple(agent_ids[2:])
+
+    # Validate providers (global default plus per-role overrides)
     provider = args.provider
-    if provider == "anthropic" and not HAS_ANTHROPIC:
+    try:
+        role_providers = parse_role_map(args.role_providers)
+        role_models = parse_role_map(args.role_models)
+        role_timeouts = parse_role_map(args.role_timeouts, float)
+        word_budgets = dict(DEFAULT_WORD_BUDGETS, **parse_role_map(args.word_budgets, int))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    for flag, mapping in (("--role-providers", role_providers), ("--role-models", role_models),
+                          ("--role-timeouts", role_timeouts), ("--word-budgets", word_budgets)):
+        unknown = set(mapping) - set(role_names)
+        if unknown:
+            print(f"Error: {flag}: unknown role(s) {', '.join(sorted(unknown))} (use {', '.join(role_names)})")
+            return
+    bad = {p for p in role_providers.values() if p not in ("ollama", "anthropic")}
+    if bad:
+        print(f"Error: --role-providers: unknown provider(s) {', '.join(sorted(bad))}")
+        return
+    providers = {role: role_providers.get(role, provider) for role in role_names}
+    if "anthropic" in providers.values() and not HAS_ANTHROPIC:
         print("Error: anthropic package not installed. Run: pip install anthropic")
         return
 
@@ -565,22 +1729,216 @@ def main():
 
     use_color = not args.no_color
 
+    # Hedge fallback
+    hedge_provider = hedge_model = None
+    if args.hedge_to:
+        hedge_provider, _, hedge_model = args.hedge_to.partition(":")
+        if hedge_provider not in ("ollama", "anthropic") or not hedge_model:
+            print("Error: --hedge-to must look like 'ollama:MODEL' or 'anthropic:MODEL'")
+            return
+        if hedge_provider == "anthropic" and not HAS_ANTHROPIC:
+            print("Error: anthropic package not installed. Run: pip install anthropic")
+            return
+
+    # Token/cost budgets
+    try:
+        hard_budget = parse_role_map(args.budget, float)
+        soft_budget = parse_role_map(args.soft_budget, float)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    for flag, mapping in (("--budget", hard_budget), ("--soft-budget", soft_budget)):
+        unknown = set(mapping) - set(BUDGET_KEYS)
+        if unknown:
+            print(f"Error: {flag}: unknown budget(s) {', '.join(sorted(unknown))} (use {', '.join(BUDGET_KEYS)})")
+            return
+    downgrade_provider = downgrade_model = None
+    if args.downgrade_to:
+        downgrade_provider, _, downgrade_model = args.downgrade_to.partition(":")
+        if downgrade_provider not in ("ollama", "anthropic") or not downgrade_model:
+            print("Error: --downgrade-to must look like 'ollama:MODEL' or 'anthropic:MODEL'")
+            return
+    meter = UsageMeter(hard=hard_budget, soft=soft_budget)
+
+    # Loop detection
+    loop_interventions = [a.strip() for a in args.loop_interventions.split(",") if a.strip()]
+    unknown = set(loop_interventions) - set(INTERVENTIONS)
+    if unknown:
+        print(f"Error: --loop-interventions: unknown intervention(s) {', '.join(sorted(unknown))} "
+              f"(use {', '.join(INTERVENTIONS)})")
+        return
+    route_roles = set()
+    if args.route != "off":
+        route_roles = {r.strip() for r in args.route_roles.split(",") if r.strip()}
+        unknown = route_roles - set(role_names)
+        if unknown:
+            print(f"Error: --route-roles: unknown role(s) {', '.join(sorted(unknown))}")
+            return
+    cadence_fallback = None
+    if args.turn_deadline > 0 and args.cadence_model:
+        cadence_provider, _, cadence_model = args.cadence_model.partition(":")
+        if cadence_provider not in ("ollama", "anthropic") or not cadence_model:
+            print("Error: --cadence-model must look like 'ollama:MODEL' or 'anthropic:MODEL'")
+            return
+        cadence_fallback = (cadence_provider, cadence_model)
+    if args.interrupt and not args.listen:
+        print("Error: --interrupt needs --listen")
+        return
+    for flag, path in (("Visual image", args.visual_image if args.visual or args.display_port else None),
+                       ("Icebreakers file", args.icebreakers),
+                       ("Room persona", "personas/room.md" if args.listen or args.icebreakers else None)):
+        if path and not os.path.exists(path):
+            print(f"Error: {flag} not found: {path}")
+            return
+    if args.listen and not HAS_LISTENER:
+        print("Error: listener module not available.")
+        print("Make sure listener.py is in the same directory.")
+        return
+
+    loop_detector = None
+    if args.loop_threshold > 0 and loop_interventions:
+        if HAS_NUMPY:
+            loop_detector = LoopDetector(
+                window=args.loop_window,
+                threshold=args.loop_threshold,
+                patience=args.loop_patience,
+                cooldown=args.loop_cooldown * len(agent_ids),
+            )
+        else:
+            print("Warning: numpy not installed, loop detection disabled. Run: pip install numpy")
+
+    # Response cache setup
+    cache = None
+    if args.cache != "off":
+        cache = ResponseCache(
+            args.cache_path,
+            mode=args.cache,
+            max_bytes=int(args.cache_size_mb * 1024 * 1024),
+        )
+        print(f"Response cache: {args.cache} ({args.cache_path})")
+
+    # Ollama endpoint pool: agents stick to one warm endpoint, other roles balance by load
+    pool = None
+    if args.ollama_urls:
+        try:
+            pins = parse_role_map(args.ollama_pins)
+            unknown = set(pins) - set(role_names)
+            if unknown:
+                raise ValueError(f"--ollama-pins: unknown role(s) {', '.join(sorted(unknown))}")
+            pool = OllamaPool([u for u in args.ollama_urls.split(",") if u.strip()], pins=pins, sticky=agent_ids)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+    # Tuned Ollama options (autotune.py); an empty profile leaves every role on the defaults
+    ollama_profile = OptionsProfile(None if args.ollama_profile == "off" else args.ollama_profile)
+    if ollama_profile:
+        print(f"Ollama profile: {args.ollama_profile} ({len(ollama_profile.data['models'])} tuned models)")
+
+    # Chat backend per role
+    tracker = LatencyTracker()
+
+    def make_backend(role, role_provider, ollama_model, anthropic_model):
+        # --role-models applies to the role's configured provider
+        if role in role_models and role_provider == providers[role]:
+            if role_provider == "anthropic":
+                anthropic_model = role_models[role]
+            else:
+                ollama_model = role_models[role]
+        timeout = role_timeouts.get(role, args.timeout)
+        max_words = 0 if args.no_early_stop else word_budgets.get(role, word_budgets["a"])
+        stop = None
+        if max_words:
+            # The room whisper is a single line
+            stop = DEFAULT_STOP_SEQUENCES + (["\n"] if role == "room" else [])
+        # Batch judge replies carry JSON scores for a whole window
+        max_tokens = None
+        if role == "judge" and args.judge_mode == "batch":
+            max_tokens = 80 + 40 * args.judge_window
+        fallback = None
+        if hedge_provider:
+            fallback = RoleChat(
+                role, hedge_provider, ollama_url, hedge_model, hedge_model,
+                timeout=timeout, retries=0, cache=cache, tracker=tracker,
+                max_words=max_words, stop=stop, max_tokens=max_tokens, meter=meter,
+                options=ollama_profile.options(role, hedge_model) if hedge_provider == "ollama" else None,
+                pool=pool,
+            )
+        return RoleChat(
+            role, role_provider, ollama_url, ollama_model, anthropic_model,
+            timeout=timeout, retries=args.retries, backoff=args.retry_backoff,
+            cache=cache, tracker=tracker, fallback=fallback,
+            hedge_min_samples=args.hedge_min_samples,
+            max_words=max_words, stop=stop, max_tokens=max_tokens, meter=meter,
+            options=ollama_profile.options(role, ollama_model) if role_provider == "ollama" else None,
+            pool=pool,
+        )
+
+    role_defaults = {
+        "a": (model_a, anthropic_model_a),
+        "b": (model_b, anthropic_model_b),
+        "judge": (model_judge, anthropic_model_judge),
+        "user": (model_user, anthropic_model_user),
+        "room": (args.model, args.anthropic_model),
+    }
+    for agent_id in agent_ids[2:]:
+        role_defaults[agent_id] = (args.model, args.anthropic_model)
+
+    # Routed roles may use any available provider; the rest are fixed
+    router = None
+    if args.route != "off":
+        router = Router(tracker, mode=args.route)
+    available = ["ollama"]
+    if HAS_ANTHROPIC and os.environ.get("ANTHROPIC_API_KEY"):
+        available.append("anthropic")
+
+    roles = {}
+    for role in role_names:
+        ollama_model, anthropic_model = role_defaults[role]
+        if role in route_roles and len(available) > 1:
+            # Configured provider first so it wins ties before any samples exist
+            order = [providers[role]] + [p for p in available if p != providers[role]]
+            roles[role] = RoutedChat(
+                role,
+                [make_backend(role, p, ollama_model, anthropic_model) for p in order],
+                router,
+            )
+        else:
+            roles[role] = make_backend(role, providers[role], ollama_model, anthropic_model)
+
+    if role_providers or role_models or router:
+        summary = ", ".join(f"{role}={backend_label(chat_role)}" for role, chat_role in roles.items())
+        print(f"Roles: {summary}")
+
     # Visual mode setup
     visualizer = None
     if args.visual:
-        image_path = args.visual_image
-        if not os.path.exists(image_path):
-            print(f"Error: Visual image not found: {image_path}")
-            return
-        visualizer = ComicVisualizer(image_path, show_both=args.visual_both)
+        visualizer = ComicVisualizer(args.visual_image, show_both=args.visual_both)
+
+    # Browser display: screens render the balloons themselves from pushed events
+    display = None
+    if args.display_port:
+        display = DisplayServer(
+            args.visual_image,
+            ComicVisualizer.LEFT_BALLOON,
+            ComicVisualizer.RIGHT_BALLOON,
+            scale=ComicVisualizer.SCALE,
+            show_both=args.visual_both,
+            max_queue=args.display_queue,
+        )
+        # Stream partial replies of balloon roles (primary backends only; hedge fallbacks stay quiet)
+        for agent_id in agent_ids:
+            chat_role = roles[agent_id]
+            for backend in chat_role.backends if isinstance(chat_role, RoutedChat) else [chat_role]:
+                backend.on_token = lambda text, side=agent_side(agent_id): display.token(side, text)
+
+    # Parsed personas/icebreakers, hot-reloaded at turn boundaries when edited
+    registry = PersonaRegistry(min_interval=args.reload_interval)
 
     # Icebreakers setup
     icebreaker_data = None
     if args.icebreakers:
-        if not os.path.exists(args.icebreakers):
-            print(f"Error: Icebreakers file not found: {args.icebreakers}")
-            return
-        icebreaker_data = load_icebreakers(args.icebreakers)
+        icebreaker_data = registry.load(args.icebreakers, load_icebreakers)
         if not icebreaker_data["topics"]:
             print(f"Warning: No topics found in {args.icebreakers}")
             icebreaker_data = None
@@ -594,17 +1952,9 @@ def main():
     # Load room persona if EITHER listening or icebreakers are enabled
     # (room persona transforms topics into whispers for injection)
     if args.listen or icebreaker_data:
-        room_persona_path = "personas/room.md"
-        if not os.path.exists(room_persona_path):
-            print(f"Error: Room persona not found: {room_persona_path}")
-            return
-        room_persona = load_persona(room_persona_path)
+        room_persona = registry.load("personas/room.md", load_persona)
 
     if args.listen:
-        if not HAS_LISTENER:
-            print("Error: listener module not available.")
-            print("Make sure listener.py is in the same directory.")
-            return
         if not check_listener_deps():
             return
 
@@ -614,148 +1964,172 @@ def main():
         if icebreaker_data:
             print("Note: Icebreakers will feed into the same topic queue as ambient listening.")
 
+    # Speech-to-reaction timing, and pre-emptive interruption of the speaking agent
+    interrupts = None
+    if listener:
+        interrupts = SpeechInterrupts(enabled=args.interrupt, cooldown=args.interrupt_cooldown)
+        listener.on_topic = interrupts.heard
+        if args.interrupt:
+            for backend in iter_backends(roles, agent_ids):
+                backend.cancel = interrupts.pending
+            print(f"Interrupts: speech cuts off the speaking agent (at most every {args.interrupt_cooldown:.0f}s)")
+
     topic = input("Enter start topic (word or full prompt): ").strip()
     if not topic:
         print("No topic entered, exiting.")
         return
 
-    # Load core personas
-    persona_a = load_persona(args.agentA)
-    persona_b = load_persona(args.agentB)
-
-    name_a = persona_a["name"]
-    short_a = persona_a["short_name"]
-    text_a = persona_a["text"]
-
-    name_b = persona_b["name"]
-    short_b = persona_b["short_name"]
-    text_b = persona_b["text"]
+    # Load the cast
+    personas = {agent_id: registry.load(path, load_persona) for agent_id, path in agent_paths.items()}
+    names = {agent_id: persona["name"] for agent_id, persona in personas.items()}
 
     # Optional judge persona
     judge_persona = None
     if args.judge_persona:
-        judge_persona = load_persona(args.judge_persona)
+        judge_persona = registry.load(args.judge_persona, load_persona)
 
     # Optional user persona
     user_persona = None
     if args.user_persona:
-        user_persona = load_persona(args.user_persona)
+        user_persona = registry.load(args.user_persona, load_persona)
 
     # Create log
-    log_path = create_log_file(topic, args.logfile)
+    # Who is who and on which model, in the log and transcript headers (indexed by archive.py)
+    cast = {agent_id: persona["name"] for agent_id, persona in personas.items()}
+    for role, persona in (("judge", judge_persona), ("user", user_persona), ("room", room_persona)):
+        if persona:
+            cast[role] = persona["name"]
+    models = {role: backend_label(roles[role]) for role in cast}
+    log_details = {"Cast": format_pairs(cast), "Models": format_pairs(models)}
+    transcript_path = args.transcript
+    transcript_header = {"topic": topic, "cast": cast, "models": models}
+
+    # Log rotation: a run at an explicit path (such as one restarted by supervise.py) keeps the previous file
+    rotator = LogRotator(
+        max_bytes=int(args.rotate_mb * 1024 * 1024),
+        max_age=args.rotate_hours * 3600,
+        keep=args.log_keep,
+    )
+    if rotator:
+        for path in (args.logfile, transcript_path):
+            segment = rotator.archive(path)
+            if segment:
+                print(f"Previous log archived as: {segment}")
+
+    log_path = create_log_file(topic, args.logfile, log_details)
     print(f"Logging conversation to: {log_path}")
-    line = f"Participants: {name_a} ({short_a}), {name_b} ({short_b})"
+    profile_path = None
+    if args.profile:
+        profile_path = args.profile_path or os.path.splitext(log_path)[0] + ".trace.json"
+        profiler.enable()
+    if transcript_path:
+        create_transcript(transcript_path, transcript_header)
+    if rotator:
+        rotator.track(log_path, lambda: create_log_file(topic, log_path, log_details))
+        rotator.track(transcript_path, lambda: create_transcript(transcript_path, transcript_header))
+        limits = [f"{args.rotate_mb:g} MB" if args.rotate_mb else "", f"{args.rotate_hours:g}h" if args.rotate_hours else ""]
+        print(f"Log rotation: every {' or '.join(l for l in limits if l)}, "
+              f"keeping {args.log_keep or 'all'} compressed segments")
+    line = "Participants: " + ", ".join(f"{p['name']} ({p['short_name']})" for p in personas.values())
     if judge_persona:
         line += f", Judge: {judge_persona['name']} ({judge_persona['short_name']})"
     if user_persona:
         line += f", User persona: {user_persona['name']} ({user_persona['short_name']})"
     print(line + "\n")
 
-    # Conversational style guidelines (shared by all agents)
-    convo_guidelines = """
-*** KEEP IT SHORT. TALK LIKE YOU'RE TEXTING. ***
-
-You're friends debating over drinks. Fast, messy, casual.
-
-RULES:
-- Keep responses under 20 words.
-- Short punchy sentences. No clause-chaining.
-- No em-dashes to connect thoughts. No "and also" or "but also."
-- Talk like texting. Fragments OK.
-- MEANDER. Go on tangents. Bring up random related things. Don't stay on one point.
-- No meta-openers like "Here's my question" or "Let me be real" or "OK so." Just say it.
-
-BAD (meta-opener): "OK so here's my actual question: what's missing?"
-BAD (looping): Restating the same point about consciousness again.
-
-GOOD: "What's missing though?"
-GOOD: "That reminds me of something totally different actually."
-GOOD: "Forget that. What about forgeries?"
-
-*** NEVER OUTPUT WORD COUNTS, BRACKETS, OR META-COMMENTARY. JUST SPEAK NATURALLY. ***
-"""
-
-    # System messages
-    system_a = {
-        "role": "system",
-        "content": (
-            text_a
-            + "\n\n"
-            + f"The other participant in this conversation is {name_b}. "
-            "You are having a back-and-forth dialogue with them.\n\n"
-            + convo_guidelines
-            + "\nThe human provided this starting topic. Use it as the thread for the dialogue:\n"
-            + topic
-        ),
-    }
-    system_b = {
-        "role": "system",
-        "content": (
-            text_b
-            + "\n\n"
-            + f"The other participant in this conversation is {name_a}. "
-            "You are having a back-and-forth dialogue with them.\n\n"
-            + convo_guidelines
-            + "\nThe human provided this starting topic. Use it as the thread for the dialogue:\n"
-            + topic
-        ),
-    }
+    # System prompts as strings (for Anthropic) and as the first message (for Ollama)
+    system_prompts = build_cast_prompts(personas, topic)
+    system_prompt_j = build_judge_prompt(judge_persona, names.values()) if judge_persona else None
+    system_prompt_u = build_user_prompt(user_persona) if user_persona else None
 
-    # Store system prompts as strings (for Anthropic) and as message lists (for Ollama)
-    system_prompt_a = system_a["content"]
-    system_prompt_b = system_b["content"]
+    # One shared history; each agent's (and the judge's/user's) view is built from it per call
+    store = TranscriptStore(names)
+    scheduler = TurnScheduler(agent_ids, order=args.turn_order)
 
-    conversation_a = [system_a]
-    conversation_b = [system_b]
+    # Batch judge: scores every exchange in background windows instead of blocking the loop
+    batch_judge = None
+    if judge_persona and args.judge_mode == "batch":
+        results_path = args.judge_results or os.path.splitext(log_path)[0] + ".scores.jsonl"
+        batch_judge = BatchJudge(roles["judge"], system_prompt_j, results_path, window=args.judge_window)
+        print(f"Judge scores ({args.judge_window} exchanges per call) go to: {results_path}")
 
-    # Judge conversation (if any)
-    conversation_j = None
-    system_prompt_j = None
-    if judge_persona:
-        system_prompt_j = (
-            judge_persona["text"]
-            + "\n\nYou are a neutral judge/referee analyzing the dialogue "
-            f"between {name_a} and {name_b}. You comment only when asked, "
-            "and you focus on clarity, rigor, and synthesis."
-        )
-        conversation_j = [{"role": "system", "content": system_prompt_j}]
-
-    # User persona conversation (if any)
-    conversation_u = None
-    system_prompt_u = None
-    if user_persona:
-        system_prompt_u = (
-            user_persona["text"]
-            + "\n\nYou are a third voice occasionally stepping into the dialogue. "
-            "You represent the human who started the topic, asking sharp questions, "
-            "connecting ideas, or redirecting when helpful."
-        )
-        conversation_u = [{"role": "system", "content": system_prompt_u}]
-
-    # Room persona conversation (for ambient listening)
-    conversation_r = None
+    # Room persona (for ambient listening) - whispers are generated in the background
     system_prompt_r = None
+    whisper_prefetcher = None
+    whisper_cache = None
     if room_persona:
-        system_prompt_r = (
-            room_persona["text"]
-            + f"\n\nYou are whispering to {name_a} and {name_b}. "
-            "When given something you overheard, turn it into a brief whisper that might nudge their conversation. "
-            "Keep it to ONE sentence, max 15 words. Be subtle and poetic."
+        system_prompt_r = build_room_prompt(room_persona, names.values())
+
+        def make_whisper(overheard):
+            return generate_whisper(roles["room"], system_prompt_r, overheard)
+
+        # Icebreakers repeat every cycle: precompute their whispers once, in parallel, and cache on disk
+        if icebreaker_data and args.whisper_cache != "off":
+            whisper_cache = WhisperCache(args.whisper_cache, room_persona["text"], stable_key(roles["room"]))
+            topics = icebreaker_data["topics"]
+            print(f"Preparing whispers for {len(topics)} icebreaker topics...")
+            generated, cached = whisper_cache.precompute(topics, make_whisper, workers=args.precompute_workers)
+            print(f"Icebreaker whispers: {cached} cached, {generated} generated\n")
+            make_whisper = whisper_cache.wrap(make_whisper, topics)
+
+        whisper_prefetcher = WhisperPrefetcher(make_whisper)
+
+    # Turn cadence: degrade step by step when rounds run over the deadline
+    cadence = None
+    if args.turn_deadline > 0:
+        cadence = CadenceController(
+            args.turn_deadline,
+            steps=[s for s in CADENCE_STEPS if s != "template_whispers" or room_persona],
+            window=args.cadence_window,
+            short_factor=args.cadence_short_factor,
+            fallback=cadence_fallback,
+            budgets=any(backend.max_words for backend in iter_backends(roles)),
         )
-        conversation_r = [{"role": "system", "content": system_prompt_r}]
-
-    print("--- Conversation started (Ctrl-C to stop) ---\n")
-
-    # Start visual mode if enabled
-    if visualizer:
-        visualizer.start()
-
-    # Start ambient listener if enabled
-    if listener:
-        listener.start()
-        print("Ambient listening active. Speak to influence the conversation.\n")
-
-    turn = 0  # A↔B exchange counter
+        print(f"Turn deadline: {args.turn_deadline:.1f}s per round, "
+              f"steps: {', '.join(cadence.steps)}")
+
+    # Metrics endpoint: gauges are read from live objects only when scraped
+    if args.metrics_port:
+        metrics.gauge("duet_transcript_entries", lambda: len(store), help="Entries in the shared transcript store")
+        metrics.gauge("duet_cost_usd_total", lambda: round(meter.totals()["usd"], 6),
+                      help="Estimated spend so far", kind="counter")
+        if listener:
+            metrics.gauge("duet_listener_queue_depth", lambda: listener.topic_queue.qsize(),
+                          help="Transcribed topics not yet picked up by the loop")
+            metrics.gauge("duet_listener_transcriptions_total", lambda: listener.transcriptions,
+                          help="Utterances transcribed", kind="counter")
+            metrics.gauge("duet_listener_rejected_total",
+                          lambda: {(("reason", r),): n for r, n in listener.rejected.items()},
+                          help="Audio dropped before becoming a topic", kind="counter")
+        if display is not None:
+            metrics.gauge("duet_display_clients", lambda: len(display), help="Connected browser screens")
+        if pool:
+            metrics.gauge("duet_ollama_endpoint_up",
+                          lambda: {(("endpoint", r["endpoint"]),): int(r["healthy"]) for r in pool.rows()},
+                          help="Pool endpoint health (1 = up)")
+            metrics.gauge("duet_ollama_endpoint_outstanding",
+                          lambda: {(("endpoint", r["endpoint"]),): r["outstanding"] for r in pool.rows()},
+                          help="Requests in flight per pool endpoint")
+            metrics.gauge("duet_ollama_endpoint_requests_total",
+                          lambda: {(("endpoint", r["endpoint"]),): r["requests"] for r in pool.rows()},
+                          help="Requests sent per pool endpoint", kind="counter")
+
+    # Long runs: memory reports (with an optional restart limit) and a watchdog for hung turns
+    memory = MemoryMonitor(interval=args.rss_interval, limit_mb=args.max_rss)
+    watchdog = Watchdog(args.watchdog) if args.watchdog > 0 else None
+    if args.max_history:
+        print(f"History: the last {args.max_history} transcript entries are kept in memory")
+    if watchdog:
+        print(f"Watchdog: exits if no turn completes for {args.watchdog:.0f}s")
+        slowest = max([args.timeout, *role_timeouts.values()]) * (args.retries + 1)
+        if args.watchdog < slowest:
+            print(f"Warning: --watchdog {args.watchdog:g}s is shorter than a turn's timeouts and retries "
+                  f"(up to {slowest:.0f}s); slow but healthy turns may trigger it")
+    if args.installation and args.profile:
+        print("Warning: --profile keeps every span in memory; leave it off for multi-day runs")
+    exit_code = 0
+
+    turn = 0  # Round counter (every agent speaks once per round)
     pending_topic = None  # Raw topic from listener waiting to become a whisper
     pending_whisper = None  # Whisper to inject into next exchange
 
@@ -763,104 +2137,261 @@ GOOD: "Forget that. What about forgeries?"
     active_room_topic = None  # Current topic being woven into conversation
     room_topic_turns_left = 0  # How many more turns to keep this topic active
     topic_hold_turns = args.topic_hold_turns  # How many turns to hold each topic
-    topic_queue = []  # Queue of topics waiting to be introduced
+    # Topics waiting to be introduced: live speech ahead of icebreakers, stale speech expires
+    topic_queue = TopicScheduler(
+        max_size=args.topic_queue_size,
+        ttls={"listener": args.topic_ttl},
+    )
+    if args.metrics_port:
+        metrics.gauge("duet_topic_queue_length", lambda: len(topic_queue), help="Topics waiting for a whisper")
 
     # Icebreaker state
     icebreaker_index = 0  # Current position in icebreaker topic list
     rounds_since_last_icebreaker = 0  # Counter for icebreaker interval
 
-    try:
-        # First move: A starts
-        conversation_a.append(
-            {
-                "role": "user",
-                "content": (
-                    "The human has just given the topic above. "
-                    f"Start the conversation by making the first move and inviting {name_b} to respond."
-                ),
-            }
-        )
-        a_reply = chat(
-            provider, ollama_url, model_a, anthropic_model_a,
-            system_prompt_a, conversation_a
-        )
-        a_reply_clean = clean_response(a_reply)
-        print(cwrap(f"[{short_a}]:", Colors.BLUE, use_color), a_reply_clean, "\n")
-        append_log(log_path, name_a, a_reply_clean)
+    # Loop state
+    loop_due = False  # A loop was detected this round
+    hot_rounds_left = 0  # Rounds left on a temperature bump
+
+    templates = None  # Cadence: template whisper fallback while degraded (set per round)
 
-        # Update visual - A speaks first (left balloon)
+    def whispered(topic):
+        """Record speech-to-whisper latency once a queued topic became a room whisper."""
+        seconds = interrupts.whispered(topic) if interrupts else None
+        if seconds is not None:
+            metrics.observe("duet_speech_reaction_seconds", seconds, help="Audience speech to visible reaction",
+                            stage="whisper")
+
+    def poll_listener():
+        """Move newly transcribed topics from the listener into the topic queue."""
+        while True:
+            with profiler.span("listener_poll"):
+                new_topic = listener.get_topic()
+            if not new_topic:
+                return
+            status = topic_queue.push(new_topic, "listener")
+            if status == "queued" and not templates:
+                whisper_prefetcher.submit(new_topic)
+            queue_msg = f"Overheard ({status}): '{new_topic}' ({len(topic_queue)} waiting for room whisper)"
+            print(cwrap(f"[Listening]:", Colors.YELLOW, use_color), queue_msg + "\n")
+
+    def react_now(agent_id, partial=None):
+        """
+        Interrupt: whisper the overheard topic at once and put it in front of agent_id,
+        whose turn starts (again) right after. partial is the reply that was cut off, if any.
+        """
+        nonlocal active_room_topic, room_topic_turns_left, pending_whisper
+        poll_listener()
+        queued_topic = topic_queue.pop()
+        whisper_prefetcher.retain(topic_queue.snapshot() + [queued_topic])
+        if not queued_topic:
+            interrupts.dismiss()  # Merged into the active topic, or already whispered: no interrupt, no cooldown
+            return
+        interrupts.begin(cancelled=partial is not None)
+        metrics.inc("duet_interrupts_total", help="Turns interrupted by audience speech",
+                    cut_off=str(partial is not None).lower())
+        if partial is not None:
+            words = len(partial.split())
+            print(cwrap("[Interrupt]:", Colors.RED, use_color),
+                  f"{names[agent_id]} cut off after {words} word{'s' if words != 1 else ''}\n")
+        with profiler.span("whisper_take", cat="llm"):
+            whisper = whisper_prefetcher.take(queued_topic, fallback=templates)
+        room_says(whisper)
+        whispered(queued_topic)
+        active_room_topic = whisper
+        room_topic_turns_left = topic_hold_turns
+        store.prompt(agent_id, whisper_nudge(whisper))
+        pending_whisper = None
+
+    def speak(agent_id):
+        """
+        One turn for an agent: generate from its view of the store, record, print, log, render.
+        With --interrupt, audience speech cuts the reply off and the turn starts over after the whisper.
+        Returns the cleaned reply.
+        """
+        while True:
+            if interrupts and interrupts.due():
+                react_now(agent_id)
+            with profiler.span("view", cat="main", agent=agent_id):
+                messages = store.view(agent_id, system_prompts[agent_id])
+            try:
+                reply = roles[agent_id].chat(system_prompts[agent_id], messages)
+                break
+            except Interrupted as e:
+                react_now(agent_id, partial=e.partial)
+        if watchdog:
+            watchdog.feed()
+        store.say(agent_id, reply)
+        scheduler.spoke(agent_id)
+        with profiler.span("clean_response"):
+            reply_clean = clean_response(reply)
+        persona = personas[agent_id]
+        print(cwrap(f"[{persona['short_name']}]:", agent_color(agent_id), use_color), reply_clean, "\n")
+        with profiler.span("append_log", cat="io"):
+            append_log(log_path, persona["name"], reply_clean)
+            append_transcript(transcript_path, agent_id, persona, reply_clean)
+
+        # Update visual - a, c, ... left balloon; b, d, ... right balloon
+        if display is not None:
+            display.message(agent_id, agent_side(agent_id), persona["name"], reply_clean)
         if visualizer:
-            visualizer.update_left(a_reply_clean)
+            if agent_side(agent_id) == "left":
+                visualizer.update_left(reply_clean)
+            else:
+                visualizer.update_right(reply_clean)
             visualizer.process_events()
-            time.sleep(args.visual_pause)
+        reaction = interrupts.replied() if interrupts else None
+        if reaction is not None:
+            metrics.observe("duet_speech_reaction_seconds", reaction, help="Audience speech to visible reaction",
+                            stage="reply")
+        if visualizer or display:
+            with profiler.span("visual_pause", cat="sleep"):
+                time.sleep(args.visual_pause)
+        return reply_clean
+
+    def observe_loop(agent_id, reply_clean):
+        """Feed a reply to the loop detector. Returns True when the conversation is going in circles."""
+        if not loop_detector:
+            return False
+        with profiler.span("loop_check"):
+            looping = loop_detector.observe(agent_id, reply_clean)
+        metrics.set("duet_loop_similarity", round(loop_detector.last_score, 3),
+                    help="Similarity of the latest reply to the closest recent one")
+        return looping
+
+    def room_says(text):
+        """Print, log and display a room whisper."""
+        print(cwrap(f"[{room_persona['short_name']}]:", Colors.YELLOW, use_color), text, "\n")
+        append_log(log_path, room_persona["name"], text)
+        append_transcript(transcript_path, "room", room_persona, text)
+        if display is not None:
+            display.message("room", None, room_persona["name"], text)
+
+    def last_round():
+        """The latest line from each agent, in speaking order, for judge/user prompts."""
+        return "".join(
+            f"{names[agent_id]} just said:\n{clean_response(text)}\n\n"
+            for agent_id, text in store.recent(len(agent_ids))
+        )
+
+    try:
+        # Health checks and servers start here, so the early returns above leave nothing running
+        if pool:
+            pool.start(interval=args.pool_health_interval)
+            print(f"Ollama pool: {len(pool.endpoints)} endpoints, {pool.healthy_count()} healthy")
+        if display is not None:
+            try:
+                display.start(args.display_port, host=args.display_host)
+            except OSError as e:
+                print(f"Error: Could not start display server on {args.display_host}:{args.display_port} ({e})")
+                display = None
+                return 1
+            print(f"Display: http://{args.display_host}:{args.display_port}/")
+        if args.metrics_port:
+            try:
+                metrics.serve(args.metrics_port, host=args.metrics_host)
+            except OSError as e:
+                print(f"Error: Could not start metrics endpoint on {args.metrics_host}:{args.metrics_port} ({e})")
+                return 1
+            print(f"Metrics: http://{args.metrics_host}:{args.metrics_port}/metrics")
 
-        # Brevity reminder injected each turn (square brackets get cleaned by clean_response)
-        brevity_nudge = "\n\n[Keep your reply short. One thought only.]"
+        print("--- Conversation started (Ctrl-C to stop) ---\n")
+
+        # Start visual mode if enabled
+        if visualizer:
+            visualizer.start()
+
+        # Start ambient listener if enabled
+        if listener:
+            listener.start()
+            print("Ambient listening active. Speak to influence the conversation.\n")
+
+        if watchdog:
+            watchdog.feed()
+
+        # First move: A starts
+        store.prompt("a", opening_prompt(names[agent_id] for agent_id in agent_ids[1:]))
+        observe_loop("a", speak("a"))
 
         # Main loop
         while True:
             turn += 1
-
-            # B responds to A (include whisper if pending)
-            b_input = a_reply + brevity_nudge
-            if pending_whisper:
-                # Check if this is first introduction or reinforcement
-                if room_topic_turns_left == topic_hold_turns:
-                    # First introduction - be forceful
-                    b_input += f"\n\n[IMPORTANT: Someone nearby just said \"{pending_whisper}\" — acknowledge this and shift your conversation toward it. Don't ignore it.]"
-                else:
-                    # Reinforcement - subtler nudge
-                    b_input += f"\n\n[Keep weaving in the topic of \"{pending_whisper}\" — stay with it for now.]"
-                pending_whisper = None
-            conversation_b.append({"role": "user", "content": b_input})
-            b_reply = chat(
-                provider, ollama_url, model_b, anthropic_model_b,
-                system_prompt_b, conversation_b
-            )
-            b_reply_clean = clean_response(b_reply)
-            print(cwrap(f"[{short_b}]:", Colors.MAGENTA, use_color), b_reply_clean, "\n")
-            append_log(log_path, name_b, b_reply_clean)
-
-            # Update visual - B speaks (right balloon)
-            if visualizer:
-                visualizer.update_right(b_reply_clean)
-                visualizer.process_events()
-                time.sleep(args.visual_pause)
-
-            # A responds to B
-            conversation_a.append({"role": "user", "content": b_reply + brevity_nudge})
-            a_reply = chat(
-                provider, ollama_url, model_a, anthropic_model_a,
-                system_prompt_a, conversation_a
-            )
-            a_reply_clean = clean_response(a_reply)
-            print(cwrap(f"[{short_a}]:", Colors.BLUE, use_color), a_reply_clean, "\n")
-            append_log(log_path, name_a, a_reply_clean)
-
-            # Update visual - A speaks (left balloon)
-            if visualizer:
-                visualizer.update_left(a_reply_clean)
-                visualizer.process_events()
-                time.sleep(args.visual_pause)
+            turn_started = time.perf_counter()
+
+            # Hot reload: swap edited personas/icebreakers in at the turn boundary
+            with profiler.span("reload_poll"):
+                changed = registry.poll() if args.reload_interval > 0 else []
+            if changed:
+                print(cwrap("[Reload]:", Colors.GREEN, use_color), ", ".join(changed), "\n")
+                personas = {agent_id: registry.get(path) for agent_id, path in agent_paths.items()}
+                names = {agent_id: persona["name"] for agent_id, persona in personas.items()}
+                store.names = names
+                system_prompts = build_cast_prompts(personas, topic)
+                if judge_persona:
+                    judge_persona = registry.get(args.judge_persona)
+                    system_prompt_j = build_judge_prompt(judge_persona, names.values())
+                    if batch_judge:
+                        batch_judge.system_prompt = system_prompt_j
+                if user_persona:
+                    user_persona = registry.get(args.user_persona)
+                    system_prompt_u = build_user_prompt(user_persona)
+                if room_persona:
+                    room_persona = registry.get(room_persona_path)
+                    system_prompt_r = build_room_prompt(room_persona, names.values())
+                    if whisper_cache:
+                        whisper_cache.set_persona(room_persona["text"])
+                if icebreaker_data and args.icebreakers in changed:
+                    reloaded = registry.get(args.icebreakers)
+                    if reloaded["topics"]:
+                        icebreaker_data = reloaded
+                        icebreaker_index %= len(icebreaker_data["topics"])
+                        if whisper_cache:
+                            whisper_cache.set_topics(icebreaker_data["topics"])
+                    else:
+                        print(f"Warning: No topics found in {args.icebreakers}, keeping previous list")
+
+            # Cadence steps in force this round
+            skip_interjections = cadence is not None and cadence.active("skip_interjections")
+            templates = None
+            if cadence is not None and cadence.active("template_whispers"):
+                # Whispers already cached on disk cost nothing; everything else comes from a template
+                templates = lambda t: (whisper_cache.get(t) if whisper_cache else None) or template_whisper(t)
+
+            for position, agent_id in enumerate(scheduler.start_round()):
+                # The round's first speaker hears the room whisper, if one is pending
+                if position == 0 and pending_whisper:
+                    store.prompt(agent_id, whisper_nudge(pending_whisper, first=room_topic_turns_left == topic_hold_turns))
+                    pending_whisper = None
+                if observe_loop(agent_id, speak(agent_id)):
+                    loop_due = True
+
+            # Batch judge: hand over this round, report windows scored since the last round
+            if batch_judge:
+                batch_judge.add(turn, [(names[a], clean_response(t)) for a, t in store.recent(len(agent_ids))])
+                for result in batch_judge.drain():
+                    mean = result["mean"]
+                    summary = ", ".join(f"{k} {v}" for k, v in mean.items() if v is not None)
+                    label = f"[{judge_persona['short_name']} {result['turns'][0]}-{result['turns'][1]}]:"
+                    print(cwrap(label, Colors.GREEN, use_color), summary, "\n")
+                    if result["note"]:
+                        append_log(log_path, judge_persona["name"], result["note"])
 
             # Judge interjection
-            if (
+            elif (
                 judge_persona
                 and args.judge_interval > 0
                 and turn % args.judge_interval == 0
+                and not skip_interjections
             ):
                 prompt = (
-                    f"{name_a} just said:\n{a_reply_clean}\n\n"
-                    f"{name_b} just said:\n{b_reply_clean}\n\n"
-                    "As the judge, briefly evaluate the last exchange. "
+                    last_round()
+                    + "As the judge, briefly evaluate the last exchange. "
                     "Highlight any strong points, weak points, misconceptions, "
                     "and suggest how the dialogue could go deeper or clearer next."
                 )
-                conversation_j.append({"role": "user", "content": prompt})
-                j_reply = chat(
-                    provider, ollama_url, model_judge, anthropic_model_judge,
-                    system_prompt_j, conversation_j
-                )
+                store.prompt("judge", prompt)
+                j_reply = roles["judge"].chat(system_prompt_j, store.view("judge", system_prompt_j, public=False))
+                store.say("judge", j_reply, private=True)
                 print(
                     cwrap(
                         f"[{judge_persona['short_name']}]:",
@@ -871,25 +2402,36 @@ GOOD: "Forget that. What about forgeries?"
                     "\n",
                 )
                 append_log(log_path, judge_persona["name"], j_reply)
+                append_transcript(transcript_path, "judge", judge_persona, j_reply)
+                if display is not None:
+                    display.message("judge", None, judge_persona["name"], clean_response(j_reply))
+
+            # Interjections due this round but skipped to hold the cadence
+            if skip_interjections:
+                cadence.skipped += sum(
+                    1 for persona, interval in (
+                        (None if batch_judge else judge_persona, args.judge_interval),
+                        (user_persona, args.user_interval),
+                    )
+                    if persona and interval > 0 and turn % interval == 0
+                )
 
             # User persona interjection
             if (
                 user_persona
                 and args.user_interval > 0
                 and turn % args.user_interval == 0
+                and not skip_interjections
             ):
                 prompt = (
-                    f"{name_a} just said:\n{a_reply_clean}\n\n"
-                    f"{name_b} just said:\n{b_reply_clean}\n\n"
-                    "As the user persona, step into the conversation with a short comment or question "
-                    "that pushes both agents toward more insight, rigor, or practicality. "
+                    last_round()
+                    + "As the user persona, step into the conversation with a short comment or question "
+                    "that pushes the agents toward more insight, rigor, or practicality. "
                     "You are allowed to disagree, redirect, or connect to a bigger picture."
                 )
-                conversation_u.append({"role": "user", "content": prompt})
-                u_reply = chat(
-                    provider, ollama_url, model_user, anthropic_model_user,
-                    system_prompt_u, conversation_u
-                )
+                store.prompt("user", prompt)
+                u_reply = roles["user"].chat(system_prompt_u, store.view("user", system_prompt_u, public=False))
+                store.say("user", u_reply, private=True)
                 print(
                     cwrap(
                         f"[{user_persona['short_name']}]:",
@@ -900,14 +2442,19 @@ GOOD: "Forget that. What about forgeries?"
                     "\n",
                 )
                 append_log(log_path, user_persona["name"], u_reply)
+                append_transcript(transcript_path, "user", user_persona, u_reply)
+                if display is not None:
+                    display.message("user", None, user_persona["name"], clean_response(u_reply))
 
             # Icebreaker injection - feed the topic queue on schedule
             if icebreaker_data:
                 rounds_since_last_icebreaker += 1
                 if rounds_since_last_icebreaker >= icebreaker_data["rounds_per_topic"]:
                     next_topic = icebreaker_data["topics"][icebreaker_index]
-                    topic_queue.append(next_topic)
-                    queue_msg = f"Queued: '{next_topic}' ({len(topic_queue)} waiting for room whisper)"
+                    status = topic_queue.push(next_topic, "icebreaker")
+                    if status == "queued" and not templates:
+                        whisper_prefetcher.submit(next_topic)
+                    queue_msg = f"{status.capitalize()}: '{next_topic}' ({len(topic_queue)} waiting for room whisper)"
                     print(cwrap(f"[Icebreaker]:", Colors.CYAN, use_color), queue_msg + "\n")
 
                     # Advance to next topic (wrap around to start)
@@ -916,11 +2463,7 @@ GOOD: "Forget that. What about forgeries?"
 
             # Ambient listening - queue new topics
             if listener:
-                new_topic = listener.get_topic()
-                if new_topic:
-                    topic_queue.append(new_topic)
-                    queue_msg = f"Overheard: '{new_topic}' ({len(topic_queue)} waiting for room whisper)"
-                    print(cwrap(f"[Listening]:", Colors.YELLOW, use_color), queue_msg + "\n")
+                poll_listener()
 
             # Decrement active topic counter
             if room_topic_turns_left > 0:
@@ -933,37 +2476,14 @@ GOOD: "Forget that. What about forgeries?"
                 and turn % args.listen_interval == 0
             ):
                 # If no active topic and queue has items, introduce new topic
-                if room_topic_turns_left == 0 and topic_queue:
-                    pending_topic = topic_queue.pop(0)
-
-                    # Clear Room's conversation history to keep whispers focused on one topic
-                    # This prevents the Room from accumulating and dumping multiple topics
-                    conversation_r = [{"role": "system", "content": system_prompt_r}]
-
-                    prompt = (
-                        f"You overheard: \"{pending_topic}\"\n\n"
-                        "Output ONE short sentence (under 10 words). No formatting. Just the whisper."
-                    )
-                    conversation_r.append({"role": "user", "content": prompt})
-                    r_reply = chat(
-                        provider, ollama_url, args.model, args.anthropic_model,
-                        system_prompt_r, conversation_r
-                    )
-                    r_reply_clean = clean_response(r_reply)
-                    # Extra cleanup - strip markdown formatting the model might add
-                    r_reply_clean = r_reply_clean.lstrip('#*-123456789. ')
-                    r_reply_clean = r_reply_clean.replace('**', '').replace('*', '')
-
-                    print(
-                        cwrap(
-                            f"[{room_persona['short_name']}]:",
-                            Colors.YELLOW,
-                            use_color,
-                        ),
-                        r_reply_clean,
-                        "\n",
-                    )
-                    append_log(log_path, room_persona["name"], r_reply_clean)
+                queued_topic = topic_queue.pop() if room_topic_turns_left == 0 else None
+                whisper_prefetcher.retain(topic_queue.snapshot() + [queued_topic])
+                if queued_topic:
+                    pending_topic = queued_topic
+                    with profiler.span("whisper_take", cat="llm"):
+                        r_reply_clean = whisper_prefetcher.take(pending_topic, fallback=templates)
+                    room_says(r_reply_clean)
+                    whispered(pending_topic)
 
                     # Set as active topic and store whisper for injection
                     active_room_topic = r_reply_clean
@@ -974,16 +2494,126 @@ GOOD: "Forget that. What about forgeries?"
                 elif active_room_topic and room_topic_turns_left > 0:
                     pending_whisper = active_room_topic  # Keep nudging with same topic
 
+            # Temperature bump from an earlier loop wears off
+            if hot_rounds_left > 0:
+                hot_rounds_left -= 1
+                if hot_rounds_left == 0:
+                    bump_temperature(roles, agent_ids)
+
+            # Loop detected: break the circle, escalating while loops keep coming back
+            if loop_due:
+                loop_due = False
+                available = [
+                    a for a in loop_interventions
+                    if a == "temperature" or (a == "whisper" and room_persona) or (a == "icebreaker" and icebreaker_data)
+                ]
+                action = available[min(loop_detector.level, len(available) - 1)] if available else None
+                detail = f"similarity {loop_detector.last_score:.2f} to a recent reply"
+                if action == "temperature":
+                    detail += f"; temperature +{args.loop_temp_bump} for {max(1, args.loop_cooldown)} rounds"
+                print(cwrap("[Loop]:", Colors.RED, use_color), f"{detail} -> {action or 'no intervention available'}\n")
+                loop_detector.intervened(action)
+                if action:
+                    metrics.inc("duet_loop_interventions_total", help="Loop-breaking interventions", action=action)
+                whisper = None
+                if action == "whisper":
+                    # A waiting topic if there is one, otherwise ask the room for a fresh angle
+                    queued_topic = topic_queue.pop()
+                    with profiler.span("whisper_take", cat="llm"):
+                        if queued_topic:
+                            whisper = whisper_prefetcher.take(queued_topic, fallback=templates)
+                            whispered(queued_topic)
+                        elif not templates:  # No fresh angle without an LLM call
+                            last_line = clean_response(store.recent(1)[0][1])
+                            whisper = generate_whisper(
+                                roles["room"], system_prompt_r,
+                                f"They keep circling back to this: {last_line} Suggest a completely different angle.",
+                            )
+                elif action == "icebreaker":
+                    next_topic = icebreaker_data["topics"][icebreaker_index]
+                    icebreaker_index = (icebreaker_index + 1) % len(icebreaker_data["topics"])
+                    rounds_since_last_icebreaker = 0
+                    print(cwrap("[Icebreaker]:", Colors.CYAN, use_color), f"Skipping ahead: '{next_topic}'\n")
+                    with profiler.span("whisper_take", cat="llm"):
+                        whisper = whisper_prefetcher.take(next_topic, fallback=templates)
+                elif action == "temperature":
+                    bump_temperature(roles, agent_ids, args.loop_temp_bump)
+                    hot_rounds_left = max(1, args.loop_cooldown)
+                if whisper:
+                    room_says(whisper)
+                    active_room_topic = whisper
+                    room_topic_turns_left = topic_hold_turns
+                    pending_whisper = whisper
+
+            # Running usage totals and soft budget
+            if args.usage_interval > 0 and turn % args.usage_interval == 0:
+                print(cwrap("[Usage]:", Colors.GREEN, use_color), meter.summary_line(), "\n")
+            over = meter.check_soft()
+            if over:
+                message = f"Soft budget reached ({meter.describe(over, meter.soft)})"
+                if downgrade_provider:
+                    changed_roles = downgrade_roles(roles, downgrade_provider, downgrade_model)
+                    message += f"; switched {', '.join(changed_roles) or 'no roles'} to {args.downgrade_to}"
+                print(cwrap("[Budget]:", Colors.YELLOW, use_color), message, "\n")
+
+            round_seconds = time.perf_counter() - turn_started
+            profiler.add("turn", turn_started, round_seconds, cat="loop", turn=turn)
+            metrics.inc("duet_turns_total", help="Conversation rounds completed")
+            metrics.observe("duet_turn_seconds", round_seconds, help="Round duration")
+
+            # Hold the cadence: degrade when rounds run long, recover when they are quick again
+            if cadence:
+                change = cadence.observe(round_seconds)
+                metrics.set("duet_cadence_level", cadence.level, help="Cadence degradation level (0 = full quality)")
+                if change:
+                    cadence.apply(iter_backends(roles))
+                    direction = "over" if change > 0 else "well under"
+                    print(
+                        cwrap("[Cadence]:", Colors.YELLOW, use_color),
+                        f"rounds averaging {cadence.last_mean:.1f}s, {direction} the {cadence.deadline:.1f}s deadline "
+                        f"-> level {cadence.level}/{len(cadence.steps)} ({cadence.describe()})\n",
+                    )
+
+            # Bounded memory: trim in chunks so the prompt prefix (and Ollama's cache of it) changes rarely
+            if args.max_history and len(store) > args.max_history + args.max_history // 4:
+                store.trim(args.max_history)
+
+            # New log segments when the current ones are big or old enough
+            if rotator and rotator.due():
+                try:
+                    closed = rotator.rotate()
+                    print(cwrap("[Rotate]:", Colors.GREEN, use_color), f"closed {', '.join(closed) or 'empty segments'}\n")
+                except OSError as e:
+                    print(cwrap("[Rotate]:", Colors.RED, use_color), f"rotation failed ({e}), continuing in place\n")
+
+            if memory.due():
+                memory.sample()
+                print(cwrap("[Memory]:", Colors.GREEN, use_color),
+                      f"{memory.summary_line()}, {len(store)} transcript entries\n")
+                if memory.over_limit():
+                    print(f"\nMemory limit reached ({format_mb(memory.last)} > {args.max_rss:g} MB), stopping for a restart.")
+                    exit_code = EXIT_RESTART
+                    break
+
             # Stop if max_turns reached
             if args.max_turns > 0 and turn >= args.max_turns:
                 print("\nMax turns reached, stopping conversation.")
                 break
 
-            time.sleep(0.2)
+            with profiler.span("sleep", cat="sleep"):
+                time.sleep(0.2)
 
     except KeyboardInterrupt:
         print("\n\nStopping conversation (Ctrl-C).")
+    except CacheMiss as e:
+        print(f"\n\nStopping conversation (replay cache miss: {e}).")
+    except BudgetExceeded as e:
+        print(f"\n\nStopping conversation (budget reached: {e}).")
     finally:
+        # Shutting down is progress too: the watchdog must not fire during cleanup
+        if watchdog:
+            watchdog.stop()
+
         # Clean up listener
         if listener:
             listener.stop()
@@ -992,10 +2622,90 @@ GOOD: "Forget that. What about forgeries?"
         if visualizer:
             visualizer.stop()
 
+        metrics.stop()
+
+        if pool:
+            pool.stop()
+            for row in pool.rows():
+                state = "up" if row["healthy"] else "down"
+                print(f"Pool: {row['endpoint']} {state}, {row['requests']} requests, {row['failures']} failures")
+
+        # Close browser connections
+        if display is not None:
+            display.stop()
+            print(f"Display: {display.connected} screens connected, {display.dropped} dropped as too slow")
+
+        # Topic queue counters
+        if room_persona:
+            stats = topic_queue.stats()
+            print(
+                f"Topics: {stats['queued']} queued, {stats['merged']} merged, {stats['expired']} expired, "
+                f"{stats['dropped']} dropped, {stats['served']} whispered, {stats['waiting']} still waiting"
+            )
+            print(
+                f"Whispers: {whisper_prefetcher.ready_hits} ready in time, {whisper_prefetcher.waited} waited, "
+                f"{whisper_prefetcher.fallbacks} generated inline, {whisper_prefetcher.templated} from templates"
+            )
+
+        if loop_detector:
+            print(f"Loops: {loop_detector.summary_line()}")
+        if cadence:
+            print(f"Cadence: {cadence.summary_line()}")
+        if interrupts:
+            print(f"Speech: {interrupts.summary_line()}")
+        memory.sample()
+        print(f"Memory: {memory.summary_line()}")
+        if rotator:
+            print(f"Logs: {rotator.summary_line()}")
+
+        # Let the judge finish the window it is scoring
+        if batch_judge:
+            batch_judge.shutdown()
+            print(f"Judge: {batch_judge.windows} windows scored, {batch_judge.failures} failed")
+
+        # Stop background whisper generation
+        if whisper_prefetcher:
+            whisper_prefetcher.shutdown()
+
+        # Token/cost totals per role and backend
+        rows = meter.rows()
+        if rows:
+            print("Usage:")
+            for row in rows:
+                estimated = " (estimated)" if row["estimated"] else ""
+                print(
+                    f"  {row['role']:<6} {row['key']:<40} {row['calls']:>4} calls  "
+                    f"{row['input_tokens']:>7} in / {row['output_tokens']:>6} out  "
+                    f"${row['usd']:.4f}  {row['seconds']:.1f}s{estimated}"
+                )
+            print(f"  Total: {meter.summary_line()}")
+
+        # Phase timings
+        if profile_path:
+            print("Profile:")
+            profiler.print_summary()
+            count = profiler.write_chrome_trace(profile_path)
+            print(f"Chrome trace ({count} spans) saved to: {profile_path}")
+
+        # Report and close response cache
+        if cache:
+            stats = cache.stats()
+            print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} stored")
+            cache.close()
+
     with open(log_path, "a", encoding="utf-8") as f:
         f.write("---\n\nConversation stopped.\n")
+        f.write(f"\n- **Usage:** {meter.summary_line()}\n")
+        if loop_detector:
+            f.write(f"- **Loops:** {loop_detector.summary_line()}\n")
+        if cadence:
+            f.write(f"- **Cadence:** {cadence.summary_line()}\n")
+        if interrupts:
+            f.write(f"- **Speech:** {interrupts.summary_line()}\n")
+        f.write(f"- **Memory:** {memory.summary_line()}\n")
     print(f"Final log saved to: {log_path}")
+    return exit_code
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
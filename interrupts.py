@@ -0,0 +1,139 @@
+"""
+Pre-emptive interruption for Duet LLM (--interrupt).
+
+Without it, something a visitor says waits in the topic queue until the
+current round is over and the next --listen-interval boundary comes round,
+which can be several turns. With it, the listener raises a flag the moment
+a topic is transcribed. The agent generating at that time checks the flag
+between streamed chunks, closes its stream (stopping generation on the
+server) and raises Interrupted. main() then whispers the new topic at once
+and restarts that agent's turn with the whisper in front of it.
+
+Speech-to-reaction latency (end of the utterance to the room whisper, and
+to the first agent reply after it) is tracked either way, so runs with and
+without --interrupt can be compared.
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+
+# Overheard topics whose timestamps are kept until they are whispered
+MAX_TRACKED = 32
+
+# Latency samples kept for the medians
+MAX_SAMPLES = 500
+
+
+class Interrupted(Exception):
+    """Raised inside a streamed reply when the cancel event is set."""
+
+    def __init__(self, partial=""):
+        super().__init__("generation interrupted")
+        self.partial = partial  # Text generated before the stream was closed
+
+
+class SpeechInterrupts:
+    """
+    Speech-to-reaction tracking and the interrupt flag.
+
+    Usage:
+        interrupts = SpeechInterrupts(enabled=True, cooldown=20)
+        listener.on_topic = interrupts.heard      # listener thread
+        backend.cancel = interrupts.pending       # checked while streaming
+        if interrupts.due():
+            interrupts.begin()                    # clears the flag (dismiss() when nothing is taken)
+            ...                                   # whisper the topic
+            interrupts.whispered(topic)
+        interrupts.replied()                      # after each agent reply
+    """
+
+    def __init__(self, enabled=False, cooldown=20.0):
+        """
+        Args:
+            enabled: Interrupt in-flight generation (False = only measure reaction times)
+            cooldown: Minimum seconds between interrupts, so a chatty room cannot stall the agents
+        """
+        self.enabled = enabled
+        self.cooldown = cooldown
+        self.pending = threading.Event()  # Set by the listener thread, cleared by begin()
+        self._lock = threading.Lock()
+        self._heard = {}  # Topic -> perf_counter time the utterance ended
+        self._reacting = None  # Utterance time of the latest whisper, until an agent replies to it
+        self._last_interrupt = None
+
+        # Stats
+        self.reactions = 0
+        self.interrupts = 0
+        self.cancelled = 0  # Streams closed mid-reply
+        self.suppressed = 0  # Topics heard during the cooldown (served at the next interval instead)
+        self.whisper_seconds = deque(maxlen=MAX_SAMPLES)  # Utterance end -> room whisper
+        self.reply_seconds = deque(maxlen=MAX_SAMPLES)  # Utterance end -> first agent reply after the whisper
+
+    def heard(self, topic, spoken_at=None):
+        """A topic was transcribed (called on the listener thread)."""
+        now = time.perf_counter()
+        with self._lock:
+            self._heard[topic] = spoken_at if spoken_at is not None else now
+            while len(self._heard) > MAX_TRACKED:  # Topics merged away or expired are never whispered
+                del self._heard[next(iter(self._heard))]
+            if not self.enabled:
+                return
+            if self._last_interrupt is not None and now - self._last_interrupt < self.cooldown:
+                self.suppressed += 1
+                return
+        self.pending.set()
+
+    def due(self):
+        return self.pending.is_set()
+
+    def dismiss(self):
+        """Clear the flag without counting an interrupt (the topic was merged away or already whispered)."""
+        self.pending.clear()
+
+    def begin(self, cancelled=False):
+        """Start handling an interrupt; cancelled is True when a reply was cut off for it."""
+        self.pending.clear()
+        with self._lock:
+            self._last_interrupt = time.perf_counter()
+            self.interrupts += 1
+            if cancelled:
+                self.cancelled += 1
+
+    def whispered(self, topic):
+        """The room whispered topic. Returns seconds since it was spoken, or None if it was not overheard."""
+        with self._lock:
+            spoken_at = self._heard.pop(topic, None)
+            if spoken_at is None:
+                return None
+            seconds = time.perf_counter() - spoken_at
+            self.whisper_seconds.append(seconds)
+            self.reactions += 1
+            self._reacting = spoken_at
+        return seconds
+
+    def replied(self):
+        """An agent finished a reply. Returns seconds since the utterance it reacts to, or None."""
+        with self._lock:
+            if self._reacting is None:
+                return None
+            seconds = time.perf_counter() - self._reacting
+            self.reply_seconds.append(seconds)
+            self._reacting = None
+        return seconds
+
+    def summary_line(self):
+        def median(values):
+            return f"{statistics.median(values):.1f}s" if values else "-"
+
+        line = (
+            f"{self.reactions} reactions, median {median(self.whisper_seconds)} to the whisper "
+            f"and {median(self.reply_seconds)} to the reply"
+        )
+        if self.enabled:
+            line += (
+                f"; {self.interrupts} interrupts ({self.cancelled} replies cut off, "
+                f"{self.suppressed} topics held back by the cooldown)"
+            )
+        return line
@@ -0,0 +1,185 @@
+"""
+Batched background judge for Duet LLM.
+
+Instead of one blocking free-text judge call per turn, exchanges are
+collected into a window and scored in a single call on a background
+worker. The judge answers in JSON (rigor, novelty, repetition per
+exchange), and each window is appended to a JSONL results file.
+"""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCORE_KEYS = ("rigor", "novelty", "repetition")
+
+JSON_BLOCK = re.compile(r"[\[{].*[\]}]", re.DOTALL)
+
+
+def build_window_prompt(window):
+    """
+    Judge prompt for a window of exchanges.
+
+    Args:
+        window: List of (turn, [(speaker_name, text), ...])
+    """
+    lines = []
+    for turn, exchange in window:
+        lines.append(f"Exchange {turn}:")
+        for name, text in exchange:
+            lines.append(f"{name}: {text}")
+        lines.append("")
+    turns = ", ".join(str(turn) for turn, _ in window)
+    return (
+        "\n".join(lines)
+        + "\nScore each exchange from 1 to 10 on rigor (clear, well-supported reasoning), "
+        "novelty (new ideas rather than rehashing) and repetition (10 = going in circles). "
+        "Reply with JSON only, no other text, in this shape:\n"
+        '{"scores": [{"turn": N, "rigor": N, "novelty": N, "repetition": N}, ...], '
+        '"note": "one short sentence on where the dialogue should go next"}\n'
+        f"Include one entry per exchange ({turns})."
+    )
+
+
+def _score(value):
+    try:
+        return max(1.0, min(10.0, float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_scores(reply, turns):
+    """
+    Pull scores out of a judge reply.
+
+    Accepts the requested {"scores": [...], "note": ...} shape, a bare list
+    of per-exchange scores, or one flat score object for the whole window
+    (applied to every exchange). Returns ({turn: {key: score}}, note).
+    Raises ValueError if no scores can be found.
+    """
+    match = JSON_BLOCK.search(reply)
+    if not match:
+        raise ValueError("no JSON in judge reply")
+    data = json.loads(match.group(0))
+
+    note = ""
+    if isinstance(data, dict):
+        note = str(data.get("note", "") or data.get("comment", ""))
+        entries = data.get("scores", data)
+    else:
+        entries = data
+
+    per_turn = {}
+    if isinstance(entries, dict):
+        flat = {k: _score(entries.get(k)) for k in SCORE_KEYS}
+        if all(v is None for v in flat.values()):
+            raise ValueError("judge reply has no scores")
+        per_turn = {turn: flat for turn in turns}
+    else:
+        for i, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                continue
+            turn = entry.get("turn", turns[i] if i < len(turns) else None)
+            try:
+                turn = int(turn)
+            except (TypeError, ValueError):
+                continue
+            if turn in turns:
+                per_turn[turn] = {k: _score(entry.get(k)) for k in SCORE_KEYS}
+        if not per_turn:
+            raise ValueError("judge reply has no per-exchange scores")
+    return per_turn, note
+
+
+def window_means(per_turn):
+    """Average each score over the exchanges that have it."""
+    means = {}
+    for key in SCORE_KEYS:
+        values = [s[key] for s in per_turn.values() if s.get(key) is not None]
+        means[key] = round(sum(values) / len(values), 2) if values else None
+    return means
+
+
+class BatchJudge:
+    """
+    Scores conversation windows on a background worker.
+
+    Usage:
+        judge = BatchJudge(roles["judge"], system_prompt_j, "logs/x.scores.jsonl", window=4)
+        judge.add(turn, [(name, text), ...])   # after every round
+        for result in judge.drain():           # completed windows, non-blocking
+            ...
+        judge.shutdown()
+    """
+
+    def __init__(self, judge_chat, system_prompt, results_path, window=4):
+        """
+        Args:
+            judge_chat: RoleChat/RoutedChat for the judge role
+            system_prompt: Judge system prompt (replace via the attribute on hot reload)
+            results_path: JSONL file that receives one record per scored window
+            window: Exchanges per judge call
+        """
+        self.judge_chat = judge_chat
+        self.system_prompt = system_prompt
+        self.results_path = results_path
+        self.window = max(1, window)
+        self._pending = []
+        self._done = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="judge")
+
+        # Counters
+        self.windows = 0
+        self.failures = 0
+
+    def add(self, turn, exchange):
+        """Add one exchange; a full window is sent to the judge in the background."""
+        self._pending.append((turn, exchange))
+        if len(self._pending) >= self.window:
+            window, self._pending = self._pending, []
+            self._executor.submit(self._evaluate, window, self.system_prompt)
+
+    def _evaluate(self, window, system_prompt):
+        turns = [turn for turn, _ in window]
+        # Stateless: each window is judged on its own, so the judge's context never grows
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": build_window_prompt(window)},
+        ]
+        started = time.perf_counter()
+        try:
+            reply = self.judge_chat.chat(system_prompt, messages)
+            per_turn, note = parse_scores(reply, turns)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            print(f"[Judge] Could not score turns {turns[0]}-{turns[-1]} ({type(e).__name__}: {e})")
+            return
+
+        record = {
+            "ts": round(time.time(), 3),
+            "turns": [turns[0], turns[-1]],
+            "judge": self.judge_chat.key,
+            "seconds": round(time.perf_counter() - started, 2),
+            "mean": window_means(per_turn),
+            "exchanges": [dict(turn=turn, **scores) for turn, scores in sorted(per_turn.items())],
+            "note": note,
+        }
+        with self._lock:
+            with open(self.results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.windows += 1
+            self._done.append(record)
+
+    def drain(self):
+        """Scored windows completed since the last call."""
+        with self._lock:
+            done, self._done = self._done, []
+        return done
+
+    def shutdown(self, wait=True):
+        """Finish the window being scored (if wait) and drop the unfinished one."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -12,6 +12,8 @@ from collections import deque
 
 import numpy as np
 
+from profiler import profiler
+
 # Optional imports - checked at runtime
 try:
     import sounddevice as sd
@@ -97,9 +99,17 @@ class AmbientListener:
         # Topic queue (main thread consumes this)
         self.topic_queue = queue.Queue()
 
+        # Callable(topic, spoken_at) run on the listener thread once a topic is queued
+        # (spoken_at is the perf_counter time the utterance ended), or None
+        self.on_topic = None
+
         # Recent transcriptions (for deduplication)
         self.recent_transcriptions = deque(maxlen=10)
 
+        # Counters (read by the metrics endpoint)
+        self.transcriptions = 0
+        self.rejected = {"too_short": 0, "short_text": 0, "duplicate": 0, "error": 0}
+
         # Threading
         self._running = False
         self._thread = None
@@ -172,6 +182,7 @@ class AmbientListener:
                     else:
                         # Too short, discard
                         self._audio_buffer = []
+                        self.rejected["too_short"] += 1
 
                     self._is_speaking = False
                     self._speech_start_time = None
@@ -196,19 +207,30 @@ class AmbientListener:
         audio = np.concatenate(self._audio_buffer)
         self._audio_buffer = []
 
+        # The captured utterance, as a span ending now
+        spoken_at = time.perf_counter()
+        seconds = len(audio) / self.sample_rate
+        profiler.add("listener capture", spoken_at - seconds, seconds, cat="listener")
+
         # Transcribe with Whisper
         try:
-            segments, info = self.whisper.transcribe(
-                audio,
-                language="en",
-                vad_filter=True,  # Use Whisper's built-in VAD too
-            )
-
-            text = " ".join(segment.text for segment in segments).strip()
-
-            if text and len(text) > 10:  # Filter very short transcriptions
+            with profiler.span("listener transcribe", cat="listener", audio_seconds=round(seconds, 2)):
+                segments, info = self.whisper.transcribe(
+                    audio,
+                    language="en",
+                    vad_filter=True,  # Use Whisper's built-in VAD too
+                )
+                # Segments are generated lazily; decoding happens here
+                text = " ".join(segment.text for segment in segments).strip()
+            self.transcriptions += 1
+
+            if not text or len(text) <= 10:  # Filter very short transcriptions
+                self.rejected["short_text"] += 1
+            else:
                 # Check for duplicates
-                if text.lower() not in [t.lower() for t in self.recent_transcriptions]:
+                if text.lower() in [t.lower() for t in self.recent_transcriptions]:
+                    self.rejected["duplicate"] += 1
+                else:
                     self.recent_transcriptions.append(text)
 
                     # Extract topic (for now, just use the transcription)
@@ -218,11 +240,14 @@ class AmbientListener:
                     if topic:
                         print(f"[Listener] Heard: {topic}")
                         self.topic_queue.put(topic)
+                        if self.on_topic:
+                            self.on_topic(topic, spoken_at)
 
                         # Cooldown
                         time.sleep(self.cooldown)
 
         except Exception as e:
+            self.rejected["error"] += 1
             print(f"[Listener] Transcription error: {e}")
 
     def _extract_topic(self, text: str) -> str | None:
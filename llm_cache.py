@@ -0,0 +1,212 @@
+"""
+Persistent LLM response cache for Duet LLM.
+
+Stores chat() replies in SQLite, content-addressed by provider, model,
+options and a hash of the messages. Least-recently-used entries are evicted
+once the stored responses exceed a size limit.
+
+Modes:
+    readwrite - read-through: serve hits from disk, call the provider on a miss
+    record    - always call the provider and (re)store the reply
+    replay    - serve only from disk; a miss raises CacheMiss
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+MODES = ("readwrite", "record", "replay")
+
+
+class CacheMiss(RuntimeError):
+    """Raised in replay mode when a request has no stored response."""
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with size-based LRU eviction.
+
+    Usage:
+        cache = ResponseCache(".cache/responses.sqlite", mode="readwrite")
+        key = cache.make_key("ollama", "mistral", options, system_prompt, messages)
+        reply = cache.fetch(key, "ollama", "mistral", lambda: call_provider())
+    """
+
+    def __init__(self, path=".cache/responses.sqlite", mode="readwrite", max_bytes=64 * 1024 * 1024):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file location
+            mode: One of MODES
+            max_bytes: Evict least recently used responses beyond this total size
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode '{mode}' (expected one of {', '.join(MODES)})")
+
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Background workers call chat() too, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON responses(last_used)")
+        self._conn.commit()
+
+        # Session counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(provider, model, options, system_prompt, messages):
+        """Content address for a request. System messages are folded into system_prompt."""
+        body = {
+            "provider": provider,
+            "model": model,
+            "options": options or {},
+            "system": system_prompt or "",
+            "messages": [
+                {"role": m["role"], "content": m["content"]}
+                for m in messages
+                if m["role"] != "system"
+            ],
+        }
+        encoded = json.dumps(body, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key):
+        """Return the stored response for key (refreshing its LRU position), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key, provider, model, response):
+        """Store a response and evict old entries if over the size limit."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (key, provider, model, response, size, created, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                """,
+                (key, provider, model, response, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def fetch(self, key, provider, model, compute):
+        """
+        Resolve a request according to the cache mode.
+
+        Args:
+            key: Key from make_key()
+            provider: Provider name (stored for stats)
+            model: Model name (stored for stats)
+            compute: Zero-argument callable that performs the real provider call
+        """
+        if self.mode != "record":
+            cached = self.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+            if self.mode == "replay":
+                raise CacheMiss(f"No cached response for {provider}/{model} (key {key[:12]})")
+
+        response = compute()
+        self.put(key, provider, model, response)
+        return response
+
+    def _evict(self):
+        """Drop least recently used rows until total size fits max_bytes. Caller holds the lock."""
+        if self.max_bytes <= 0:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_used ASC")
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def stats(self):
+        """Return a dict with entry count, stored bytes and session counters."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        """Remove every stored response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or clear the Duet LLM response cache.")
+    parser.add_argument("path", nargs="?", default=".cache/responses.sqlite", help="Cache database path.")
+    parser.add_argument("--clear", action="store_true", help="Delete all cached responses.")
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.path)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {args.path}")
+    stats = cache.stats()
+    print(f"{stats['entries']} responses, {stats['bytes'] / 1024:.1f} KiB in {args.path}")
+    cache.close()
@@ -0,0 +1,229 @@
+"""
+Long-running installation support for Duet LLM (--installation).
+
+Pieces for exhibits that run for days without anyone watching:
+
+- LogRotator: closes the markdown log and JSONL transcript by size or age,
+  gzips the closed segment next to it and keeps the newest few.
+- MemoryMonitor: samples the process RSS now and then, and asks for a
+  restart when it passes a limit.
+- Watchdog: dumps every thread's stack and exits when no turn completes in
+  time, so supervise.py can start a fresh process.
+
+INSTALLATION_DEFAULTS are the values --installation fills in for options
+that were not given explicitly.
+"""
+
+import faulthandler
+import glob
+import gzip
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+
+from metrics import process_rss_bytes
+
+INSTALLATION_DEFAULTS = {
+    "max_history": 400,  # Transcript entries kept (a few hundred turns is far beyond any model's context)
+    "rotate_mb": 10.0,
+    "rotate_hours": 24.0,
+    "log_keep": 30,
+    "rss_interval": 600.0,
+    "max_rss": 0.0,  # Opt-in: a sensible limit depends on the models and the machine
+    "watchdog": 300.0,
+}
+
+# Exit status asking supervise.py for a fresh process (EX_TEMPFAIL)
+EXIT_RESTART = 75
+
+# Closed segments: <stem>.<YYYYmmdd-HHMMSS>[-N]<ext>.gz
+SEGMENT_STAMP = re.compile(r"\.\d{8}-\d{6}(-\d+)?$")
+
+
+def format_mb(num_bytes):
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
+
+
+class LogRotator:
+    """
+    Size- and age-based rotation of the run's log files, with gzip and retention.
+
+    All tracked files rotate together, so a log segment and the transcript
+    segment for the same stretch of conversation share a name stem.
+
+    Usage:
+        rotator = LogRotator(max_bytes=10 * 2**20, max_age=86400, keep=30)
+        rotator.archive(log_path)                    # a previous run's file at an explicit path
+        rotator.track(log_path, lambda: create_log_file(topic, log_path))
+        if rotator.due():
+            rotator.rotate()                         # at a turn boundary
+    """
+
+    def __init__(self, max_bytes=0, max_age=0, keep=0):
+        """
+        Args:
+            max_bytes: Rotate when a tracked file reaches this size (0 = no size limit)
+            max_age: Rotate when the current segment is this many seconds old (0 = no age limit)
+            keep: Closed segments kept per file, oldest deleted first (0 = keep all)
+        """
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.files = {}  # Path -> callable that starts a fresh segment (writes the header)
+        self.opened = time.time()
+        self.rotations = 0
+        self.deleted = 0
+
+    def __bool__(self):
+        return bool(self.max_bytes or self.max_age)
+
+    def track(self, path, reopen):
+        if path:
+            self.files[path] = reopen
+
+    def due(self):
+        if self.max_age and time.time() - self.opened >= self.max_age:
+            return True
+        if self.max_bytes:
+            for path in self.files:
+                try:
+                    if os.path.getsize(path) >= self.max_bytes:
+                        return True
+                except OSError:
+                    continue
+        return False
+
+    def rotate(self):
+        """Close every tracked file as a compressed segment and start new ones. Returns the segment paths."""
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        closed = []
+        for path, reopen in self.files.items():
+            segment = self.archive(path, stamp)
+            if segment:
+                closed.append(segment)
+            reopen()
+        self.opened = time.time()
+        self.rotations += 1
+        return closed
+
+    def archive(self, path, stamp=None):
+        """
+        Move path aside as a gzipped segment named by stamp (default: its
+        modification time) and apply retention. Returns the segment path, or
+        None if there was nothing to archive.
+        """
+        if not path or not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        stem, ext = os.path.splitext(path)
+        stamp = stamp or datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y%m%d-%H%M%S")
+        base = f"{stem}.{stamp}"
+        suffix = 1
+        while os.path.exists(f"{base}{ext}") or os.path.exists(f"{base}{ext}.gz"):
+            base = f"{stem}.{stamp}-{suffix}"
+            suffix += 1
+        closed = base + ext
+        os.replace(path, closed)  # The live path is free again at once
+        try:
+            with open(closed, "rb") as src, gzip.open(closed + ".gz.tmp", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(closed + ".gz.tmp", closed + ".gz")
+            os.remove(closed)
+            closed += ".gz"
+        except OSError as e:
+            print(f"[Rotate] Could not compress {closed} ({e}); keeping it uncompressed")
+        self._prune(stem, ext)
+        return closed
+
+    def _prune(self, stem, ext):
+        if not self.keep:
+            return
+        segments = []
+        for path in glob.glob(glob.escape(stem) + ".*" + ext + "*"):
+            match = SEGMENT_STAMP.search(path[len(stem):].removesuffix(".gz").removesuffix(ext))
+            if match:
+                segments.append((match.group(0)[1:16], int(match.group(1)[1:] if match.group(1) else 0), path))
+        segments.sort()
+        for _, _, path in segments[: -self.keep]:
+            try:
+                os.remove(path)
+                self.deleted += 1
+            except OSError:
+                continue
+
+    def summary_line(self):
+        return f"{self.rotations} rotations, {self.deleted} old segments deleted"
+
+
+class MemoryMonitor:
+    """
+    Periodic RSS sampling with an optional restart limit.
+
+    Usage:
+        memory = MemoryMonitor(interval=600, limit_mb=1500)
+        if memory.due():
+            rss = memory.sample()
+            if memory.over_limit():
+                ...                                  # finish up and exit with EXIT_RESTART
+    """
+
+    def __init__(self, interval=600.0, limit_mb=0.0):
+        """
+        Args:
+            interval: Seconds between samples
+            limit_mb: RSS that triggers a restart (0 = never)
+        """
+        self.interval = interval
+        self.limit = int(limit_mb * 1024 * 1024)
+        self.started = time.monotonic()
+        self.start_rss = process_rss_bytes()  # 0 where it cannot be read
+        self.peak = self.last = self.start_rss
+        self._next = self.started + interval
+
+    def due(self):
+        return self.interval > 0 and time.monotonic() >= self._next
+
+    def sample(self):
+        self._next = time.monotonic() + self.interval
+        self.last = process_rss_bytes()
+        self.peak = max(self.peak, self.last)
+        return self.last
+
+    def over_limit(self):
+        return bool(self.limit) and self.last > self.limit
+
+    def summary_line(self):
+        if not self.last:
+            return "RSS not available on this platform"
+        hours = (time.monotonic() - self.started) / 3600
+        growth = self.last - self.start_rss
+        return (
+            f"RSS {format_mb(self.last)} ({'+' if growth >= 0 else '-'}{format_mb(abs(growth))} "
+            f"in {hours:.1f}h, peak {format_mb(self.peak)})"
+        )
+
+
+class Watchdog:
+    """
+    Exit when the conversation stops making progress.
+
+    Built on faulthandler, so it fires even if the main thread is stuck in C
+    code or holding the GIL. Before exiting (status 1) it writes every
+    thread's stack to stderr, which shows where the run hung.
+
+    Usage:
+        watchdog = Watchdog(300)
+        watchdog.feed()                              # after every completed turn
+        watchdog.stop()
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    def feed(self):
+        """(Re)arm: exit unless fed again within timeout seconds."""
+        faulthandler.dump_traceback_later(self.timeout, exit=True)
+
+    def stop(self):
+        faulthandler.cancel_dump_traceback_later()
@@ -0,0 +1,176 @@
+"""
+Loop detection for Duet LLM (--loop-threshold).
+
+Each reply is hashed into a fixed-size vector of word n-gram counts (the
+hashing trick) and stored, L2-normalised, in a small NumPy ring buffer.
+Scoring a new reply is a single matrix-vector product against the recent
+replies, so the cost per turn stays flat however long the run. When
+replies keep landing close to something said a few turns earlier, the
+conversation is going in circles and main() steps in.
+
+NumPy is optional: without it the detector reports itself unavailable.
+"""
+
+import re
+import zlib
+
+from topics import STOPWORDS
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Escalation order when loops keep coming back
+INTERVENTIONS = ("whisper", "icebreaker", "temperature")
+
+WORD = re.compile(r"[a-z0-9']+")
+
+
+def shingles(text, sizes=(1, 2, 3)):
+    """Word n-grams of the given sizes (content words only for unigrams)."""
+    words = WORD.findall(text.lower())
+    grams = [w for w in words if w not in STOPWORDS] if 1 in sizes else []
+    for n in sizes:
+        if n > 1:
+            grams.extend(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+    return grams
+
+
+class LoopDetector:
+    """
+    Rolling similarity of recent replies.
+
+    Usage:
+        detector = LoopDetector(window=8, threshold=0.55)
+        if detector.observe("a", reply):
+            ...  # Intervene, then detector.intervened(action)
+        detector.stats()
+    """
+
+    def __init__(self, window=8, threshold=0.55, patience=2, cooldown=4, dim=4096):
+        """
+        Args:
+            window: Recent replies each new reply is compared against
+            threshold: Cosine similarity that counts as repeating an earlier reply
+            patience: Consecutive repeating replies before a loop is reported
+            cooldown: Replies after an intervention before another loop can be reported
+            dim: Hashed feature dimensions
+        """
+        self.window = window
+        self.threshold = threshold
+        self.patience = patience
+        self.cooldown = cooldown
+        self.dim = dim
+        self._vectors = np.zeros((window, dim), dtype=np.float32)
+        self._sims = np.zeros((window, window), dtype=np.float32)  # Pairwise similarity of the buffer
+        self._filled = 0
+        self._next = 0
+        self._streak = 0
+        self._quiet = 0  # Replies left in the post-intervention cooldown
+        self._pending = False  # Loop reported, intervention not taken yet
+        self._since_loop = None  # Replies since the last reported loop
+
+        # Stats
+        self.replies = 0
+        self.loops = 0
+        self.level = 0  # Escalation step for the current loop (0 = first intervention)
+        self.last_score = 0.0
+        self.peak_score = 0.0
+        self._score_sum = 0.0
+        self.interventions = {}
+
+    def vectorize(self, text):
+        grams = shingles(text)
+        if not grams:
+            return None
+        buckets = np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) % self.dim for g in grams), dtype=np.int64, count=len(grams)
+        )
+        vector = np.bincount(buckets, minlength=self.dim).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def density(self):
+        """Mean pairwise similarity over the buffer (how samey the recent stretch is)."""
+        n = self._filled
+        if n < 2:
+            return 0.0
+        return float(self._sims[:n, :n].sum() / (n * (n - 1)))
+
+    def observe(self, speaker, text):
+        """
+        Add one reply. Returns True when a loop is detected and an intervention is due.
+
+        speaker is accepted for symmetry with the transcript store; replies
+        from every speaker share one window, since two agents echoing each
+        other is the most common loop.
+        """
+        vector = self.vectorize(text)
+        if vector is None:
+            return False
+        self.replies += 1
+        if self._since_loop is not None:
+            self._since_loop += 1
+
+        n = self._filled
+        sims = self._vectors[:n] @ vector if n else np.zeros(0, dtype=np.float32)
+        score = float(sims.max()) if n else 0.0
+
+        slot = self._next
+        row = np.zeros(self.window, dtype=np.float32)
+        row[:n] = sims
+        row[slot] = 0.0  # The slot being overwritten, or self
+        self._vectors[slot] = vector
+        self._sims[slot, :] = row
+        self._sims[:, slot] = row
+        self._next = (slot + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+
+        self.last_score = score
+        self.peak_score = max(self.peak_score, score)
+        self._score_sum += score
+
+        if self._pending:
+            return False
+        if self._quiet > 0:
+            self._quiet -= 1
+            return False
+        self._streak = self._streak + 1 if score >= self.threshold else 0
+        if self._streak < self.patience:
+            return False
+
+        # Loops coming back soon after an intervention escalate to the next one
+        recurring = self._since_loop is not None and self._since_loop <= 2 * (self.cooldown + self.patience)
+        self.level = self.level + 1 if recurring else 0
+        self.loops += 1
+        self._streak = 0
+        self._since_loop = 0
+        self._pending = True
+        return True
+
+    def intervened(self, action=None):
+        """Record the intervention taken (None if none was available) and start the cooldown."""
+        if action:
+            self.interventions[action] = self.interventions.get(action, 0) + 1
+        self._pending = False
+        self._quiet = self.cooldown
+
+    def stats(self):
+        return {
+            "replies": self.replies,
+            "loops": self.loops,
+            "interventions": dict(self.interventions),
+            "peak": round(self.peak_score, 3),
+            "mean": round(self._score_sum / self.replies, 3) if self.replies else 0.0,
+            "density": round(self.density(), 3),
+        }
+
+    def summary_line(self):
+        stats = self.stats()
+        actions = ", ".join(f"{k} {v}" for k, v in sorted(stats["interventions"].items()))
+        return (
+            f"{stats['loops']} detected over {stats['replies']} replies"
+            + (f" ({actions})" if actions else "")
+            + f", similarity mean {stats['mean']:.2f} / peak {stats['peak']:.2f}"
+        )
@@ -0,0 +1,203 @@
+"""
+Prometheus-style metrics endpoint for Duet LLM (--metrics-port).
+
+A tiny standard-library exporter: counters and histograms are updated in
+place by the loop and worker threads, gauges are read through callbacks
+only when /metrics is scraped, and the HTTP server runs on a daemon
+thread. When disabled every update is a single attribute check.
+"""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+RENDER_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5)
+
+
+def process_rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable, e.g. macOS)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if HAS_RESOURCE:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if os.uname().sysname == "Darwin" else rss * 1024
+    return 0
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """
+    Metric registry and exporter.
+
+    Usage:
+        from metrics import metrics
+        metrics.inc("duet_turns_total", help="Conversation rounds completed")
+        metrics.observe("duet_render_seconds", 0.02, buckets=RENDER_BUCKETS)
+        metrics.gauge("duet_topic_queue_length", lambda: len(topic_queue))
+        metrics.serve(9108)
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters = {}  # name -> {labels: value}
+        self._histograms = {}  # name -> (buckets, {labels: [bucket counts..., sum, count]})
+        self._gauges = {}  # name -> (kind, callable returning a number or {labels: value})
+        self._values = {}  # name -> {labels: value}, gauges set directly
+        self._help = {}
+        self._server = None
+        self._started = time.time()
+
+    def inc(self, name, value=1, help="", **labels):
+        """Add to a counter."""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, help="", **labels):
+        """Record one sample in a histogram."""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            bounds, series = self._histograms.setdefault(name, (tuple(buckets), {}))
+            row = series.get(key)
+            if row is None:
+                row = series[key] = [0] * len(bounds) + [0.0, 0]
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+            if help:
+                self._help.setdefault(name, help)
+
+    def set(self, name, value, help="", **labels):
+        """Set a gauge to a value."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._values.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+            if help:
+                self._help.setdefault(name, help)
+
+    def gauge(self, name, read, help="", kind="gauge"):
+        """
+        Register a metric read at scrape time (kind "counter" for totals kept elsewhere).
+
+        read() returns a number, or a dict of {(("label", "value"), ...): number}.
+        """
+        with self._lock:
+            self._gauges[name] = (kind, read)
+            if help:
+                self._help[name] = help
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def header(name, kind):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            histograms = {n: (b, {k: list(r) for k, r in s.items()}) for n, (b, s) in self._histograms.items()}
+            gauges = dict(self._gauges)
+            values = {n: dict(s) for n, s in self._values.items()}
+
+        for name, series in sorted(counters.items()):
+            header(name, "counter")
+            for key, value in series.items():
+                lines.append(f"{name}{_labels(key)} {value}")
+
+        for name, (bounds, series) in sorted(histograms.items()):
+            header(name, "histogram")
+            for key, row in series.items():
+                for i, bound in enumerate(bounds):
+                    lines.append(f"{name}_bucket{_labels(key + (('le', bound),))} {row[i]}")
+                lines.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {row[-1]}")
+                lines.append(f"{name}_sum{_labels(key)} {row[-2]:.6f}")
+                lines.append(f"{name}_count{_labels(key)} {row[-1]}")
+
+        for name, series in sorted(values.items()):
+            header(name, "gauge")
+            for key, value in series.items():
+                lines.append(f"{name}{_labels(key)} {value}")
+
+        for name, (kind, read) in sorted(gauges.items()):
+            try:
+                value = read()
+            except Exception:
+                continue  # A gauge whose source went away is simply skipped
+            header(name, kind)
+            if isinstance(value, dict):
+                for key, v in value.items():
+                    lines.append(f"{name}{_labels(key)} {v}")
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """Enable collection and serve /metrics on a daemon thread."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the conversation output
+
+        self._server = ThreadingHTTPServer((host, port), Handler)  # OSError if the port is taken
+        self._server.daemon_threads = True
+        self._started = time.time()
+        self.enabled = True
+        self.gauge("duet_process_rss_bytes", process_rss_bytes, help="Resident set size of the duet process")
+        self.gauge("duet_uptime_seconds", lambda: round(time.time() - self._started, 1),
+                   help="Seconds since metrics were enabled")
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Process-wide metrics registry shared by all modules
+metrics = Metrics()
@@ -0,0 +1,198 @@
+"""
+Ollama endpoint pool for Duet LLM (--ollama-urls).
+
+Spreads Ollama requests over several instances (local processes on
+different ports, or boxes on the LAN). Each request leases an endpoint:
+
+- Pinned roles (--ollama-pins) always use their endpoint while it is up.
+- Sticky roles (the conversation agents) are assigned an endpoint on first
+  use and keep it, so their model and prompt prefix stay warm.
+- Everything else (judge, user, room, background work) goes to the healthy
+  endpoint with the fewest outstanding requests.
+
+A background thread polls /api/tags on every endpoint. A request that fails
+to connect marks its endpoint down at once, so the retry lands elsewhere;
+the health check brings it back.
+"""
+
+import threading
+from contextlib import contextmanager
+
+import requests
+
+CHAT_PATH = "/api/chat"
+
+
+def chat_url(url):
+    """Normalise 'host:port', 'http://host:port' or a full chat URL to the chat endpoint."""
+    url = url.strip().rstrip("/")
+    if "://" not in url:
+        url = "http://" + url
+    if not url.endswith(CHAT_PATH):
+        url += CHAT_PATH
+    return url
+
+
+def model_matches(model, available):
+    """True if model (tag optional, 'mistral' == 'mistral:latest') is in the available names."""
+    return model in available or (":" not in model and f"{model}:latest" in available)
+
+
+class _Endpoint:
+    __slots__ = ("url", "healthy", "outstanding", "requests", "failures", "models", "last_error")
+
+    def __init__(self, url):
+        self.url = url
+        self.healthy = True  # Optimistic until the first check says otherwise
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.models = None  # Model names from /api/tags, None until known
+        self.last_error = None
+
+    @property
+    def base(self):
+        return self.url[: -len(CHAT_PATH)]
+
+
+class OllamaPool:
+    """
+    Least-outstanding-requests balancer with pinning and health checks.
+
+    Usage:
+        pool = OllamaPool(["http://box1:11434", "http://box2:11434"], pins={"judge": 1}, sticky={"a", "b"})
+        pool.start(interval=10)
+        with pool.lease("judge", "mistral") as url:
+            chat_with_ollama(url, ...)
+        pool.stop()
+    """
+
+    def __init__(self, urls, pins=None, sticky=(), check_timeout=3.0):
+        """
+        Args:
+            urls: Endpoint URLs (host:port, base URL or full /api/chat URL)
+            pins: {role: endpoint index or URL} for roles that must use one endpoint
+            sticky: Roles that keep the endpoint they were first given
+            check_timeout: Seconds per health-check request
+        """
+        self.endpoints = [_Endpoint(chat_url(u)) for u in urls]
+        if not self.endpoints:
+            raise ValueError("An Ollama pool needs at least one endpoint")
+        self.pins = {}
+        for role, target in (pins or {}).items():
+            self.pins[role] = self._resolve(target)
+        self.sticky = set(sticky)
+        self.check_timeout = check_timeout
+        self._assigned = {}  # Sticky role -> endpoint
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _resolve(self, target):
+        if isinstance(target, int) or str(target).isdigit():
+            index = int(target)
+            if not 0 <= index < len(self.endpoints):
+                raise ValueError(f"Pool endpoint index {index} out of range (0-{len(self.endpoints) - 1})")
+            return self.endpoints[index]
+        url = chat_url(str(target))
+        for endpoint in self.endpoints:
+            if endpoint.url == url:
+                return endpoint
+        raise ValueError(f"Pinned endpoint {target} is not in the pool")
+
+    def _least_loaded(self, model):
+        """Healthy endpoint with the fewest outstanding (then total) requests, preferring ones with the model."""
+        healthy = [e for e in self.endpoints if e.healthy] or self.endpoints  # All down: let retries decide
+        with_model = [e for e in healthy if e.models is None or model_matches(model, e.models)]
+        return min(with_model or healthy, key=lambda e: (e.outstanding, e.requests))
+
+    def _select(self, role, model):
+        """Pick an endpoint for role. Caller holds the lock."""
+        pinned = self.pins.get(role)
+        if pinned is not None:
+            return pinned if pinned.healthy else self._least_loaded(model)
+        if role in self.sticky:
+            current = self._assigned.get(role)
+            if current is None or not current.healthy:
+                chosen = self._least_loaded(model)
+                if current is not None and chosen is not current:
+                    print(f"[Pool] {role}: {current.base} is down, moving to {chosen.base}")
+                self._assigned[role] = chosen
+            return self._assigned[role]
+        return self._least_loaded(model)
+
+    @contextmanager
+    def lease(self, role, model):
+        """Yield the chat URL to use for one request; connection failures mark the endpoint down."""
+        with self._lock:
+            endpoint = self._select(role, model)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+        try:
+            yield endpoint.url
+        except (requests.ConnectionError, ConnectionError) as e:  # Includes connect timeouts, not slow replies
+            self.mark_down(endpoint, e)
+            raise
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+
+    def mark_down(self, endpoint, error):
+        with self._lock:
+            endpoint.failures += 1
+            endpoint.last_error = type(error).__name__
+            was_healthy, endpoint.healthy = endpoint.healthy, False
+        if was_healthy:
+            print(f"[Pool] {endpoint.base} down ({endpoint.last_error})")
+
+    def check(self):
+        """Poll every endpoint once."""
+        for endpoint in self.endpoints:
+            try:
+                resp = requests.get(endpoint.base + "/api/tags", timeout=self.check_timeout)
+                resp.raise_for_status()
+                models = {m.get("name") for m in resp.json().get("models", [])}
+            except (requests.RequestException, ValueError) as e:
+                if endpoint.healthy:
+                    self.mark_down(endpoint, e)
+                continue
+            with self._lock:
+                was_healthy = endpoint.healthy
+                endpoint.healthy = True
+                endpoint.models = models
+            if not was_healthy:
+                print(f"[Pool] {endpoint.base} back up")
+
+    def start(self, interval=10.0):
+        """Check now, then every interval seconds on a daemon thread."""
+        self.check()
+        if interval <= 0:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._thread = threading.Thread(target=run, name="ollama-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def healthy_count(self):
+        with self._lock:
+            return sum(e.healthy for e in self.endpoints)
+
+    def rows(self):
+        """Per-endpoint snapshot for reports and metrics."""
+        with self._lock:
+            return [
+                {
+                    "endpoint": e.base,
+                    "healthy": e.healthy,
+                    "outstanding": e.outstanding,
+                    "requests": e.requests,
+                    "failures": e.failures,
+                }
+                for e in self.endpoints
+            ]
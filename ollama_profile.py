@@ -0,0 +1,76 @@
+"""
+Tuned Ollama options for Duet LLM (--ollama-profile).
+
+autotune.py benchmarks each configured model on the local Ollama and
+writes a JSON profile of the best options (num_thread, num_batch,
+num_ctx, keep_alive) per model, plus per-role entries for roles whose
+needs differ (a short room whisper does not need a large context).
+duet.py loads the profile at startup and every Ollama request of a role
+uses its tuned options on top of the defaults.
+
+Profile shape:
+    {
+      "created": "2025-01-01T12:00:00", "ollama_url": "...", "cpu_count": 8,
+      "models": {"mistral": {"options": {...}, "tokens_per_second": 31.2, "first_token_seconds": 0.21}},
+      "roles": {"room": {"model": "mistral", "options": {...}}}
+    }
+"""
+
+import json
+import os
+
+# Options that only change speed, never the reply (left out of response cache keys)
+PERFORMANCE_OPTIONS = ("num_thread", "num_batch", "num_gpu", "keep_alive", "use_mmap")
+
+
+class OptionsProfile:
+    """
+    Per-role/per-model Ollama options.
+
+    Usage:
+        profile = OptionsProfile(".cache/ollama-profile.json")
+        options = profile.options("room", "mistral")  # {} when nothing was tuned
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: Profile JSON written by autotune.py (None or a missing file = empty profile)
+        """
+        self.path = path
+        self.data = {"models": {}, "roles": {}}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.data.update(json.load(f))
+            except (OSError, ValueError):
+                print(f"[Profile] Ignoring unreadable Ollama profile: {path}")
+
+    def __bool__(self):
+        return bool(self.data["models"] or self.data["roles"])
+
+    def options(self, role, model):
+        """Tuned options for role on model: the role entry if it was tuned for this model, else the model's."""
+        entry = self.data["roles"].get(role)
+        if entry and entry.get("model") == model:
+            return dict(entry["options"])
+        entry = self.data["models"].get(model)
+        return dict(entry["options"]) if entry else {}
+
+    def set_model(self, model, options, **stats):
+        """Record the tuned options for a model, with benchmark stats alongside."""
+        self.data["models"][model] = dict(stats, options=options)
+
+    def set_role(self, role, model, options):
+        self.data["roles"][role] = {"model": model, "options": options}
+
+    def save(self, **meta):
+        """Write atomically so a crash never leaves a half-written file."""
+        self.data.update(meta)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1)
+        os.replace(tmp_path, self.path)
@@ -1,6 +1,76 @@
 #!/usr/bin/env python3
+"""
+Persona generator for Duet LLM.
+
+Interactive by default: ten questions, one persona file in personas/.
+With --batch it reads a CSV or YAML spec of many personas instead,
+optionally has an LLM fill in the sections a row leaves empty (--fill,
+several personas at a time), checks the Name/ShortName headers that
+duet.py's load_persona reads, and writes them all.
+
+Usage:
+    python personaGen.py
+    python personaGen.py --batch guests.csv
+    python personaGen.py --batch enneagram.yaml --fill --workers 4 --model llama3
+"""
+
+import argparse
+import csv
 import os
+import re
 import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Optional YAML specs (CSV needs nothing extra)
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+FIELDS = ("name", "shortname", "worldview", "personality", "communication", "gears", "role", "domains",
+          "quirks", "mission")
+
+# Everything except the headers can be left for --fill
+SECTIONS = FIELDS[2:]
+
+# Spec columns besides FIELDS: a free-text brief for --fill, and an output file name
+EXTRA_COLUMNS = ("brief", "file")
+
+COLUMN_ALIASES = {
+    "short_name": "shortname",
+    "overview": "worldview",
+    "traits": "personality",
+    "core_traits": "personality",
+    "communication_style": "communication",
+    "expressive_gears": "gears",
+    "signature_quirks": "quirks",
+}
+
+# What --fill asks for, per section (mirrors the interactive questions)
+SECTION_HINTS = {
+    "worldview": "3-6 sentences on their worldview, goals, backstory and tone",
+    "personality": "4-6 core traits as Markdown bullet points",
+    "communication": "their communication style in a few words (e.g. calm, sarcastic, poetic)",
+    "gears": "2-4 expressive gears (e.g. Rational, Passionate, Surreal), each a '### Gear' heading "
+             "with one or two sentences",
+    "role": "their role in multi-agent conversations in a few words (partner, rival, chaos catalyst...)",
+    "domains": "a comma-separated list of 4-8 domains they are comfortable discussing",
+    "quirks": "3-6 signature quirks as Markdown bullet points",
+    "mission": "1-3 sentences on their mission or purpose in conversations",
+}
+
+FILL_SYSTEM = (
+    "You write persona files for a live conversation between AI characters at an art installation. "
+    "Be specific and vivid, keep every section short, and write only the sections you are asked for."
+)
+
+# Sections generate_persona puts inside a single bullet line
+INLINE_SECTIONS = ("communication", "role", "domains")
+
+# Terminal labels and log headers stay readable
+MAX_SHORTNAME = 24
 
 def ask(question):
     print("\n" + question)
@@ -56,7 +126,273 @@ They respond to disagreements, confusion, emotional tone shifts, logic, symbolis
     return md
 
 
+def persona_filename(shortname, out_dir="personas"):
+    """personas/<shortname>.md, lowercased, with anything but letters, digits, '-' and '_' replaced."""
+    safe_name = re.sub(r"[^\w-]+", "_", shortname.strip()).strip("_").lower() or "persona"
+    return os.path.join(out_dir, f"{safe_name}.md")
+
+
+def normalize_row(row, defaults=None):
+    """A spec row (CSV dict or YAML mapping) as answers for generate_persona, plus brief and file."""
+    answers = {}
+    for source in (defaults or {}, row):
+        for key, value in source.items():
+            if key is None:
+                raise ValueError("row has more cells than the header has columns")
+            key = COLUMN_ALIASES.get(key.strip().lower().replace(" ", "_").replace("-", "_"),
+                                     key.strip().lower().replace(" ", "_").replace("-", "_"))
+            if key not in FIELDS and key not in EXTRA_COLUMNS:
+                raise ValueError(f"unknown column '{key}' (use {', '.join(FIELDS + EXTRA_COLUMNS)})")
+            if isinstance(value, list):
+                if key == "domains":
+                    value = ", ".join(str(v) for v in value)
+                elif key in ("personality", "quirks"):
+                    value = "\n".join(f"- {v}" for v in value)
+                else:
+                    value = "\n".join(str(v) for v in value)
+            value = "" if value is None else str(value).strip()
+            if value or key not in answers:
+                answers[key] = value
+    for key in FIELDS + EXTRA_COLUMNS:
+        answers.setdefault(key, "")
+    return answers
+
+
+def load_spec(path):
+    """
+    Read a batch spec.
+
+    CSV: a header row with the field names (name, shortname, worldview, ...,
+    plus optional brief and file), one persona per row. YAML: a list of
+    mappings, or {"defaults": {...}, "personas": [...]} where defaults fill
+    every persona's empty fields. List values become bullet points (comma
+    separated for domains).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    defaults = {}
+    if ext in (".yaml", ".yml"):
+        if not HAS_YAML:
+            raise ValueError("YAML specs need PyYAML. Run: pip install pyyaml")
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                data = yaml.safe_load(f) or []
+            except yaml.YAMLError as e:
+                raise ValueError(f"invalid YAML ({e})") from None
+        if isinstance(data, dict):
+            defaults = data.get("defaults") or {}
+            data = data.get("personas") or []
+        if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+            raise ValueError("a YAML spec is a list of personas, or a mapping with 'defaults' and 'personas'")
+        rows = data
+    elif ext == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        raise ValueError(f"unsupported spec format '{ext}' (use .csv, .yaml or .yml)")
+
+    personas = []
+    for number, row in enumerate(rows, 1):
+        try:
+            personas.append(normalize_row(row, defaults))
+        except ValueError as e:
+            raise ValueError(f"persona {number}: {e}") from None
+    return personas
+
+
+def validate_headers(answers):
+    """Problems with the Name/ShortName header lines that load_persona reads (empty list = fine)."""
+    problems = []
+    for key, label in (("name", "Name"), ("shortname", "ShortName")):
+        value = answers[key]
+        if not value:
+            problems.append(f"{label} is empty")
+        elif "\n" in value or "\r" in value:
+            problems.append(f"{label} must be a single line")
+    if len(answers["shortname"]) > MAX_SHORTNAME:
+        problems.append(f"ShortName is longer than {MAX_SHORTNAME} characters")
+    return problems
+
+
+def fill_prompt(answers, missing):
+    """The --fill request: what is known about the persona, and the sections to write."""
+    lines = [f"Persona: {answers['name']} (short name: {answers['shortname']})"]
+    if answers["brief"]:
+        lines.append(f"Brief: {answers['brief']}")
+    known = [key for key in SECTIONS if answers[key]]
+    if known:
+        lines.append("\nAlready written (stay consistent with it):")
+        for key in known:
+            lines.append(f"## {key}\n{answers[key]}")
+    lines.append(
+        "\nWrite the missing sections below. Start each with its heading line exactly as shown "
+        "('## name'), followed by the content. No other text."
+    )
+    for key in missing:
+        lines.append(f"## {key}\n({SECTION_HINTS[key]})")
+    return "\n".join(lines)
+
+
+def parse_sections(text, wanted):
+    """Split a '## key' (or bold-only '**key:**') formatted reply into {key: content} for the wanted keys."""
+    sections = {}
+    current = None
+    for line in text.splitlines():
+        match = re.match(r"^\s*(?:#{1,3}\s*\**([A-Za-z_ ]+?)\**\s*:?|\*\*([A-Za-z_ ]+?)\s*:?\s*\*\*\s*:?)\s*$", line)
+        key = (match.group(1) or match.group(2)).strip().lower().replace(" ", "_") if match else None
+        key = COLUMN_ALIASES.get(key, key)
+        if key in wanted:
+            current = key
+            sections[current] = []
+        elif current:
+            sections[current].append(line)
+    return {key: "\n".join(lines).strip() for key, lines in sections.items() if "\n".join(lines).strip()}
+
+
+def run_batch(args):
+    # Batch mode talks to the same backends as duet.py (pygame/requests come with it)
+    from duet import HAS_ANTHROPIC, RoleChat, load_persona
+    from usage import UsageMeter
+
+    try:
+        personas = load_spec(args.batch)
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"Error: {args.batch}: {e}")
+        return
+    if not personas:
+        print(f"Error: {args.batch} has no personas")
+        return
+    if args.fill and args.provider == "anthropic" and not HAS_ANTHROPIC:
+        print("Error: anthropic package not installed. Run: pip install anthropic")
+        return
+
+    # Headers and output names are checked for the whole batch before any LLM call
+    errors = []
+    seen = {"name": {}, "shortname": {}, "file": {}}
+    for number, answers in enumerate(personas, 1):
+        label = answers["shortname"] or answers["name"] or f"persona {number}"
+        problems = validate_headers(answers)
+        # A file column names a .md file inside --out-dir; it must not write anywhere else
+        name = answers["file"]
+        if name and (os.path.isabs(name) or ".." in re.split(r"[\\/]", name) or not name.lower().endswith(".md")):
+            problems.append(f"file '{name}' must be a relative .md path inside {args.out_dir} (no '..')")
+        answers["file"] = (
+            os.path.join(args.out_dir, name) if name
+            else persona_filename(answers["shortname"], args.out_dir)
+        )
+        for key in seen:
+            value = answers[key].lower()
+            if value and value in seen[key]:
+                problems.append(f"same {key} as persona {seen[key][value]}")
+            seen[key].setdefault(value, number)
+        errors += [f"persona {number} ({label}): {p}" for p in problems]
+    if errors:
+        print(f"Error: {len(errors)} problem{'s' if len(errors) != 1 else ''} in {args.batch}:")
+        for line in errors:
+            print(f"  {line}")
+        return
+
+    todo = [a for a in personas if args.overwrite or not os.path.exists(a["file"])]
+    skipped = len(personas) - len(todo)
+    print(f"{len(personas)} personas in {args.batch}" + (f", {skipped} already written (--overwrite to redo)" if skipped else ""))
+    if args.check:
+        missing = sum(1 for a in todo if any(not a[k] for k in SECTIONS))
+        print(f"Headers OK. {missing} of {len(todo)} to write have empty sections"
+              + (" (--fill generates them)." if missing and not args.fill else "."))
+        return
+
+    meter = UsageMeter()
+    backend = None
+    if args.fill:
+        backend = RoleChat(
+            "persona", args.provider, os.environ.get("OLLAMA_URL", "http://localhost:11434/api/chat"),
+            args.model, args.anthropic_model, timeout=args.timeout, retries=args.retries,
+            max_tokens=args.max_tokens, meter=meter,
+        )
+
+    def fill(answers):
+        missing = [key for key in SECTIONS if not answers[key]]
+        if backend and missing:
+            prompt = fill_prompt(answers, missing)
+            reply = backend.chat(FILL_SYSTEM, [{"role": "system", "content": FILL_SYSTEM},
+                                               {"role": "user", "content": prompt}])
+            for key, content in parse_sections(reply, missing).items():
+                if key in INLINE_SECTIONS:
+                    content = " ".join(line.strip().lstrip("-*").strip() for line in content.splitlines()).strip()
+                answers[key] = content
+        return answers, missing
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    written = failed = 0
+    incomplete = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(fill, answers): answers for answers in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            answers = futures[future]
+            progress = f"[{done}/{len(todo)}] {answers['shortname']}"
+            try:
+                answers, missing = future.result()
+            except Exception as e:  # One failed request should not sink the batch; a rerun picks it up
+                failed += 1
+                print(f"{progress}: fill failed ({type(e).__name__}: {e})")
+                continue
+            directory = os.path.dirname(answers["file"])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(answers["file"], "w", encoding="utf-8") as f:
+                f.write(generate_persona(answers))
+            loaded = load_persona(answers["file"])
+            if (loaded["name"], loaded["short_name"]) != (answers["name"], answers["shortname"]):
+                print(f"{progress}: Warning: {answers['file']} reads back as "
+                      f"{loaded['name']!r} / {loaded['short_name']!r}")
+            written += 1
+            still_empty = [key for key in SECTIONS if not answers[key]]
+            if still_empty:
+                incomplete.append(answers["shortname"])
+            filled = [key for key in missing if key not in still_empty]
+            note = f", filled {', '.join(filled)}" if filled else ""
+            note += f", empty: {', '.join(still_empty)}" if still_empty else ""
+            print(f"{progress}: {answers['file']}{note}")
+
+    print(f"\nWrote {written} personas to {args.out_dir}/ in {time.perf_counter() - started:.1f}s"
+          + (f", {failed} failed (run again to retry them)" if failed else ""))
+    if incomplete:
+        hint = "" if args.fill else " (--fill generates them)"
+        print(f"{len(incomplete)} with empty sections{hint}: {', '.join(incomplete[:10])}"
+              + (" ..." if len(incomplete) > 10 else ""))
+    if backend:
+        print(f"Usage: {meter.summary_line()}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Create Duet LLM persona files, one interactively or many from a spec.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--batch", metavar="SPEC", help="CSV or YAML spec of personas to write (non-interactive).")
+    parser.add_argument("--out-dir", default="personas", help="Directory for batch output.")
+    parser.add_argument("--overwrite", action="store_true", help="Rewrite persona files that already exist.")
+    parser.add_argument("--check", action="store_true", help="Validate the spec only; write nothing.")
+    parser.add_argument("--fill", action="store_true", help="Have an LLM write the sections a row leaves empty.")
+    parser.add_argument("--workers", type=int, default=4, help="Personas filled at the same time.")
+    parser.add_argument("--provider", choices=["ollama", "anthropic"], default="ollama", help="Provider for --fill.")
+    parser.add_argument("--model", default="mistral", help="Ollama model for --fill.")
+    parser.add_argument("--anthropic-model", default="claude-haiku-4-5-20251001", help="Anthropic model for --fill.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per persona after a failed request.")
+    parser.add_argument("--max-tokens", type=int, default=900, help="Length limit for one persona's sections.")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    if args.batch:
+        run_batch(args)
+    else:
+        interactive()
+
+
+def interactive():
     print("\n====================================")
     print("      Persona Generator (CLI)       ")
     print("  Creates personas in Markdown      ")
@@ -113,8 +449,7 @@ def main():
     os.makedirs("personas", exist_ok=True)
 
     # File naming
-    safe_name = answers["shortname"].replace(" ", "_").lower()
-    filename = f"personas/{safe_name}.md"
+    filename = persona_filename(answers["shortname"])
 
     with open(filename, "w", encoding="utf-8") as f:
         f.write(persona_md)
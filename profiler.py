@@ -0,0 +1,130 @@
+"""
+Phase-level profiling for Duet LLM (--profile).
+
+Records timed spans from any thread (main loop, LLM calls, rendering,
+listener capture and transcription, background whisper/judge workers),
+exports them as Chrome trace events (open in chrome://tracing or
+https://ui.perfetto.dev) and prints a per-phase summary.
+
+Profiling is off by default and a disabled span costs one attribute check.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Profiler:
+    """
+    Thread-safe span recorder.
+
+    Usage:
+        from profiler import profiler
+        with profiler.span("append_log", cat="io"):
+            append_log(...)
+        profiler.write_chrome_trace("run.trace.json")
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._spans = []  # (name, cat, tid, start_s, duration_s, args)
+        self._threads = {}  # tid -> thread name
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        """Start recording (clears anything recorded before)."""
+        with self._lock:
+            self._spans = []
+            self._threads = {}
+        self._origin = time.perf_counter()
+        self.enabled = True
+
+    def add(self, name, start, duration, cat="main", **args):
+        """Record a span measured elsewhere (start is a time.perf_counter() value)."""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._spans.append((name, cat, thread.ident, start - self._origin, duration, args))
+
+    @contextmanager
+    def _span(self, name, cat, args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter() - start, cat, **args)
+
+    def span(self, name, cat="main", **args):
+        """Context manager timing one phase on the current thread."""
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name, cat, args)
+
+    def summary(self):
+        """Per-phase stats sorted by total time: [{name, cat, count, total, mean, p95, max}]."""
+        with self._lock:
+            spans = list(self._spans)
+        grouped = {}
+        for name, cat, _, _, duration, _ in spans:
+            grouped.setdefault((name, cat), []).append(duration)
+        rows = []
+        for (name, cat), durations in grouped.items():
+            durations.sort()
+            rows.append({
+                "name": name,
+                "cat": cat,
+                "count": len(durations),
+                "total": sum(durations),
+                "mean": sum(durations) / len(durations),
+                "p95": durations[min(len(durations) - 1, int(0.95 * len(durations)))],
+                "max": durations[-1],
+            })
+        return sorted(rows, key=lambda r: -r["total"])
+
+    def print_summary(self):
+        rows = self.summary()
+        if not rows:
+            return
+        print(f"{'Phase':<28} {'Cat':<8} {'Count':>6} {'Total s':>9} {'Mean ms':>9} {'p95 ms':>9} {'Max ms':>9}")
+        for r in rows:
+            print(
+                f"{r['name'][:28]:<28} {r['cat'][:8]:<8} {r['count']:>6} {r['total']:>9.2f} "
+                f"{1000 * r['mean']:>9.1f} {1000 * r['p95']:>9.1f} {1000 * r['max']:>9.1f}"
+            )
+
+    def write_chrome_trace(self, path):
+        """Write all spans in Chrome trace-event format ("X" complete events, microseconds)."""
+        with self._lock:
+            spans = list(self._spans)
+            threads = dict(self._threads)
+        pid = os.getpid()
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        for name, cat, tid, start, duration, args in spans:
+            events.append({
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": round(start * 1e6, 1),
+                "dur": round(duration * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(spans)
+
+
+# Process-wide profiler shared by all modules
+profiler = Profiler()
@@ -0,0 +1,81 @@
+"""
+Persona and icebreaker registry for Duet LLM.
+
+Keeps parsed persona/icebreaker files in memory and watches their
+modification times, so an edited file is reparsed (and only that file)
+without restarting the process and losing the warm model and conversation.
+"""
+
+import os
+import time
+
+
+class PersonaRegistry:
+    """
+    Parsed-file cache with cheap mtime-based change detection.
+
+    Usage:
+        registry = PersonaRegistry()
+        persona = registry.load("personas/jamie.md", load_persona)
+        ...
+        for path in registry.poll():   # at a turn boundary
+            persona = registry.get(path)
+    """
+
+    def __init__(self, min_interval=1.0):
+        """
+        Args:
+            min_interval: Minimum seconds between filesystem checks in poll()
+        """
+        self.min_interval = min_interval
+        self._entries = {}  # path -> [loader, signature, parsed]
+        self._last_poll = 0.0
+
+    @staticmethod
+    def _signature(path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def load(self, path, loader):
+        """Parse path with loader (once) and start watching it. Returns the parsed value."""
+        entry = self._entries.get(path)
+        if entry is None:
+            signature = self._signature(path)
+            entry = [loader, signature, loader(path)]
+            self._entries[path] = entry
+        return entry[2]
+
+    def get(self, path):
+        """Current parsed value for a watched path."""
+        return self._entries[path][2]
+
+    def poll(self, force=False):
+        """
+        Reparse watched files whose mtime or size changed.
+
+        Returns the list of paths that were reloaded. A file that is missing or
+        fails to parse (e.g. caught mid-save) keeps its previous value and is
+        retried on the next poll.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.min_interval:
+            return []
+        self._last_poll = now
+
+        changed = []
+        for path, entry in self._entries.items():
+            try:
+                signature = self._signature(path)
+            except OSError:
+                continue
+            if signature == entry[1]:
+                continue
+            try:
+                parsed = entry[0](path)
+            except Exception as e:
+                print(f"[Reload] Could not reload {path} ({type(e).__name__}: {e}); keeping previous version")
+                continue
+            entry[1] = signature
+            entry[2] = parsed
+            changed.append(path)
+        return changed
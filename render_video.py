@@ -0,0 +1,214 @@
+"""
+Headless video export for Duet LLM conversations.
+
+Renders a markdown log or JSONL transcript with ComicVisualizer's artwork,
+balloon boxes and text layout, without opening a window. Each distinct
+balloon state is rendered once, in parallel across a process pool; the
+stills are then either encoded to a video with ffmpeg (holding each still
+for its duration) or written out as an image sequence.
+
+Usage:
+    python render_video.py logs/20250101-120000_art.md -o art.mp4
+    python render_video.py transcript.jsonl -o frames/ --workers 8
+    python render_video.py transcript.jsonl -o art.mp4 --reveal 4 --scale 1.0
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from duet import ComicVisualizer, agent_side
+from replay import load_any, message_delays
+
+# Containers that get H.264 with a player-friendly pixel format
+H264_FORMATS = (".mp4", ".mov", ".mkv")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Render a Duet LLM conversation to a video or image sequence without a display.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("path", help="Markdown log (logs/*.md) or JSONL transcript (--transcript).")
+    parser.add_argument(
+        "-o", "--output",
+        required=True,
+        help="Video file (.mp4, .mov, .mkv, .webm, .gif; needs ffmpeg) or a directory for a PNG sequence.",
+    )
+    parser.add_argument("--visual-image", default="Artboard 1.png", help="Base image with speech balloons.")
+    parser.add_argument("--visual-both", action="store_true", help="Keep both balloons filled.")
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=ComicVisualizer.SCALE,
+        help="Frame size relative to the artwork (0.5 = 960x540 for the default image, 1.0 = 1080p).",
+    )
+    parser.add_argument("--pause", type=float, default=3.0, help="Seconds per message when there are no timestamps.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier for recorded timing.")
+    parser.add_argument("--max-hold", type=float, default=10.0, help="Longest a single message stays on screen.")
+    parser.add_argument(
+        "--reveal",
+        type=float,
+        default=0.0,
+        help="Type replies out at N words per second (0 = show each reply at once).",
+    )
+    parser.add_argument("--fps", type=int, default=30, help="Output frame rate.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Rendering processes.")
+    parser.add_argument("--keep-frames", help="Also keep the rendered stills (and ffmpeg concat list) here.")
+    return parser.parse_args()
+
+
+def build_states(messages, delays, reveal=0.0, show_both=False, max_hold=10.0):
+    """
+    Turn a message list into balloon states.
+
+    Returns [(left_text, right_text, seconds)]; consecutive identical states are merged.
+    Messages without a balloon (judge, user, room) keep the current frame on screen.
+    """
+    states = []
+    left = right = ""
+
+    def hold(seconds):
+        if seconds <= 0:
+            return
+        if states and states[-1][:2] == (left, right):
+            states[-1] = (left, right, states[-1][2] + seconds)
+        else:
+            states.append((left, right, seconds))
+
+    for msg, delay in zip(messages, delays):
+        delay = min(delay, max_hold) if max_hold > 0 else delay
+        side = agent_side(msg.get("role") or "")
+        if not side:
+            hold(delay)
+            continue
+
+        words = msg["text"].split()
+        steps = []
+        if reveal > 0 and len(words) > 1:
+            step = 1.0 / reveal
+            steps = [(" ".join(words[:n]), step) for n in range(1, len(words))]
+        steps.append((msg["text"], max(0.0, delay - sum(s for _, s in steps)) or 1.0 / max(reveal, 1.0)))
+
+        for text, seconds in steps:
+            if side == "left":
+                left = text
+                right = right if show_both else ""
+            else:
+                right = text
+                left = left if show_both else ""
+            hold(seconds)
+    return states
+
+
+# One visualizer per worker process, built once by the pool initializer
+_VISUALIZER = None
+
+
+def _init_worker(image_path, show_both, scale):
+    global _VISUALIZER
+    _VISUALIZER = ComicVisualizer(image_path, show_both=show_both, scale=scale)
+
+
+def _render_frame(job):
+    path, left, right = job
+    img = _VISUALIZER.compose(_VISUALIZER._clean_text(left), _VISUALIZER._clean_text(right))
+    img.save(path, compress_level=1)  # Fast PNG; the encoder recompresses anyway
+    return path
+
+
+def render_stills(states, frames_dir, image_path, show_both=False, scale=ComicVisualizer.SCALE, workers=2):
+    """Render every state to frames_dir/frame_NNNNNN.png across a process pool. Returns the paths."""
+    os.makedirs(frames_dir, exist_ok=True)
+    jobs = [(os.path.join(frames_dir, f"frame_{i:06d}.png"), left, right) for i, (left, right, _) in enumerate(states)]
+    with ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        initializer=_init_worker,
+        initargs=(image_path, show_both, scale),
+    ) as pool:
+        return list(pool.map(_render_frame, jobs, chunksize=max(1, len(jobs) // (8 * max(1, workers)))))
+
+
+def concat_quote(path):
+    """Quote a path for an ffmpeg concat script (a ' inside becomes '\\'')."""
+    return "'" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+
+def write_concat_list(paths, states, list_path):
+    """ffmpeg concat-demuxer script holding each still for its duration."""
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path, (_, _, seconds) in zip(paths, states):
+            f.write(f"file {concat_quote(path)}\nduration {seconds:.3f}\n")
+        if paths:
+            # The concat demuxer ignores the last duration unless the file is repeated
+            f.write(f"file {concat_quote(paths[-1])}\n")
+
+
+def encode(list_path, output, fps):
+    """Encode the concat list with ffmpeg."""
+    command = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "concat", "-safe", "0", "-i", list_path,
+        "-vf", f"fps={fps},format=yuv420p" if output.lower().endswith(H264_FORMATS) else f"fps={fps}",
+    ]
+    if output.lower().endswith(H264_FORMATS):
+        command += ["-c:v", "libx264", "-preset", "veryfast", "-crf", "20", "-movflags", "+faststart"]
+    subprocess.run(command + [output], check=True)
+
+
+def main():
+    args = parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"Error: transcript not found: {args.path}")
+        return
+    if not os.path.exists(args.visual_image):
+        print(f"Error: Visual image not found: {args.visual_image}")
+        return
+
+    to_video = bool(os.path.splitext(args.output)[1])
+    if to_video and not shutil.which("ffmpeg"):
+        print("Error: ffmpeg not found. Install it, or pass a directory as --output to get a PNG sequence.")
+        return
+
+    transcript = load_any(args.path)
+    messages = transcript["messages"]
+    if not messages:
+        print(f"Error: no messages in {args.path}")
+        return
+
+    delays = message_delays(messages, args.pause, args.speed if args.speed > 0 else 1.0)
+    states = build_states(messages, delays, reveal=args.reveal, show_both=args.visual_both, max_hold=args.max_hold)
+    duration = sum(seconds for _, _, seconds in states)
+    print(f"{len(messages)} messages -> {len(states)} distinct frames, {duration / 60:.1f} min of video")
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="duet-frames-") as tmp:
+        frames_dir = args.keep_frames or (tmp if to_video else args.output)
+        paths = render_stills(
+            states, frames_dir, args.visual_image,
+            show_both=args.visual_both, scale=args.scale, workers=args.workers,
+        )
+        rendered = time.perf_counter() - started
+        print(f"Rendered {len(paths)} frames in {rendered:.1f}s with {args.workers} workers")
+
+        list_path = os.path.join(frames_dir, "frames.txt")
+        write_concat_list(paths, states, list_path)
+        if not to_video:
+            print(f"Image sequence saved to: {frames_dir} (durations in {list_path})")
+            return
+
+        try:
+            encode(list_path, args.output, args.fps)
+        except subprocess.CalledProcessError as e:
+            print(f"Error: ffmpeg failed (exit {e.returncode})")
+            return
+    print(f"Video saved to: {args.output} ({time.perf_counter() - started:.1f}s total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Transcript replay for Duet LLM.
+
+Plays back a markdown log from logs/ (as written by append_log) or a JSONL
+transcript (as written by duet.py --transcript) through the same terminal
+output, append_log and ComicVisualizer paths as a live run, with no LLM calls.
+
+Usage:
+    python replay.py logs/20250101-120000_art.md --visual
+    python replay.py logs/*.jsonl --speed 4 --loop
+    python replay.py logs/run.md --visual --speed 0   # render as fast as possible
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+
+from duet import ComicVisualizer, Colors, agent_color, agent_side, append_log, create_log_file, cwrap, parse_pairs
+
+
+def open_text(path):
+    """Open a log or transcript for reading, including gzipped segments from log rotation."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def parse_log(path):
+    """
+    Parse a markdown conversation log into a transcript.
+
+    Returns:
+        {"topic": str, "started": str, "cast": {role: name}, "models": {role: backend},
+         "messages": [{"role", "speaker", "text", "ts"}]}
+        Roles come from the Cast header line. Older logs without one are
+        inferred: first speaker is "a", second distinct speaker "b", anyone
+        else (judge, user persona, room) is "other".
+    """
+    with open_text(path) as f:
+        lines = f.read().splitlines()
+
+    topic = ""
+    started = ""
+    cast = {}
+    models = {}
+    messages = []
+    speaker = None
+    body = []
+
+    def flush():
+        if speaker is not None and body:
+            messages.append({"speaker": speaker, "text": " ".join(body).strip(), "ts": None})
+
+    for line in lines:
+        if speaker is None and line.startswith("- **"):
+            key, _, value = line[4:].partition(":**")
+            value = value.strip()
+            if key == "Topic":
+                topic = value
+            elif key == "Start time":
+                started = value
+            elif key == "Cast":
+                cast = parse_pairs(value)
+            elif key == "Models":
+                models = parse_pairs(value)
+        elif line.startswith("### "):
+            flush()
+            speaker = line[4:].strip()
+            body = []
+        elif line.startswith(">"):
+            body.append(line[1:].strip())
+        elif line.strip() == "---":
+            flush()
+            speaker = None
+            body = []
+    flush()
+
+    roles = {name: role for role, name in cast.items()}
+    inferred = not roles
+    for msg in messages:
+        name = msg["speaker"]
+        if name not in roles:
+            roles[name] = "other" if not inferred else "a" if not roles else "b" if len(roles) == 1 else "other"
+        msg["role"] = roles[name]
+
+    return {
+        "topic": topic,
+        "started": started,
+        "cast": cast,
+        "models": models,
+        "messages": [m for m in messages if m["text"]],
+    }
+
+
+def parse_transcript(path):
+    """
+    Parse a JSONL transcript. The first record may be a header with "topic"
+    (and "started", "cast", "models"); every other record needs "speaker"
+    and "text", optionally "role" and "ts".
+    """
+    header = {}
+    messages = []
+    with open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "text" not in record:
+                header.update(record)
+                continue
+            messages.append({
+                "role": record.get("role", "other"),
+                "speaker": record.get("speaker", "?"),
+                "short": record.get("short"),
+                "text": record["text"],
+                "ts": record.get("ts"),
+            })
+    return {
+        "topic": header.get("topic", ""),
+        "started": header.get("started", ""),
+        "cast": header.get("cast", {}),
+        "models": header.get("models", {}),
+        "messages": messages,
+    }
+
+
+def load_any(path):
+    """Load a transcript from either a .jsonl transcript or a markdown log (optionally gzipped)."""
+    if path.removesuffix(".gz").endswith((".jsonl", ".json")):
+        return parse_transcript(path)
+    return parse_log(path)
+
+
+def message_delays(messages, pause, speed):
+    """
+    Seconds to wait after each message.
+
+    Uses recorded timestamps when present, otherwise a fixed pause, then divides
+    by speed. speed <= 0 means no waiting at all.
+    """
+    if speed <= 0:
+        return [0.0] * len(messages)
+
+    delays = []
+    for i, msg in enumerate(messages):
+        nxt = messages[i + 1] if i + 1 < len(messages) else None
+        if nxt and msg["ts"] is not None and nxt["ts"] is not None:
+            delays.append(max(0.0, nxt["ts"] - msg["ts"]) / speed)
+        else:
+            delays.append(pause / speed)
+    return delays
+
+
+def replay(transcript, visualizer=None, log_path=None, pause=3.0, speed=1.0, use_color=True):
+    """
+    Feed a transcript through print / append_log / visualizer.
+
+    Returns (message_count, rendered_count, total_render_seconds).
+    """
+    messages = transcript["messages"]
+    rendered = 0
+    render_time = 0.0
+
+    for msg, delay in zip(messages, message_delays(messages, pause, speed)):
+        label = msg.get("short") or msg["speaker"]
+        print(cwrap(f"[{label}]:", agent_color(msg["role"]) if agent_side(msg["role"]) else Colors.CYAN, use_color), msg["text"], "\n")
+        if log_path:
+            append_log(log_path, msg["speaker"], msg["text"])
+
+        # Agents get a balloon; everything else is printed and logged only
+        side = agent_side(msg["role"])
+        if visualizer and side:
+            started = time.perf_counter()
+            if side == "left":
+                visualizer.update_left(msg["text"])
+            else:
+                visualizer.update_right(msg["text"])
+            render_time += time.perf_counter() - started
+            rendered += 1
+
+        # Sleep in small slices so the window stays responsive
+        deadline = time.monotonic() + delay
+        while True:
+            if visualizer:
+                visualizer.process_events()
+                if not visualizer._running:
+                    raise KeyboardInterrupt
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.05))
+
+    return len(messages), rendered, render_time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay Duet LLM logs or transcripts without calling any model.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("paths", nargs="+", help="Markdown logs (logs/*.md) or JSONL transcripts.")
+    parser.add_argument("--visual", action="store_true", help="Show the comic visualizer.")
+    parser.add_argument("--visual-image", default="Artboard 1.png", help="Base image for visual mode.")
+    parser.add_argument("--visual-both", action="store_true", help="Show both speech balloons simultaneously.")
+    parser.add_argument("--pause", type=float, default=3.0, help="Seconds per message when the source has no timestamps.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier (0 = as fast as possible).")
+    parser.add_argument("--loop", action="store_true", help="Cycle through the files until Ctrl-C.")
+    parser.add_argument("--log", action="store_true", help="Also write a fresh log in logs/ via append_log.")
+    parser.add_argument("--no-color", action="store_true", help="Disable colored terminal output.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"Error: transcript not found: {path}")
+            return
+
+    visualizer = None
+    if args.visual:
+        if not os.path.exists(args.visual_image):
+            print(f"Error: Visual image not found: {args.visual_image}")
+            return
+        visualizer = ComicVisualizer(args.visual_image, show_both=args.visual_both)
+        visualizer.start()
+
+    total_messages = 0
+    total_rendered = 0
+    total_render = 0.0
+    started = time.perf_counter()
+
+    try:
+        while True:
+            for path in args.paths:
+                transcript = load_any(path)
+                print(f"--- Replaying {path} ({len(transcript['messages'])} messages) ---\n")
+                log_path = None
+                if args.log:
+                    log_path = create_log_file("replay " + (transcript["topic"] or os.path.basename(path)))
+                count, rendered, render = replay(
+                    transcript,
+                    visualizer=visualizer,
+                    log_path=log_path,
+                    pause=args.pause,
+                    speed=args.speed,
+                    use_color=not args.no_color,
+                )
+                total_messages += count
+                total_rendered += rendered
+                total_render += render
+            if not args.loop:
+                break
+    except KeyboardInterrupt:
+        print("\n\nStopping replay (Ctrl-C).")
+    finally:
+        if visualizer:
+            visualizer.stop()
+
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {total_messages} messages in {elapsed:.1f}s")
+    if total_rendered:
+        print(f"Average render time: {total_render / total_rendered * 1000:.1f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Timeouts, retries and hedged requests for Duet LLM.
+
+Provides a rolling latency tracker (for p95-based hedging), a bounded
+exponential-backoff retry helper, and a hedged call that races a fallback
+against a slow primary and returns whichever answers first.
+"""
+
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+
+# Optional Anthropic support (only needed to classify its errors)
+try:
+    import anthropic
+    HAS_ANTHROPIC = True
+except ImportError:
+    HAS_ANTHROPIC = False
+
+
+class LatencyTracker:
+    """Rolling window of call latencies, plus in-flight counts, per key (e.g. 'ollama:mistral')."""
+
+    def __init__(self, window=50):
+        self.window = window
+        self._samples = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        """Mark a request to key as in flight."""
+        with self._lock:
+            self._inflight[key] = self._inflight.get(key, 0) + 1
+
+    def end(self, key):
+        """Mark a request to key as finished."""
+        with self._lock:
+            self._inflight[key] = max(0, self._inflight.get(key, 0) - 1)
+
+    def inflight(self, key):
+        """Requests to key currently in flight."""
+        with self._lock:
+            return self._inflight.get(key, 0)
+
+    def record(self, key, seconds):
+        """Add one latency sample."""
+        with self._lock:
+            if key not in self._samples:
+                self._samples[key] = deque(maxlen=self.window)
+            self._samples[key].append(seconds)
+
+    def count(self, key):
+        """Number of samples currently held for key."""
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def percentile(self, key, q):
+        """Return the q-th percentile (0-100) latency for key, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def p95(self, key):
+        return self.percentile(key, 95)
+
+    def mean(self, key):
+        """Mean latency for key, or None without samples."""
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        if not samples:
+            return None
+        return sum(samples) / len(samples)
+
+
+def is_retryable(exc):
+    """True for timeouts, connection failures, rate limits and 5xx responses."""
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError, TimeoutError, ConnectionError)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    if HAS_ANTHROPIC:
+        if isinstance(exc, anthropic.APIConnectionError):  # includes APITimeoutError
+            return True
+        if isinstance(exc, anthropic.APIStatusError):
+            return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+def call_with_retries(fn, retries=2, backoff=1.0, max_backoff=30.0, label="request"):
+    """
+    Call fn(), retrying retryable errors with exponential backoff and full jitter.
+
+    Args:
+        fn: Zero-argument callable
+        retries: Extra attempts after the first failure (0 = no retries)
+        backoff: Base delay in seconds; doubles each attempt
+        max_backoff: Upper bound for a single delay
+        label: Name used in retry messages
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_backoff, backoff * (2 ** attempt)))
+            attempt += 1
+            print(f"[Retry] {label} failed ({type(e).__name__}); attempt {attempt + 1}/{retries + 1} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+class AnyEvent:
+    """is_set() over several cancel events, any of which stops a reply (None entries are ignored)."""
+
+    def __init__(self, *events):
+        self.events = [e for e in events if e is not None]
+
+    def is_set(self):
+        return any(e.is_set() for e in self.events)
+
+
+def either(*events):
+    """The one event given, or an AnyEvent over several (None if there are none)."""
+    events = [e for e in events if e is not None]
+    if len(events) <= 1:
+        return events[0] if events else None
+    return AnyEvent(*events)
+
+
+def hedged_call(primary, fallback, hedge_after, should_failover=None, label="request"):
+    """
+    Run primary(cancel); if it hasn't answered after hedge_after seconds, also
+    run fallback(cancel) and return whichever succeeds first.
+
+    Each attempt gets its own threading.Event as cancel. The loser's event is
+    set as soon as the winner returns, so a streaming loser closes its stream
+    (stopping generation on the server) instead of running on unobserved.
+
+    Args:
+        primary: Callable(cancel) for the preferred backend
+        fallback: Callable(cancel) raced against it
+        hedge_after: Seconds to wait for primary before starting fallback
+        should_failover: Callable(exception) -> bool; an error it rejects cancels
+            both attempts and is raised at once (None = every error fails over)
+        label: Name used in the failure message
+
+    Returns (result, winner) where winner is "primary" or "fallback".
+    If both fail, both errors are logged and the primary's is raised.
+    """
+    results = queue.Queue()
+    cancels = {"primary": threading.Event(), "fallback": threading.Event()}
+
+    def run(name, fn):
+        try:
+            results.put((name, fn(cancels[name]), None))
+        except Exception as e:
+            results.put((name, None, e))
+
+    threading.Thread(target=run, args=("primary", primary), daemon=True).start()
+
+    started = 1
+    errors = {}
+    try:
+        name, value, error = results.get(timeout=hedge_after)
+    except queue.Empty:
+        threading.Thread(target=run, args=("fallback", fallback), daemon=True).start()
+        started = 2
+        name, value, error = results.get()
+
+    while True:
+        if error is None:
+            for other, event in cancels.items():
+                if other != name:
+                    event.set()
+            return value, name
+        if should_failover and not should_failover(error):
+            for event in cancels.values():
+                event.set()
+            raise error
+        errors[name] = error
+        if name == "primary" and started == 1:
+            # Primary failed fast: let the fallback have a go
+            threading.Thread(target=run, args=("fallback", fallback), daemon=True).start()
+            started = 2
+        if len(errors) == started:
+            print(f"[Hedge] {label}: both attempts failed (primary: {type(errors['primary']).__name__}: "
+                  f"{errors['primary']}; fallback: {type(errors['fallback']).__name__}: {errors['fallback']})")
+            raise errors["primary"]
+        name, value, error = results.get()
@@ -0,0 +1,107 @@
+"""
+Latency- and cost-aware routing for side-channel roles in Duet LLM.
+
+A RoutedChat wraps several backends (RoleChat instances on different
+providers/models) and, per request, sends the role to whichever one is
+currently cheapest or fastest. Latency estimates come from the shared
+LatencyTracker and are inflated by the number of requests already in flight
+on that backend, so a busy local box is avoided without extra probing.
+"""
+
+from interrupts import Interrupted
+from llm_cache import CacheMiss
+from usage import BudgetExceeded
+
+ROUTE_MODES = ("latency", "cost")
+
+# Relative cost per request by provider/model prefix (local inference is free).
+# Only the ordering matters for routing.
+RELATIVE_COST = {
+    "ollama": 0.0,
+    "anthropic:claude-haiku": 1.0,
+    "anthropic:claude-sonnet": 3.0,
+    "anthropic:claude-opus": 15.0,
+    "anthropic": 3.0,
+}
+
+# Latency charged to a backend that just failed, so it is avoided for a while
+FAILURE_PENALTY = 120.0
+
+
+def relative_cost(key):
+    """Look up the relative cost for a 'provider:model' key by longest matching prefix."""
+    best = None
+    for prefix, cost in RELATIVE_COST.items():
+        if key.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
+            best = (prefix, cost)
+    return best[1] if best else 1.0
+
+
+class Router:
+    """Picks a backend per request from observed latency, in-flight load and cost."""
+
+    def __init__(self, tracker, mode="latency"):
+        if mode not in ROUTE_MODES:
+            raise ValueError(f"Unknown route mode '{mode}' (expected one of {', '.join(ROUTE_MODES)})")
+        self.tracker = tracker
+        self.mode = mode
+
+    def estimate(self, key):
+        """Expected latency for a backend: mean observed latency scaled by queued work."""
+        mean = self.tracker.mean(key)
+        if mean is None:
+            return None
+        return mean * (1 + self.tracker.inflight(key))
+
+    def rank(self, backends):
+        """Order backends best-first. Backends with no samples are tried first."""
+        def score(backend):
+            latency = self.estimate(backend.key)
+            if latency is None:
+                return (0, 0.0, 0.0)
+            if self.mode == "cost":
+                return (1, relative_cost(backend.key), latency)
+            return (1, latency, relative_cost(backend.key))
+
+        return sorted(backends, key=score)
+
+    def penalize(self, key):
+        """Record a failure as a very slow sample."""
+        self.tracker.record(key, FAILURE_PENALTY)
+
+
+class RoutedChat:
+    """
+    Drop-in replacement for RoleChat that routes each request across backends.
+
+    Falls through to the next-best backend if the chosen one fails.
+    """
+
+    def __init__(self, role, backends, router):
+        self.role = role
+        self.backends = backends
+        self.router = router
+        self.last_key = None
+
+    @property
+    def key(self):
+        return self.last_key or self.backends[0].key
+
+    def chat(self, system_prompt, messages):
+        """Send one request to the best available backend."""
+        error = None
+        for backend in self.router.rank(self.backends):
+            try:
+                reply = backend.chat(system_prompt, messages)
+            except (CacheMiss, BudgetExceeded, Interrupted):
+                raise  # Deliberate stops, not a failing backend: no penalty, no fallthrough
+            except Exception as e:
+                error = e
+                self.router.penalize(backend.key)
+                print(f"[Router] {self.role}: {backend.key} failed ({type(e).__name__}), trying next backend")
+                continue
+            if backend.key != self.last_key:
+                print(f"[Router] {self.role} -> {backend.key}")
+            self.last_key = backend.key
+            return reply
+        raise error
@@ -0,0 +1,145 @@
+"""
+Supervisor for unattended Duet LLM installations.
+
+Runs duet.py as a child process with a fixed start topic and starts it again
+when it crashes, is stopped by its --watchdog, or exits for a restart
+(--max-rss). A child that dies soon after starting waits before the next
+attempt, doubling each time up to --max-backoff, so a broken setup does not
+spin. Ctrl-C or SIGTERM stops the child gracefully and ends the supervisor.
+
+Usage:
+    python supervise.py --topic "art and consciousness" -- --installation --listen --visual
+    python supervise.py --topic "forgeries" --restart always -- --max-turns 200
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from longrun import EXIT_RESTART
+
+DUET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "duet.py")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Keep duet.py running: restart it after crashes, hangs and memory restarts.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--topic", help="Start topic given to every run (asked once if omitted).")
+    parser.add_argument(
+        "--restart",
+        choices=["on-failure", "always"],
+        default="on-failure",
+        help="on-failure: restart after a non-zero exit only (a clean stop such as --max-turns ends the "
+             "supervisor); always: also after clean exits.",
+    )
+    parser.add_argument("--min-uptime", type=float, default=60.0,
+                        help="Runs shorter than this count as failing fast and back off.")
+    parser.add_argument("--backoff", type=float, default=5.0, help="First wait before restarting a fast failure.")
+    parser.add_argument("--max-backoff", type=float, default=300.0, help="Longest wait between restarts.")
+    parser.add_argument("--max-restarts", type=int, default=0, help="Give up after this many restarts (0 = never).")
+    parser.add_argument("--stop-timeout", type=float, default=30.0,
+                        help="Seconds a stopping child gets to write its logs before it is killed.")
+    parser.add_argument("--log", default="logs/supervisor.log", help="Restart history (appended).")
+    parser.add_argument("duet_args", nargs=argparse.REMAINDER, help="Arguments for duet.py (after --).")
+    args = parser.parse_args()
+    if args.duet_args[:1] == ["--"]:
+        args.duet_args = args.duet_args[1:]
+    return args
+
+
+def describe_exit(code):
+    if code == EXIT_RESTART:
+        return "asked for a restart"
+    if code < 0:
+        try:
+            return f"killed by {signal.Signals(-code).name}"
+        except ValueError:
+            return f"killed by signal {-code}"
+    return f"exited with status {code}"
+
+
+def main():
+    args = parse_args()
+
+    topic = args.topic or input("Enter start topic (word or full prompt): ").strip()
+    if not topic:
+        print("No topic entered, exiting.")
+        return
+    if not any(a in args.duet_args for a in ("--installation", "--watchdog")):
+        print("Note: without --watchdog (or --installation) a hung run is not detected, only crashes.")
+
+    directory = os.path.dirname(args.log)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    def note(message):
+        line = f"{datetime.now().isoformat(timespec='seconds')} {message}"
+        print(f"[Supervisor] {line}")
+        with open(args.log, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    # SIGTERM (systemd, docker stop) and a closed terminal stop the child the same way Ctrl-C does
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, terminate)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, terminate)
+    # Started in the background, SIGINT may be ignored, and children inherit that; duet.py needs it to stop cleanly
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    command = [sys.executable, DUET] + args.duet_args
+    restarts = 0
+    delay = args.backoff
+    child = None
+    try:
+        while True:
+            started = time.monotonic()
+            note(f"starting run {restarts + 1}: {' '.join(args.duet_args) or '(defaults)'}")
+            # Own session: a terminal Ctrl-C reaches only the supervisor, which forwards a single SIGINT
+            child = subprocess.Popen(command, stdin=subprocess.PIPE, text=True, start_new_session=True)
+            try:
+                child.stdin.write(topic + "\n")
+                child.stdin.close()
+            except BrokenPipeError:
+                pass  # Exited before reading the topic (bad arguments); reported below
+            code = child.wait()
+            child = None
+            uptime = time.monotonic() - started
+            note(f"run {restarts + 1} {describe_exit(code)} after {uptime / 60:.1f} min")
+
+            if code == 0 and args.restart == "on-failure":
+                break
+            if args.max_restarts and restarts >= args.max_restarts:
+                note(f"giving up after {restarts} restarts")
+                break
+            if uptime >= args.min_uptime:
+                delay = args.backoff  # A healthy run resets the backoff
+                wait = 1.0
+            else:
+                wait = delay
+                delay = min(2 * delay, args.max_backoff)
+            restarts += 1
+            note(f"restarting in {wait:.0f}s")
+            time.sleep(wait)
+    except KeyboardInterrupt:
+        if child and child.poll() is None:
+            note("stopping")
+            child.send_signal(signal.SIGINT)  # duet.py stops cleanly on Ctrl-C
+            try:
+                child.wait(timeout=args.stop_timeout)
+            except subprocess.TimeoutExpired:
+                note(f"run did not stop within {args.stop_timeout:.0f}s, killing it")
+                child.kill()
+                child.wait()
+    note(f"supervisor done ({restarts} restarts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from archive import TranscriptArchive
+from duet import append_log, append_transcript, create_log_file, create_transcript
+
+JAMIE = {"name": "Jamie Vale", "short_name": "Jamie"}
+RILEY = {"name": "Riley Stone", "short_name": "Riley"}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = TranscriptArchive(str(tmp_path / "cache" / "archive.sqlite"))
+    yield archive
+    archive.close()
+
+
+def write_run(logs, name, lines):
+    path = str(logs / f"{name}.jsonl")
+    create_transcript(path, {"topic": name, "cast": {"a": JAMIE["name"], "b": RILEY["name"]}})
+    for role, text in lines:
+        append_transcript(path, role, JAMIE if role == "a" else RILEY, text)
+    return path
+
+
+def hits(archive, query):
+    return [(row["topic"], row["speaker"]) for row in archive.search(query)]
+
+
+def test_discover_prefers_transcripts_and_skips_derived_files(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    for name in ("run.md", "run.jsonl", "solo.md", "run.branches.md", "run.scores.jsonl"):
+        (logs / name).write_text("")
+    found = [os.path.basename(p) for p in TranscriptArchive.discover([str(logs)])]
+    assert found == ["run.jsonl", "solo.md"]
+
+
+def test_incremental_index_keeps_fts_in_step(tmp_path, archive):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    art = write_run(logs, "art", [("a", "Forgeries fool museums."), ("b", "Only the careless ones.")])
+    write_run(logs, "bees", [("a", "Rooftop bees in Lisbon.")])
+    assert archive.index([str(logs)]) == {"added": 2, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+    assert hits(archive, "forgery") == [("art", "Jamie Vale")]  # Porter stemming
+    assert archive.index([str(logs)])["unchanged"] == 2
+
+    append_transcript(art, "b", RILEY, "Bees make honest forgeries of flowers.")
+    assert archive.index([str(logs)])["updated"] == 1
+    assert sorted(hits(archive, "bees")) == [("art", "Riley Stone"), ("bees", "Jamie Vale")]
+    assert len(hits(archive, "forgeries")) == 2
+    assert archive.totals() == {"runs": 2, "turns": 4}
+
+    os.remove(art)
+    assert archive.index([str(logs)])["removed"] == 1
+    assert hits(archive, "forgeries") == []  # The delete trigger cleared the FTS rows
+    assert archive.totals() == {"runs": 1, "turns": 1}
+
+
+def test_filters_and_stats(tmp_path, archive):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    write_run(logs, "art", [("a", "Forgeries fool museums."), ("b", "Forgeries fool collectors.")])
+    log = create_log_file("coffee", str(logs / "old.md"))
+    append_log(log, "Judge", "Forgeries are dull.")
+    archive.index([str(logs)])
+    assert [row["speaker"] for row in archive.search("forgeries", persona="Riley")] == ["Riley Stone"]
+    assert [row["speaker"] for row in archive.search("forgeries", topic="coffee")] == ["Judge"]
+    assert {row["speaker"]: row["turns"] for row in archive.persona_stats()} == {
+        "Jamie Vale": 1, "Riley Stone": 1, "Judge": 1,
+    }
+    assert archive.top_words(1) == [("forgeries", 3)]
@@ -0,0 +1,42 @@
+import json
+import sys
+
+import requests
+
+import autotune
+
+
+def fake_tune(failing):
+    def tune_model(bench, model, args):
+        if model in failing:
+            raise requests.ConnectionError(f"{model} unreachable")
+        result = {"first_token_seconds": 0.1, "tokens_per_second": 20.0, "reply_seconds": 2.0}
+        options = {"num_ctx": 4096, "num_thread": 4}
+        return options, result, dict(result, reply_seconds=3.0), {4096: (options, result)}
+    return tune_model
+
+
+def run(monkeypatch, tmp_path, failing):
+    path = tmp_path / "profile.json"
+    monkeypatch.setattr(autotune, "tune_model", fake_tune(failing))
+    monkeypatch.setattr(sys, "argv", ["autotune.py", "--roles", "a=good,b=bad", "--profile", str(path)])
+    return autotune.main(), path
+
+
+def test_failed_model_keeps_the_others(monkeypatch, tmp_path):
+    code, path = run(monkeypatch, tmp_path, failing={"bad"})
+    assert code == 1
+    models = json.loads(path.read_text())["models"]
+    assert "good" in models and "bad" not in models
+
+
+def test_all_models_tuned(monkeypatch, tmp_path):
+    code, path = run(monkeypatch, tmp_path, failing=set())
+    assert code == 0
+    assert {"good", "bad"} <= set(json.loads(path.read_text())["models"])
+
+
+def test_nothing_saved_when_every_model_fails(monkeypatch, tmp_path):
+    code, path = run(monkeypatch, tmp_path, failing={"good", "bad", "mistral"})
+    assert code == 1
+    assert not path.exists()
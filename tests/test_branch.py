@@ -0,0 +1,59 @@
+import pytest
+
+from branch import describe, parse_branch, shared_history
+from duet import whisper_nudge
+
+AGENTS = ("a", "b")
+
+MESSAGES = [
+    {"role": "a", "text": "Hello."},
+    {"role": "room", "text": "forgeries"},
+    {"role": "judge", "text": "Score 7."},
+    {"role": "b", "text": "Forgeries, you say?"},
+    {"role": "a", "text": "Yes."},
+    {"role": "room", "text": "bees"},
+]
+
+
+def test_parse_branch_converts_values():
+    changes = parse_branch(" model=ollama:llama3; temperature=1.1 ;seed=7;whisper=What about coffee?;", AGENTS)
+    assert changes == {"model": "ollama:llama3", "temperature": 1.1, "seed": 7, "whisper": "What about coffee?"}
+    assert describe(changes).startswith("model=ollama:llama3; temperature=1.1")
+    assert describe({}) == "unchanged"
+
+
+def test_parse_branch_accepts_persona_files(tmp_path):
+    persona = tmp_path / "jack.md"
+    persona.write_text("# Jack")
+    assert parse_branch(f"b={persona}", AGENTS) == {"b": str(persona)}
+
+
+@pytest.mark.parametrize("spec", [
+    "whisper",
+    "whisper=",
+    "model=llama3",
+    "model=ollama:",
+    "temperature=warm",
+    "colour=blue",
+    "b=personas/missing-persona.md",
+])
+def test_parse_branch_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_branch(spec, AGENTS)
+
+
+def test_shared_history_stops_at_the_fork():
+    events, whisper, last, replies = shared_history(MESSAGES, AGENTS, at=2)
+    assert events == [
+        ("prompt", "a", None),
+        ("say", "a", "Hello."),
+        ("prompt", "b", whisper_nudge("forgeries")),
+        ("say", "b", "Forgeries, you say?"),
+    ]
+    assert (whisper, last, replies) == (None, "b", 2)
+
+
+def test_shared_history_carries_a_trailing_whisper():
+    events, whisper, last, replies = shared_history(MESSAGES, AGENTS, at=10)
+    assert (whisper, last, replies) == ("bees", "a", 3)
+    assert all(role != "judge" for _, role, _ in events)
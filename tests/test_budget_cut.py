@@ -0,0 +1,29 @@
+from duet import budget_cut, budget_tokens
+
+
+def test_continues_until_a_sentence_reaches_the_budget():
+    assert budget_cut("Short one. ", 5) is None
+    assert budget_cut("Short one. Then a longer sentence follows. And more", 5) == (
+        "Short one. Then a longer sentence follows."
+    )
+
+
+def test_waits_for_the_next_chunk_after_a_trailing_period():
+    assert budget_cut("It costs about 3.", 3) is None  # Could still become "3.5"
+    assert budget_cut("It costs about 3.5 dollars. Yes", 3) == "It costs about 3.5 dollars."
+    assert budget_cut("It costs about three.", 3, final=True) == "It costs about three."
+
+
+def test_question_and_exclamation_end_sentences():
+    assert budget_cut("Really? You think so! Fine ", 3) == "Really? You think so!"
+
+
+def test_hard_cut_at_twice_the_budget():
+    text = " ".join(["word"] * 12)
+    assert budget_cut(text, 5) == " ".join(["word"] * 10)
+    assert budget_cut(" ".join(["word"] * 10), 5) is None
+
+
+def test_budget_tokens_has_a_floor():
+    assert budget_tokens(5) == 64
+    assert budget_tokens(40) == 160
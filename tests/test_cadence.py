@@ -0,0 +1,68 @@
+from cadence import STEPS, CadenceController, template_whisper
+
+
+class Backend:
+    """The RoleChat attributes the controller touches."""
+
+    def __init__(self, max_words=60):
+        self.provider = "ollama"
+        self.ollama_model = "mistral"
+        self.anthropic_model = None
+        self.options = None
+        self.max_words = max_words
+
+    @property
+    def key(self):
+        return f"{self.provider}:{self.ollama_model}"
+
+    def downgrade(self, provider, model):
+        self.provider, self.ollama_model = provider, model
+
+
+def test_steps_without_word_budgets_skip_short_replies():
+    cadence = CadenceController(10.0, budgets=False, fallback=("ollama", "tiny"))
+    assert "short_replies" not in cadence.steps
+    assert cadence.steps[0] == "skip_interjections"
+
+
+def test_steps_without_fallback_skip_small_model():
+    assert CadenceController(10.0).steps == tuple(s for s in STEPS if s != "small_model")
+
+
+def test_first_degradation_without_budgets_takes_effect():
+    cadence = CadenceController(10.0, window=2, budgets=False)
+    assert cadence.observe(20.0) == 0
+    assert cadence.observe(20.0) == 1
+    assert cadence.active("skip_interjections")
+
+
+def test_degrades_after_a_slow_window_and_recovers_when_calm():
+    cadence = CadenceController(10.0, window=2)
+    cadence.observe(15.0)
+    assert cadence.observe(15.0) == 1 and cadence.level == 1
+    assert [cadence.observe(2.0) for _ in range(2)] == [0, -1]
+    assert cadence.level == 0
+
+
+def test_flapping_doubles_the_calm_stretch():
+    cadence = CadenceController(10.0, window=2)
+    for seconds in (15.0, 15.0, 2.0, 2.0, 15.0, 15.0):
+        cadence.observe(seconds)
+    assert cadence.level == 1
+    assert cadence.recover_after == 4
+
+
+def test_apply_scales_budgets_and_restores_the_model():
+    cadence = CadenceController(10.0, window=1, short_factor=0.5, fallback=("ollama", "tiny"))
+    backend = Backend(max_words=60)
+    cadence.level = cadence.steps.index("small_model") + 1
+    cadence.apply([backend])
+    assert backend.max_words == 30 and backend.key == "ollama:tiny"
+    cadence.level = 0
+    cadence.apply([backend])
+    assert backend.max_words == 60 and backend.key == "ollama:mistral"
+
+
+def test_template_whisper_is_stable_per_topic():
+    assert template_whisper("forgeries.") == template_whisper("forgeries")
+    assert "forgeries" in template_whisper("forgeries")
@@ -0,0 +1,70 @@
+import pytest
+
+from conversation import BREVITY_NUDGE, TRIMMED_NOTE, TranscriptStore, TurnScheduler
+
+
+def roles(messages):
+    return [m["role"] for m in messages]
+
+
+def test_each_agent_sees_its_own_lines_as_assistant():
+    store = TranscriptStore({"a": "Jamie", "b": "Riley"})
+    store.prompt("a", "Open the conversation.")
+    store.say("a", "Hello.")
+    store.say("b", "Hi.")
+    view_a = store.view("a", "system a")
+    view_b = store.view("b", "system b")
+    assert roles(view_a) == ["system", "user", "assistant", "user"]
+    assert view_a[-1]["content"] == "Hi." + BREVITY_NUDGE
+    assert roles(view_b) == ["system", "user", "assistant"]
+    assert view_b[1]["content"] == "Hello." + BREVITY_NUDGE
+
+
+def test_larger_cast_names_speakers_and_private_lines_stay_private():
+    store = TranscriptStore({"a": "Jamie", "b": "Riley", "c": "Sam"})
+    store.say("a", "One.")
+    store.say("b", "Two.")
+    store.say("judge", "Private note.", private=True)
+    view_c = store.view("c", "system")
+    assert view_c[1]["content"] == "Jamie: One.\n\nRiley: Two." + BREVITY_NUDGE
+    assert roles(store.view("judge", "system", public=False)) == ["system", "assistant"]
+
+
+def test_trimmed_view_still_opens_with_a_user_turn():
+    store = TranscriptStore({"a": "Jamie", "b": "Riley"})
+    for i in range(6):
+        store.say("ab"[i % 2], f"line {i}")
+    store.trim(3)
+    assert len(store) == 3 and store.trimmed == 3
+    view_b = store.view("b", "system")
+    assert view_b[1] == {"role": "user", "content": TRIMMED_NOTE}
+    assert roles(view_b)[2] == "assistant"
+
+
+def test_recent_returns_public_lines_oldest_first():
+    store = TranscriptStore({"a": "Jamie", "b": "Riley"})
+    store.say("a", "one")
+    store.prompt("b", "nudge")
+    store.say("b", "two")
+    store.say("a", "three")
+    assert store.recent(2) == [("b", "two"), ("a", "three")]
+
+
+def test_round_robin_rotates_after_the_last_speaker():
+    scheduler = TurnScheduler("abc")
+    assert scheduler.start_round() == ["b", "c", "a"]
+    scheduler.spoke("b")
+    assert scheduler.start_round() == ["c", "a", "b"]
+
+
+def test_shuffle_never_repeats_the_last_speaker():
+    scheduler = TurnScheduler("abcd", order="shuffle", seed=7)
+    for _ in range(50):
+        order = scheduler.start_round()
+        assert sorted(order) == list("abcd") and order[0] != scheduler.last
+        scheduler.spoke(order[-1])
+
+
+def test_unknown_order_is_rejected():
+    with pytest.raises(ValueError):
+        TurnScheduler("ab", order="alphabetical")
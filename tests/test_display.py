@@ -0,0 +1,101 @@
+import base64
+import io
+import json
+import os
+import socket
+
+import pytest
+
+from display import DisplayServer, ws_frame, ws_read_frame
+
+IMAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Artboard 1.png")
+
+
+def client_frame(payload, opcode=0x1, mask=b"\x01\x02\x03\x04"):
+    """A masked frame as a browser sends it."""
+    frame = bytearray(ws_frame(payload, opcode))
+    start = 2 + {126: 2, 127: 8}.get(frame[1], 0)
+    frame[1] |= 0x80
+    masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return bytes(frame[:start]) + mask + masked
+
+
+def reader(data):
+    stream = io.BytesIO(data)
+
+    def recv_exact(n):
+        chunk = stream.read(n)
+        if len(chunk) < n:
+            raise ConnectionError("short read")
+        return chunk
+
+    return recv_exact
+
+
+def test_read_masked_frames():
+    data = client_frame(b"hi", opcode=0x9) + client_frame(b"x" * 300) + client_frame(b"\x03\xe8", opcode=0x8)
+    recv_exact = reader(data)
+    assert ws_read_frame(recv_exact) == (0x9, b"hi")
+    assert ws_read_frame(recv_exact) == (0x1, b"x" * 300)
+    assert ws_read_frame(recv_exact) == (0x8, b"\x03\xe8")
+
+
+def test_oversized_client_frame_is_rejected():
+    with pytest.raises(ValueError):
+        ws_read_frame(reader(client_frame(b"x" * 70000)))
+
+
+def server_frame(sock):
+    def recv_exact(n):
+        data = b""
+        while len(data) < n:
+            chunk = sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("closed")
+            data += chunk
+        return data
+
+    return ws_read_frame(recv_exact)
+
+
+@pytest.fixture
+def display():
+    server = DisplayServer(IMAGE, (0, 0, 10, 10), (10, 0, 20, 10))
+    server.start(0)
+    yield server
+    server.stop()
+
+
+def connect(display):
+    sock = socket.create_connection(display._server.server_address[:2], timeout=5)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    sock.sendall(
+        f"GET /ws HTTP/1.1\r\nHost: test\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode("ascii")
+    )
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += sock.recv(1)
+    assert response.startswith(b"HTTP/1.1 101")
+    opcode, payload = server_frame(sock)
+    assert opcode == 0x1 and json.loads(payload)["type"] == "hello"
+    return sock
+
+
+def test_ping_gets_pong_and_close_is_echoed(display):
+    sock = connect(display)
+    sock.sendall(client_frame(b"are you there", opcode=0x9))
+    assert server_frame(sock) == (0xA, b"are you there")
+    sock.sendall(client_frame(b"\x03\xe8", opcode=0x8))
+    assert server_frame(sock) == (0x8, b"\x03\xe8")
+    assert sock.recv(1) == b""  # Server closed the connection
+    sock.close()
+
+
+def test_messages_reach_connected_clients(display):
+    sock = connect(display)
+    display.message("a", "left", "Jamie", "hello")
+    opcode, payload = server_frame(sock)
+    assert json.loads(payload)["text"] == "hello"
+    assert display.state["left"] == "hello"
+    sock.close()
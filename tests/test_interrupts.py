@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from interrupts import MAX_TRACKED, SpeechInterrupts
+
+
+def test_measuring_only_never_raises_the_flag():
+    interrupts = SpeechInterrupts(enabled=False)
+    interrupts.heard("forgeries")
+    assert not interrupts.due()
+    assert "interrupts" not in interrupts.summary_line()
+
+
+def test_cooldown_suppresses_interrupts():
+    interrupts = SpeechInterrupts(enabled=True, cooldown=60)
+    interrupts.heard("forgeries")
+    assert interrupts.due()
+    interrupts.begin(cancelled=True)
+    assert not interrupts.due()
+    interrupts.heard("bees")
+    assert not interrupts.due() and interrupts.suppressed == 1
+    assert (interrupts.interrupts, interrupts.cancelled) == (1, 1)
+
+
+def test_dismiss_clears_without_counting():
+    interrupts = SpeechInterrupts(enabled=True, cooldown=0)
+    interrupts.heard("forgeries")
+    interrupts.dismiss()
+    assert not interrupts.due() and interrupts.interrupts == 0
+
+
+def test_whisper_then_reply_latencies():
+    interrupts = SpeechInterrupts()
+    spoken = time.perf_counter() - 2.0
+    interrupts.heard("forgeries", spoken_at=spoken)
+    assert interrupts.whispered("bees") is None
+    assert interrupts.whispered("forgeries") == pytest.approx(2.0, abs=0.5)
+    assert interrupts.replied() >= interrupts.whisper_seconds[0]
+    assert interrupts.replied() is None  # Only the first reply after the whisper counts
+    assert interrupts.reactions == 1 and len(interrupts.reply_seconds) == 1
+
+
+def test_tracked_topics_are_bounded():
+    interrupts = SpeechInterrupts()
+    for i in range(MAX_TRACKED + 5):
+        interrupts.heard(f"topic {i}")
+    assert interrupts.whispered("topic 0") is None
+    assert interrupts.whispered(f"topic {MAX_TRACKED + 4}") is not None
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from judging import BatchJudge, build_window_prompt, parse_scores, window_means
+
+
+def test_parse_requested_shape_inside_prose():
+    reply = 'Sure! {"scores": [{"turn": 3, "rigor": 7, "novelty": 5, "repetition": 2}, ' \
+            '{"turn": 4, "rigor": "8", "novelty": 12, "repetition": 0}], "note": "Go deeper."} Thanks.'
+    per_turn, note = parse_scores(reply, [3, 4])
+    assert per_turn == {
+        3: {"rigor": 7.0, "novelty": 5.0, "repetition": 2.0},
+        4: {"rigor": 8.0, "novelty": 10.0, "repetition": 1.0},  # Clamped to 1-10
+    }
+    assert note == "Go deeper."
+
+
+def test_parse_bare_list_without_turns():
+    per_turn, note = parse_scores('[{"rigor": 6}, {"rigor": 4, "novelty": "n/a"}]', [7, 8])
+    assert per_turn[7]["rigor"] == 6.0 and per_turn[8]["novelty"] is None
+    assert note == ""
+
+
+def test_parse_flat_object_applies_to_every_exchange():
+    per_turn, _ = parse_scores('{"rigor": 5, "novelty": 6, "repetition": 7, "comment": "ok"}', [1, 2])
+    assert per_turn[1] == per_turn[2] == {"rigor": 5.0, "novelty": 6.0, "repetition": 7.0}
+
+
+@pytest.mark.parametrize("reply", ["No scores today.", '{"note": "nothing"}', '[{"turn": 99, "rigor": 5}]'])
+def test_parse_rejects_replies_without_scores(reply):
+    with pytest.raises(ValueError):
+        parse_scores(reply, [1, 2])
+
+
+def test_window_means_skip_missing_scores():
+    means = window_means({1: {"rigor": 4.0, "novelty": None, "repetition": 2.0},
+                          2: {"rigor": 7.0, "novelty": None, "repetition": 3.0}})
+    assert means == {"rigor": 5.5, "novelty": None, "repetition": 2.5}
+
+
+def test_window_prompt_lists_every_exchange():
+    prompt = build_window_prompt([(1, [("Jamie", "Hi.")]), (2, [("Riley", "Hello.")])])
+    assert "Exchange 1:\nJamie: Hi." in prompt and "(1, 2)" in prompt
+
+
+class FakeJudge:
+    key = "ollama:judge"
+
+    def chat(self, system_prompt, messages):
+        return '{"scores": [{"turn": 1, "rigor": 6, "novelty": 6, "repetition": 2}, ' \
+               '{"turn": 2, "rigor": 8, "novelty": 4, "repetition": 4}], "note": "More examples."}'
+
+
+def test_batch_judge_scores_full_windows(tmp_path):
+    path = tmp_path / "scores.jsonl"
+    judge = BatchJudge(FakeJudge(), "system", str(path), window=2)
+    judge.add(1, [("Jamie", "Hi.")])
+    judge.add(2, [("Riley", "Hello.")])
+    judge.add(3, [("Jamie", "Unfinished window.")])
+    judge.shutdown()
+    [record] = judge.drain()
+    assert record["turns"] == [1, 2] and record["mean"]["rigor"] == 7.0
+    assert json.loads(path.read_text())["note"] == "More examples."
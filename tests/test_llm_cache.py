@@ -0,0 +1,65 @@
+import itertools
+
+import pytest
+
+import llm_cache
+from llm_cache import CacheMiss, ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time.time(), so LRU order never depends on timer resolution."""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(llm_cache.time, "time", lambda: float(next(ticks)))
+
+
+def open_cache(tmp_path, **kwargs):
+    return ResponseCache(str(tmp_path / "responses.sqlite"), **kwargs)
+
+
+def test_key_ignores_system_messages_and_key_order():
+    messages = [{"role": "system", "content": "x"}, {"role": "user", "content": "hi", "extra": 1}]
+    key = ResponseCache.make_key("ollama", "mistral", {"a": 1, "b": 2}, "sys", messages)
+    assert key == ResponseCache.make_key("ollama", "mistral", {"b": 2, "a": 1}, "sys", messages[1:])
+    assert key != ResponseCache.make_key("ollama", "llama3", {"a": 1, "b": 2}, "sys", messages)
+
+
+def test_lru_evicts_least_recently_used(tmp_path, clock):
+    cache = open_cache(tmp_path, max_bytes=20)
+    cache.put("a", "ollama", "m", "x" * 8)
+    cache.put("b", "ollama", "m", "x" * 8)
+    assert cache.get("a") is not None  # a is now more recent than b
+    cache.put("c", "ollama", "m", "x" * 8)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 16
+
+
+def test_readwrite_computes_once(tmp_path):
+    cache = open_cache(tmp_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "reply"
+
+    assert cache.fetch("k", "ollama", "m", compute) == cache.fetch("k", "ollama", "m", compute) == "reply"
+    assert len(calls) == 1 and cache.hits == 1 and cache.misses == 1
+
+
+def test_record_always_computes_and_replay_never_does(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    record = ResponseCache(path, mode="record")
+    record.put("k", "ollama", "m", "old")
+    assert record.fetch("k", "ollama", "m", lambda: "new") == "new"
+    record.close()
+
+    replay = ResponseCache(path, mode="replay")
+    assert replay.fetch("k", "ollama", "m", lambda: pytest.fail("replay called the provider")) == "new"
+    with pytest.raises(CacheMiss):
+        replay.fetch("other", "ollama", "m", lambda: "never")
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_cache(tmp_path, mode="sometimes")
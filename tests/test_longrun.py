@@ -0,0 +1,70 @@
+import gzip
+import os
+
+import longrun
+from longrun import LogRotator, MemoryMonitor
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_rotate_gzips_and_reopens_every_tracked_file(tmp_path):
+    log, transcript = str(tmp_path / "run.md"), str(tmp_path / "run.jsonl")
+    rotator = LogRotator(max_bytes=10)
+    for path in (log, transcript):
+        write(path, "0123456789")
+        rotator.track(path, lambda path=path: write(path, "header\n"))
+    rotator.track(None, None)  # No transcript configured
+    assert rotator and rotator.due()
+    closed = rotator.rotate()
+    assert len(closed) == 2 and all(p.endswith(".gz") for p in closed)
+    with gzip.open(closed[0], "rt") as f:
+        assert f.read() == "0123456789"
+    assert open(log).read() == "header\n"
+    assert not rotator.due() and rotator.rotations == 1
+
+
+def test_age_limit_and_disabled_rotator():
+    assert not LogRotator()
+    rotator = LogRotator(max_age=60)
+    rotator.opened -= 61
+    assert rotator.due()
+
+
+def test_archive_names_clash_free_and_skips_empty_files(tmp_path):
+    path = str(tmp_path / "run.md")
+    rotator = LogRotator()
+    write(path, "")
+    assert rotator.archive(path) is None
+    names = []
+    for text in ("one", "two"):
+        write(path, text)
+        names.append(os.path.basename(rotator.archive(path, "20250101-120000")))
+    assert names == ["run.20250101-120000.md.gz", "run.20250101-120000-1.md.gz"]
+    assert not os.path.exists(path)
+
+
+def test_retention_keeps_the_newest_segments_per_file(tmp_path):
+    path, other = str(tmp_path / "run.md"), str(tmp_path / "run.jsonl")
+    rotator = LogRotator(keep=2)
+    write(other, "transcript")
+    rotator.archive(other, "20250101-000000")
+    for stamp in ("20250101-000000", "20250102-000000", "20250102-000000", "20250103-000000"):
+        write(path, stamp)
+        rotator.archive(path, stamp)
+    assert sorted(os.listdir(tmp_path)) == [
+        "run.20250101-000000.jsonl.gz", "run.20250102-000000-1.md.gz", "run.20250103-000000.md.gz",
+    ]
+    assert rotator.deleted == 2
+    assert rotator.summary_line() == "0 rotations, 2 old segments deleted"
+
+
+def test_memory_monitor_limit_and_summary(monkeypatch):
+    rss = iter([100 * 2**20, 300 * 2**20])
+    monkeypatch.setattr(longrun, "process_rss_bytes", lambda: next(rss))
+    memory = MemoryMonitor(interval=0, limit_mb=200)
+    assert not memory.due()  # interval 0 disables sampling
+    assert memory.sample() == 300 * 2**20 and memory.over_limit()
+    assert memory.summary_line().startswith("RSS 300.0 MB (+200.0 MB in 0.0h, peak 300.0 MB)")
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from loops import LoopDetector, shingles
+
+REPLY = "The forger always signs the canvas in the lower left corner with a tiny heron."
+OTHER = [
+    "Museums rarely check pigment chemistry before they buy a painting.",
+    "My aunt kept bees on a rooftop in Lisbon for twenty years.",
+    "Trains in winter smell of wet wool and burnt coffee.",
+    "Chess clubs argue endlessly about which opening is honest.",
+]
+
+
+def test_shingles_drop_stopwords_from_unigrams_only():
+    grams = shingles("The heron and the canvas")
+    assert "the" not in grams and "heron" in grams
+    assert "the heron" in grams and "and the canvas" in grams
+
+
+def test_distinct_replies_never_loop():
+    detector = LoopDetector(window=4, patience=2)
+    assert not any(detector.observe("a", text) for text in OTHER)
+    assert detector.loops == 0 and detector.peak_score < detector.threshold
+
+
+def test_repeats_report_a_loop_after_patience():
+    detector = LoopDetector(window=4, patience=2)
+    assert [detector.observe("a", REPLY) for _ in range(3)] == [False, False, True]
+    assert detector.loops == 1 and detector.last_score == pytest.approx(1.0)
+    assert not detector.observe("b", REPLY)  # Still pending an intervention
+
+
+def test_cooldown_then_escalation_for_recurring_loops():
+    detector = LoopDetector(window=4, patience=2, cooldown=2)
+    for _ in range(3):
+        detector.observe("a", REPLY)
+    detector.intervened("whisper")
+    results = [detector.observe("a", REPLY) for _ in range(4)]
+    assert results == [False, False, False, True]
+    assert detector.level == 1
+    detector.intervened("icebreaker")
+    assert detector.stats()["interventions"] == {"whisper": 1, "icebreaker": 1}
+
+
+def test_empty_replies_are_ignored_and_density_tracks_the_window():
+    detector = LoopDetector(window=3)
+    assert not detector.observe("a", "")
+    assert detector.replies == 0 and detector.density() == 0.0
+    for _ in range(5):
+        detector.observe("a", REPLY)
+    assert detector.density() == pytest.approx(1.0)
+    assert "detected over 5 replies" in detector.summary_line()
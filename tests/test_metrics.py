@@ -0,0 +1,62 @@
+import urllib.request
+
+from metrics import Metrics
+
+
+def enabled():
+    registry = Metrics()
+    registry.enabled = True
+    return registry
+
+
+def test_disabled_registry_ignores_updates():
+    registry = Metrics()
+    registry.inc("duet_turns_total")
+    registry.observe("duet_llm_latency_seconds", 1.0)
+    assert registry.render() == "\n"
+
+
+def test_counters_with_labels_and_escaping():
+    registry = enabled()
+    registry.inc("duet_llm_errors_total", help="Failed LLM requests", role="a", backend='ollama:"x"')
+    registry.inc("duet_llm_errors_total", role="a", backend='ollama:"x"')
+    text = registry.render()
+    assert "# HELP duet_llm_errors_total Failed LLM requests" in text
+    assert 'duet_llm_errors_total{backend="ollama:\\"x\\"",role="a"} 2' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = enabled()
+    for value in (0.05, 0.3, 7.0):
+        registry.observe("duet_render_seconds", value, buckets=(0.1, 0.5, 1.0))
+    lines = registry.render().splitlines()
+    assert 'duet_render_seconds_bucket{le="0.1"} 1' in lines
+    assert 'duet_render_seconds_bucket{le="0.5"} 2' in lines
+    assert 'duet_render_seconds_bucket{le="1.0"} 2' in lines
+    assert 'duet_render_seconds_bucket{le="+Inf"} 3' in lines
+    assert "duet_render_seconds_count 3" in lines
+
+
+def test_gauges_are_read_at_scrape_time_and_failures_skipped():
+    registry = enabled()
+    queue = []
+    registry.gauge("duet_topic_queue_length", lambda: len(queue))
+    registry.gauge("duet_broken", lambda: 1 / 0)
+    registry.gauge("duet_endpoint_up", lambda: {(("endpoint", "a"),): 1})
+    queue.append("topic")
+    text = registry.render()
+    assert "duet_topic_queue_length 1" in text
+    assert 'duet_endpoint_up{endpoint="a"} 1' in text
+    assert "duet_broken" not in text
+
+
+def test_serve_exposes_metrics():
+    registry = Metrics()
+    registry.serve(0)
+    try:
+        registry.inc("duet_turns_total")
+        host, port = registry._server.server_address[:2]
+        body = urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5).read().decode("utf-8")
+        assert "duet_turns_total 1" in body and "duet_uptime_seconds" in body
+    finally:
+        registry.stop()
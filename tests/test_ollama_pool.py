@@ -0,0 +1,58 @@
+import pytest
+
+from ollama_pool import OllamaPool, chat_url, model_matches
+
+URLS = ["box1:11434", "http://box2:11434/"]
+
+
+def lease(pool, role, model="mistral"):
+    with pool.lease(role, model) as url:
+        return url
+
+
+@pytest.mark.parametrize("url", ["box1:11434", "http://box1:11434", "http://box1:11434/api/chat/"])
+def test_chat_url_normalises(url):
+    assert chat_url(url) == "http://box1:11434/api/chat"
+
+
+def test_model_matches_latest_tag():
+    assert model_matches("mistral", {"mistral:latest"})
+    assert not model_matches("mistral:7b", {"mistral:latest"})
+
+
+def test_bad_pins_are_rejected():
+    with pytest.raises(ValueError):
+        OllamaPool(URLS, pins={"judge": 2})
+    with pytest.raises(ValueError):
+        OllamaPool(URLS, pins={"judge": "box3:11434"})
+    with pytest.raises(ValueError):
+        OllamaPool([])
+
+
+def test_pinned_role_uses_its_endpoint_until_down():
+    pool = OllamaPool(URLS, pins={"judge": "box2:11434"})
+    assert lease(pool, "judge") == "http://box2:11434/api/chat"
+    pool.mark_down(pool.endpoints[1], ConnectionError())
+    assert lease(pool, "judge") == "http://box1:11434/api/chat"
+
+
+def test_unpinned_work_goes_to_the_least_loaded_endpoint():
+    pool = OllamaPool(URLS)
+    with pool.lease("user", "mistral") as first:
+        assert lease(pool, "room") != first
+    pool.endpoints[0].models = {"llama3:latest"}
+    assert lease(pool, "room", "mistral") == pool.endpoints[1].url
+
+
+def test_sticky_role_keeps_its_endpoint_and_moves_when_down(capsys):
+    pool = OllamaPool(URLS, sticky={"a"})
+    first = lease(pool, "a")
+    assert all(lease(pool, "a") == first for _ in range(3))
+    with pytest.raises(ConnectionError):
+        with pool.lease("a", "mistral"):
+            raise ConnectionError("refused")
+    assert lease(pool, "a") != first
+    assert "moving to" in capsys.readouterr().out
+    assert pool.healthy_count() == 1
+    assert [row["failures"] for row in pool.rows()] == [1, 0]
+    assert all(row["outstanding"] == 0 for row in pool.rows())
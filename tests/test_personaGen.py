@@ -0,0 +1,96 @@
+import sys
+
+import pytest
+
+import personaGen
+from personaGen import load_spec, normalize_row, parse_sections, validate_headers
+
+
+def answers(**fields):
+    return normalize_row(dict({"name": "Jamie Vale", "shortname": "Jamie"}, **fields))
+
+
+def test_parse_sections_accepts_markdown_and_bold_headings():
+    reply = (
+        "Sure, here you go.\n"
+        "## Worldview\nCurious about everything.\n\n"
+        "**Signature Quirks:**\n- Hums\n- Collects keys\n"
+        "### **Mission**\n\n"
+        "## Expressive Gears\n### Rational\nWeighs the evidence.\n### Surreal\nTalks to the paintings.\n"
+    )
+    sections = parse_sections(reply, ["worldview", "quirks", "mission", "gears"])
+    assert sections == {
+        "worldview": "Curious about everything.",
+        "quirks": "- Hums\n- Collects keys",
+        "gears": "### Rational\nWeighs the evidence.\n### Surreal\nTalks to the paintings.",
+    }  # Empty sections are dropped; gear subheadings stay inside their section
+
+
+@pytest.mark.parametrize("fields, problem", [
+    ({"name": ""}, "Name is empty"),
+    ({"shortname": "Jamie\nVale"}, "ShortName must be a single line"),
+    ({"shortname": "J" * 25}, "ShortName is longer than 24 characters"),
+])
+def test_validate_headers(fields, problem):
+    assert validate_headers(answers(**fields)) == [problem]
+    assert validate_headers(answers()) == []
+
+
+def test_csv_spec_normalises_columns(tmp_path):
+    path = tmp_path / "spec.csv"
+    path.write_text("Name,Short Name,Core-Traits,brief\nJamie Vale,Jamie,- Curious,a restorer\n", encoding="utf-8")
+    [row] = load_spec(str(path))
+    assert (row["shortname"], row["personality"], row["brief"], row["mission"]) == ("Jamie", "- Curious", "a restorer", "")
+
+
+def test_yaml_spec_defaults_and_lists(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "spec.yaml"
+    path.write_text(
+        "defaults:\n  mission: Keep it moving.\n"
+        "personas:\n  - name: Jamie Vale\n    shortname: Jamie\n    domains: [art, bees]\n    quirks: [Hums]\n"
+        "  - name: Riley Stone\n    shortname: Riley\n    mission: Argue.\n",
+        encoding="utf-8",
+    )
+    jamie, riley = load_spec(str(path))
+    assert (jamie["domains"], jamie["quirks"], jamie["mission"]) == ("art, bees", "- Hums", "Keep it moving.")
+    assert riley["mission"] == "Argue."
+
+
+@pytest.mark.parametrize("name, content", [
+    ("spec.txt", ""),
+    ("spec.csv", "name,colour\nJamie,blue\n"),
+    ("spec.csv", "name\nJamie,extra\n"),
+])
+def test_bad_specs_are_rejected(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_spec(str(path))
+
+
+def run_batch(monkeypatch, tmp_path, spec, *flags):
+    path = tmp_path / "spec.csv"
+    path.write_text(spec, encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["personaGen.py", "--batch", str(path), "--out-dir", str(tmp_path / "out"), *flags])
+    personaGen.run_batch(personaGen.parse_args())
+
+
+@pytest.mark.parametrize("file", ["../escape.md", "/tmp/abs.md", "notes.txt", "sub\\..\\..\\x.md"])
+def test_batch_rejects_file_paths_outside_out_dir(monkeypatch, tmp_path, capsys, file):
+    run_batch(monkeypatch, tmp_path, f"name,shortname,file\nJamie Vale,Jamie,{file}\n", "--check")
+    assert "must be a relative .md path" in capsys.readouterr().out
+
+
+def test_batch_writes_readable_personas(monkeypatch, tmp_path, capsys):
+    run_batch(monkeypatch, tmp_path, "name,shortname,file\nJamie Vale,Jamie,\nRiley Stone,Riley,sub/riley.md\n")
+    out = capsys.readouterr().out
+    assert "Wrote 2 personas" in out and "Warning" not in out
+    assert (tmp_path / "out" / "jamie.md").read_text().startswith("Name: Jamie Vale\nShortName: Jamie\n")
+    assert (tmp_path / "out" / "sub" / "riley.md").exists()
+
+
+def test_batch_rejects_duplicate_shortnames(monkeypatch, tmp_path, capsys):
+    run_batch(monkeypatch, tmp_path, "name,shortname\nJamie Vale,Jamie\nJamie Two,jamie\n")
+    assert "same shortname as persona 1" in capsys.readouterr().out
+    assert not (tmp_path / "out").exists()
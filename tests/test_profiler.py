@@ -0,0 +1,50 @@
+import json
+import threading
+from contextlib import nullcontext
+
+from profiler import Profiler
+
+
+def test_disabled_spans_record_nothing():
+    profiler = Profiler()
+    assert isinstance(profiler.span("view"), nullcontext)
+    profiler.add("chat", 0.0, 1.0)
+    assert profiler.summary() == []
+
+
+def test_summary_groups_by_phase():
+    profiler = Profiler()
+    profiler.enable()
+    start = profiler._origin
+    for duration in (0.1, 0.2, 0.3):
+        profiler.add("llm_chat", start, duration, cat="llm")
+    profiler.add("append_log", start, 0.05, cat="io")
+    llm, log = profiler.summary()
+    assert (llm["name"], llm["count"], round(llm["total"], 3), llm["max"]) == ("llm_chat", 3, 0.6, 0.3)
+    assert log["name"] == "append_log"
+
+
+def test_span_records_exceptions_too():
+    profiler = Profiler()
+    profiler.enable()
+    try:
+        with profiler.span("render", cat="render", turn=1):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert profiler.summary()[0]["name"] == "render"
+
+
+def test_chrome_trace_names_threads(tmp_path):
+    profiler = Profiler()
+    profiler.enable()
+    with profiler.span("main_phase"):
+        pass
+    worker = threading.Thread(target=lambda: profiler.add("whisper", profiler._origin, 0.01), name="whisper-0")
+    worker.start()
+    worker.join()
+    path = tmp_path / "trace" / "run.trace.json"
+    assert profiler.write_chrome_trace(str(path)) == 2
+    events = json.loads(path.read_text())["traceEvents"]
+    assert {e["args"]["name"] for e in events if e["ph"] == "M"} >= {"whisper-0"}
+    assert [e["name"] for e in events if e["ph"] == "X"] == ["main_phase", "whisper"]
@@ -0,0 +1,64 @@
+import os
+
+from registry import PersonaRegistry
+
+
+def write(path, text, mtime):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_load_parses_once(tmp_path):
+    path = tmp_path / "jamie.md"
+    write(path, "Jamie", 1_000_000_000)
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        return open(p, encoding="utf-8").read()
+
+    registry = PersonaRegistry()
+    assert registry.load(str(path), loader) == registry.load(str(path), loader) == "Jamie"
+    assert len(calls) == 1
+
+
+def test_poll_reloads_only_changed_files(tmp_path):
+    jamie, riley = tmp_path / "jamie.md", tmp_path / "riley.md"
+    write(jamie, "Jamie", 1_000_000_000)
+    write(riley, "Riley", 1_000_000_000)
+    registry = PersonaRegistry(min_interval=0)
+    for path in (jamie, riley):
+        registry.load(str(path), lambda p: open(p, encoding="utf-8").read())
+    assert registry.poll(force=True) == []
+    write(jamie, "Jamie, edited", 2_000_000_000)
+    assert registry.poll(force=True) == [str(jamie)]
+    assert registry.get(str(jamie)) == "Jamie, edited" and registry.get(str(riley)) == "Riley"
+
+
+def test_failed_reload_keeps_previous_value_and_retries(tmp_path):
+    path = tmp_path / "jamie.md"
+    write(path, "Jamie", 1_000_000_000)
+
+    def loader(p):
+        text = open(p, encoding="utf-8").read()
+        if not text:
+            raise ValueError("empty persona")
+        return text
+
+    registry = PersonaRegistry(min_interval=0)
+    registry.load(str(path), loader)
+    write(path, "", 2_000_000_000)  # Caught mid-save
+    assert registry.poll(force=True) == []
+    assert registry.get(str(path)) == "Jamie"
+    write(path, "Jamie again", 3_000_000_000)
+    assert registry.poll(force=True) == [str(path)]
+
+
+def test_poll_is_rate_limited(tmp_path):
+    path = tmp_path / "jamie.md"
+    write(path, "Jamie", 1_000_000_000)
+    registry = PersonaRegistry(min_interval=3600)
+    registry.load(str(path), lambda p: open(p, encoding="utf-8").read())
+    registry.poll()
+    write(path, "Jamie, edited", 2_000_000_000)
+    assert registry.poll() == []
@@ -0,0 +1,42 @@
+import os
+
+from render_video import build_states, concat_quote, write_concat_list
+
+
+def test_concat_quote_escapes_apostrophes():
+    assert concat_quote("/frames/O'Brien/frame.png") == "'/frames/O'\\''Brien/frame.png'"
+
+
+def test_concat_list_repeats_the_last_frame(tmp_path):
+    frames = [str(tmp_path / "Jack's" / f"frame_{i:06d}.png") for i in range(2)]
+    list_path = tmp_path / "frames.txt"
+    write_concat_list(frames, [("", "", 1.5), ("", "", 2.0)], str(list_path))
+    lines = list_path.read_text(encoding="utf-8").splitlines()
+    assert lines == [
+        f"file {concat_quote(frames[0])}", "duration 1.500",
+        f"file {concat_quote(frames[1])}", "duration 2.000",
+        f"file {concat_quote(frames[1])}",
+    ]
+    assert "Jack'\\''s" in lines[0] and os.path.isabs(frames[0])
+
+
+def test_states_alternate_balloons_and_hold_on_other_roles():
+    messages = [
+        {"role": "a", "text": "Hello there."},
+        {"role": "room", "text": "Someone mentions forgeries."},
+        {"role": "b", "text": "Hi."},
+    ]
+    assert build_states(messages, [2.0, 1.0, 3.0]) == [
+        ("Hello there.", "", 3.0),  # The whisper keeps the current frame up
+        ("", "Hi.", 3.0),
+    ]
+
+
+def test_show_both_keeps_the_other_balloon():
+    messages = [{"role": "a", "text": "One."}, {"role": "b", "text": "Two."}]
+    assert build_states(messages, [1.0, 1.0], show_both=True)[-1] == ("One.", "Two.", 1.0)
+
+
+def test_reveal_steps_words_and_caps_the_hold():
+    states = build_states([{"role": "a", "text": "one two three"}], [60.0], reveal=4.0, max_hold=10.0)
+    assert states == [("one", "", 0.25), ("one two", "", 0.25), ("one two three", "", 9.5)]
@@ -0,0 +1,53 @@
+import gzip
+import shutil
+
+from duet import append_log, append_transcript, create_log_file, create_transcript, format_pairs, parse_pairs
+from replay import load_any, message_delays
+
+JAMIE = {"name": "Jamie Vale", "short_name": "Jamie"}
+RILEY = {"name": "Riley Stone", "short_name": "Riley"}
+
+
+def test_pairs_round_trip():
+    mapping = {"a": "Jamie Vale", "b": "ollama:mistral"}
+    assert parse_pairs(format_pairs(mapping)) == mapping
+
+
+def test_log_round_trip_with_cast(tmp_path):
+    path = create_log_file("art", str(tmp_path / "run.md"),
+                           {"Cast": format_pairs({"a": JAMIE["name"], "b": RILEY["name"], "room": "The Room"})})
+    append_log(path, JAMIE["name"], "First line.\nSecond line.")
+    append_log(path, "The Room", "Someone mentions forgeries.")
+    append_log(path, RILEY["name"], "Reply.")
+    transcript = load_any(path)
+    assert transcript["topic"] == "art"
+    assert [(m["role"], m["text"]) for m in transcript["messages"]] == [
+        ("a", "First line. Second line."), ("room", "Someone mentions forgeries."), ("b", "Reply."),
+    ]
+
+
+def test_log_without_cast_infers_roles(tmp_path):
+    path = create_log_file("art", str(tmp_path / "old.md"))
+    for name in (JAMIE["name"], RILEY["name"], "Judge", JAMIE["name"]):
+        append_log(path, name, "text")
+    assert [m["role"] for m in load_any(path)["messages"]] == ["a", "b", "other", "a"]
+
+
+def test_gzipped_transcript(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    create_transcript(path, {"topic": "art", "cast": {"a": JAMIE["name"]}})
+    append_transcript(path, "a", JAMIE, "Hello.")
+    append_transcript(path, "b", RILEY, "Hi.")
+    with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    transcript = load_any(path + ".gz")
+    assert transcript["cast"] == {"a": JAMIE["name"]}
+    assert [(m["role"], m["short"], m["text"]) for m in transcript["messages"]] == [
+        ("a", "Jamie", "Hello."), ("b", "Riley", "Hi."),
+    ]
+
+
+def test_message_delays():
+    messages = [{"ts": 10.0}, {"ts": 14.0}, {"ts": None}, {"ts": 20.0}]
+    assert message_delays(messages, pause=3.0, speed=2.0) == [2.0, 1.5, 1.5, 1.5]
+    assert message_delays(messages, pause=3.0, speed=0) == [0.0] * 4
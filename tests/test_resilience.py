@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from duet import RoleChat, should_failover
+from interrupts import Interrupted
+from llm_cache import CacheMiss
+from resilience import LatencyTracker, hedged_call
+from usage import BudgetExceeded
+
+NO_FAILOVER = [CacheMiss("not cached"), BudgetExceeded("over budget"), Interrupted("half a sen")]
+
+
+def hedged_roles(primary, fallback, samples=5, seconds=0.05):
+    """A RoleChat with a warmed-up hedge threshold; primary/fallback replace the real requests."""
+    tracker = LatencyTracker()
+    role = RoleChat("a", "ollama", "http://localhost:1", "primary", None, tracker=tracker, retries=0,
+                    hedge_min_samples=samples,
+                    fallback=RoleChat("a", "ollama", "http://localhost:1", "fallback", None, retries=0))
+    for _ in range(samples):
+        tracker.record(role.hedge_key, seconds)
+    role._call = lambda system_prompt, messages, cancel=None, quiet=False: primary(cancel)
+    role.fallback._call = lambda system_prompt, messages, cancel=None, quiet=False: fallback(cancel)
+    return role
+
+
+def test_hedged_call_returns_fast_primary_without_fallback():
+    calls = []
+    assert hedged_call(lambda c: "a", lambda c: calls.append(1), 1.0) == ("a", "primary")
+    assert calls == []
+
+
+def test_hedged_call_cancels_slow_primary_when_fallback_wins():
+    cancelled = threading.Event()
+
+    def slow(cancel):
+        for _ in range(100):
+            if cancel.is_set():
+                cancelled.set()
+                raise Interrupted()
+            time.sleep(0.01)
+        return "slow"
+
+    assert hedged_call(slow, lambda c: "fast", 0.05) == ("fast", "fallback")
+    assert cancelled.wait(1.0)
+
+
+def test_hedged_call_raises_primary_error_when_both_fail(capsys):
+    def fail(message):
+        def fn(cancel):
+            raise ValueError(message)
+        return fn
+
+    with pytest.raises(ValueError, match="primary"):
+        hedged_call(fail("primary"), fail("fallback"), 1.0, label="a")
+    out = capsys.readouterr().out
+    assert "primary" in out and "fallback" in out
+
+
+@pytest.mark.parametrize("error", NO_FAILOVER, ids=lambda e: type(e).__name__)
+def test_should_failover_rejects_turn_ending_errors(error):
+    assert not should_failover(error)
+    assert should_failover(ValueError("backend down"))
+
+
+@pytest.mark.parametrize("error", NO_FAILOVER, ids=lambda e: type(e).__name__)
+def test_hedged_chat_does_not_fail_over_fast_errors(error):
+    calls = []
+
+    def primary(cancel):
+        raise error
+
+    role = hedged_roles(primary, lambda cancel: calls.append(1) or "fallback reply")
+    with pytest.raises(type(error)):
+        role.chat("system", [])
+    assert calls == []
+
+
+@pytest.mark.parametrize("error", NO_FAILOVER, ids=lambda e: type(e).__name__)
+def test_hedged_chat_cancels_fallback_on_turn_ending_error(error):
+    fallback_cancelled = threading.Event()
+
+    def primary(cancel):
+        time.sleep(0.2)  # Past the hedge threshold, so the fallback is running
+        raise error
+
+    def fallback(cancel):
+        for _ in range(200):
+            if cancel.is_set():
+                fallback_cancelled.set()
+                raise Interrupted()
+            time.sleep(0.01)
+        return "fallback reply"
+
+    role = hedged_roles(primary, fallback)
+    with pytest.raises(type(error)):
+        role.chat("system", [])
+    assert fallback_cancelled.wait(1.0)
+
+
+def test_hedged_chat_fails_over_other_errors():
+    def primary(cancel):
+        raise ConnectionError("refused")
+
+    role = hedged_roles(primary, lambda cancel: "fallback reply")
+    assert role.chat("system", []) == "fallback reply"
@@ -0,0 +1,66 @@
+import pytest
+
+from duet import RoleChat, stable_key
+from interrupts import Interrupted
+from llm_cache import CacheMiss
+from resilience import LatencyTracker
+from routing import RoutedChat, Router, relative_cost
+from usage import BudgetExceeded
+
+
+def backend(model, reply=None, error=None):
+    role = RoleChat("room", "ollama", "http://localhost:1", model, None, retries=0)
+
+    def chat(system_prompt, messages):
+        if error:
+            raise error
+        return reply
+
+    role.chat = chat
+    return role
+
+
+def routed(*backends):
+    tracker = LatencyTracker()
+    return RoutedChat("room", list(backends), Router(tracker)), tracker
+
+
+def test_relative_cost_uses_longest_prefix():
+    assert relative_cost("ollama:mistral") == 0.0
+    assert relative_cost("anthropic:claude-haiku-4-5") == 1.0
+    assert relative_cost("anthropic:claude-new") == 3.0
+    assert relative_cost("openai:gpt") == 1.0
+
+
+def test_router_prefers_faster_backend():
+    fast, slow = backend("fast"), backend("slow")
+    router = Router(LatencyTracker())
+    for _ in range(3):
+        router.tracker.record(fast.key, 1.0)
+        router.tracker.record(slow.key, 5.0)
+    assert router.rank([slow, fast]) == [fast, slow]
+
+
+def test_routed_chat_falls_through_and_penalizes():
+    chat, tracker = routed(backend("down", error=ConnectionError("refused")), backend("up", reply="hi"))
+    assert chat.chat("system", []) == "hi"
+    assert chat.key == "ollama:up"
+    assert tracker.mean("ollama:down") is not None
+
+
+@pytest.mark.parametrize("error", [CacheMiss("miss"), BudgetExceeded("spent"), Interrupted("cut")],
+                         ids=lambda e: type(e).__name__)
+def test_routed_chat_raises_turn_ending_errors(error):
+    chat, tracker = routed(backend("first", error=error), backend("second", reply="hi"))
+    with pytest.raises(type(error)):
+        chat.chat("system", [])
+    assert tracker.mean("ollama:first") is None
+
+
+def test_stable_key_ignores_last_backend():
+    chat, _ = routed(backend("b", error=ConnectionError("refused")), backend("a", reply="hi"))
+    before = stable_key(chat)
+    chat.chat("system", [])
+    assert chat.key == "ollama:a"
+    assert stable_key(chat) == before == "ollama:a+ollama:b"
+    assert stable_key(backend("mistral")) == "ollama:mistral"
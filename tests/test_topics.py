@@ -0,0 +1,46 @@
+from topics import TopicScheduler, similarity, topic_words
+
+
+def test_topic_words_drop_stopwords():
+    assert topic_words("What is the meaning of ART?") == {"meaning", "art"}
+    assert similarity(topic_words("art forgeries"), topic_words("forgeries of art")) == 1.0
+    assert similarity(set(), {"art"}) == 0.0
+
+
+def test_listener_topics_are_served_before_icebreakers():
+    topics = TopicScheduler()
+    topics.push("Should AI have rights?", "icebreaker", now=100)
+    topics.push("Coffee makes me anxious", "listener", now=101)
+    assert topics.snapshot() == ["Coffee makes me anxious", "Should AI have rights?"]
+    assert topics.pop(now=102) == "Coffee makes me anxious"
+
+
+def test_near_duplicates_merge_and_promote():
+    topics = TopicScheduler()
+    assert topics.push("art forgeries in museums", "icebreaker", now=100) == "queued"
+    assert topics.push("museums and art forgeries", "listener", now=101) == "merged"
+    assert len(topics) == 1
+    topics.push("Should AI have rights?", "listener", now=102)
+    # The merged topic now ranks with live speech and is older than the new one
+    assert topics.pop(now=103) == "art forgeries in museums"
+
+
+def test_listener_topics_expire():
+    topics = TopicScheduler(ttls={"listener": 60})
+    topics.push("heard long ago", "listener", now=100)
+    topics.push("icebreakers never expire", "icebreaker", now=100)
+    assert topics.pop(now=200) == "icebreakers never expire"
+    assert topics.pop(now=201) is None
+    assert topics.stats()["expired"] == 1
+
+
+def test_full_queue_drops_lower_priority_first():
+    topics = TopicScheduler(max_size=2)
+    topics.push("first icebreaker", "icebreaker", now=100)
+    topics.push("second icebreaker", "icebreaker", now=101)
+    assert topics.push("live remark", "listener", now=102) == "queued"
+    assert topics.snapshot() == ["live remark", "second icebreaker"]
+    topics.push("another live remark entirely", "listener", now=103)
+    assert topics.push("third icebreaker", "icebreaker", now=104) == "dropped"
+    assert topics.snapshot() == ["live remark", "another live remark entirely"]
+    assert topics.stats()["dropped"] == 3
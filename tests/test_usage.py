@@ -0,0 +1,44 @@
+import pytest
+
+from usage import BudgetExceeded, UsageMeter, estimate_tokens, is_local, price
+
+
+def test_price_uses_longest_prefix():
+    assert price("ollama:mistral") == (0.0, 0.0)
+    assert price("anthropic:claude-opus-4-5-20251101") == (5.0, 25.0)
+    assert price("anthropic:claude-opus-4-1") == (15.0, 75.0)
+    assert price("anthropic:claude-unknown") == (3.0, 15.0)
+
+
+def test_seconds_count_local_calls_only():
+    meter = UsageMeter()
+    meter.record("a", "ollama:mistral", 100, 20, 2.0)
+    meter.record("b", "anthropic:claude-haiku-4-5", 100, 20, 5.0)
+    assert meter.totals()["seconds"] == 2.0
+    assert is_local("ollama:llama3") and not is_local("anthropic:claude-haiku-4-5")
+
+
+def test_hosted_wall_time_does_not_trip_the_seconds_budget():
+    meter = UsageMeter(hard={"seconds": 10})
+    meter.record("a", "anthropic:claude-haiku-4-5", 100, 20, 30.0)
+    meter.guard()
+    meter.record("a", "ollama:mistral", 100, 20, 10.0)
+    with pytest.raises(BudgetExceeded, match="10s of 10s local compute"):
+        meter.guard()
+
+
+def test_usd_budget_and_soft_budget_fires_once():
+    meter = UsageMeter(hard={"usd": 1.0}, soft={"usd": 0.5})
+    meter.record("a", "anthropic:claude-opus-4-1", 40_000, 0, 1.0)  # $0.60
+    assert meter.check_soft() == ["usd"]
+    assert meter.check_soft() == []
+    meter.guard()
+    meter.record("a", "anthropic:claude-opus-4-1", 40_000, 0, 1.0)
+    with pytest.raises(BudgetExceeded):
+        meter.guard()
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abc") == 1
+    assert estimate_tokens("a" * 400) == 100
@@ -0,0 +1,121 @@
+import threading
+
+from duet import RoleChat, stable_key
+from resilience import LatencyTracker
+from routing import RoutedChat, Router
+from whispers import WhisperCache, WhisperPrefetcher
+
+
+def backend(model, reply=None, error=None):
+    role = RoleChat("room", "ollama", "http://localhost:1", model, None, retries=0)
+
+    def chat(system_prompt, messages):
+        if error:
+            raise error
+        return reply
+
+    role.chat = chat
+    return role
+
+
+def test_prefetched_whisper_is_ready_when_taken():
+    started, release = threading.Event(), threading.Event()
+
+    def make_whisper(topic):
+        started.set()
+        release.wait(5)
+        return f"whisper about {topic}"
+
+    prefetcher = WhisperPrefetcher(make_whisper)
+    prefetcher.submit("art")
+    assert started.wait(5)
+    release.set()
+    assert prefetcher.take("art") == "whisper about art"
+    assert prefetcher.ready_hits + prefetcher.waited == 1 and prefetcher.fallbacks == 0
+    prefetcher.shutdown()
+
+
+def test_take_uses_fallback_instead_of_waiting():
+    release = threading.Event()
+    prefetcher = WhisperPrefetcher(lambda topic: release.wait(5) and "slow")
+    prefetcher.submit("art")
+    assert prefetcher.take("art", fallback=lambda topic: f"template {topic}") == "template art"
+    assert prefetcher.templated == 1
+    release.set()
+    prefetcher.shutdown()
+
+
+def test_failed_or_unknown_topic_is_generated_inline():
+    def make_whisper(topic):
+        if topic == "bad" and not calls:
+            calls.append(topic)
+            raise RuntimeError("model down")
+        return f"whisper about {topic}"
+
+    calls = []
+    prefetcher = WhisperPrefetcher(make_whisper)
+    prefetcher.submit("bad")
+    assert prefetcher.take("bad") == "whisper about bad"
+    assert prefetcher.take("never submitted") == "whisper about never submitted"
+    assert prefetcher.fallbacks == 2
+    prefetcher.shutdown()
+
+
+def test_retain_forgets_topics_no_longer_queued():
+    prefetcher = WhisperPrefetcher(lambda topic: topic.upper())
+    prefetcher.submit("kept")
+    prefetcher.submit("expired")
+    prefetcher.retain(["kept"])
+    assert set(prefetcher._futures) == {"kept"}
+    prefetcher.shutdown()
+
+
+def test_cache_survives_reload(tmp_path):
+    path = str(tmp_path / "whispers.json")
+    WhisperCache(path, "room persona", "ollama:mistral").put("art", "What is art for?")
+    assert WhisperCache(path, "room persona", "ollama:mistral").get("art") == "What is art for?"
+
+
+def test_cache_misses_after_persona_or_model_change(tmp_path):
+    path = str(tmp_path / "whispers.json")
+    WhisperCache(path, "room persona", "ollama:mistral").put("art", "What is art for?")
+    assert WhisperCache(path, "edited persona", "ollama:mistral").get("art") is None
+    assert WhisperCache(path, "room persona", "ollama:llama3").get("art") is None
+
+
+def test_wrap_serves_fixed_topics_from_cache(tmp_path):
+    cache = WhisperCache(str(tmp_path / "whispers.json"), "room persona", "ollama:mistral")
+    calls = []
+
+    def make_whisper(topic):
+        calls.append(topic)
+        return f"whisper about {topic}"
+
+    cached = cache.wrap(make_whisper, ["art"])
+    assert cached("art") == cached("art") == "whisper about art"
+    cached("news")
+    cached("news")
+    assert calls == ["art", "news", "news"]
+
+
+def test_stable_key_ignores_last_routed_backend():
+    chat = RoutedChat("room", [backend("b", error=ConnectionError("refused")), backend("a", reply="hi")],
+                      Router(LatencyTracker()))
+    before = stable_key(chat)
+    chat.chat("system", [])
+    assert chat.key == "ollama:a"
+    assert stable_key(chat) == before == "ollama:a+ollama:b"
+    assert stable_key(backend("mistral")) == "ollama:mistral"
+
+
+def test_precompute_skips_cached_and_reports_failures(tmp_path):
+    cache = WhisperCache(str(tmp_path / "whispers.json"), "room persona", "ollama:mistral")
+    cache.put("art", "cached")
+
+    def make_whisper(topic):
+        if topic == "bad":
+            raise RuntimeError("model down")
+        return f"whisper about {topic}"
+
+    assert cache.precompute(["art", "news", "bad", "news"], make_whisper, workers=2) == (1, 1)
+    assert cache.get("news") == "whisper about news" and cache.get("bad") is None
@@ -0,0 +1,147 @@
+"""
+Topic scheduler for Duet LLM.
+
+Replaces the plain topic list fed by icebreakers and the ambient listener
+with bounded, per-source priority deques. Live speech is served ahead of
+icebreakers, stale topics expire, and near-duplicate topics are merged.
+"""
+
+import re
+import time
+from collections import deque
+
+# Lower number = served first
+SOURCE_PRIORITIES = {
+    "listener": 0,
+    "icebreaker": 1,
+}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "about", "do", "does", "i", "in", "is", "it", "of",
+    "on", "or", "should", "so", "that", "the", "this", "to", "was", "we", "what",
+    "you", "s",
+}
+
+
+def topic_words(text):
+    """Lowercased content words used for near-duplicate detection."""
+    return {w for w in re.findall(r"[a-z0-9']+", text.lower()) if w not in STOPWORDS}
+
+
+def similarity(a, b):
+    """Jaccard similarity of two word sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class TopicScheduler:
+    """
+    Bounded priority queue of conversation topics.
+
+    Usage:
+        topics = TopicScheduler(max_size=10, ttls={"listener": 180})
+        topics.push("Should AI have rights?", "icebreaker")
+        topic = topics.pop()  # Highest-priority, oldest live topic or None
+    """
+
+    def __init__(self, max_size=10, ttls=None, merge_threshold=0.6, priorities=None):
+        """
+        Args:
+            max_size: Maximum queued topics across all sources
+            ttls: Seconds a topic stays valid, per source (missing or 0 = never expires)
+            merge_threshold: Word-overlap similarity at which a new topic merges into a queued one
+            priorities: Source -> priority override (lower is served first)
+        """
+        self.max_size = max_size
+        self.ttls = ttls or {}
+        self.merge_threshold = merge_threshold
+        self.priorities = dict(SOURCE_PRIORITIES, **(priorities or {}))
+
+        # One deque per priority level; entries are [topic, source, queued_at, words, mentions]
+        self._queues = {}
+
+        self.counters = {
+            "queued": 0,
+            "merged": 0,
+            "expired": 0,
+            "dropped": 0,
+            "served": 0,
+        }
+
+    def __len__(self):
+        return sum(len(q) for q in self._queues.values())
+
+    def _priority(self, source):
+        return self.priorities.get(source, max(self.priorities.values()) + 1)
+
+    def _expired(self, entry, now):
+        ttl = self.ttls.get(entry[1], 0)
+        return ttl > 0 and now - entry[2] > ttl
+
+    def evict_expired(self, now=None):
+        """Drop every topic past its source's TTL. Returns how many were dropped."""
+        now = now or time.time()
+        dropped = 0
+        for level, q in self._queues.items():
+            kept = deque(e for e in q if not self._expired(e, now))
+            dropped += len(q) - len(kept)
+            self._queues[level] = kept
+        self.counters["expired"] += dropped
+        return dropped
+
+    def push(self, topic, source, now=None):
+        """
+        Queue a topic from a source.
+
+        Returns "queued", "merged" (folded into a near-duplicate already queued)
+        or "dropped" (queue full of equal or higher priority topics).
+        """
+        now = now or time.time()
+        self.evict_expired(now)
+        words = topic_words(topic)
+        priority = self._priority(source)
+
+        # Near-duplicate: refresh the queued entry, promoting it if this source ranks higher
+        for level, q in self._queues.items():
+            for entry in q:
+                if similarity(words, entry[3]) >= self.merge_threshold:
+                    entry[2] = now
+                    entry[4] += 1
+                    if priority < level:
+                        q.remove(entry)
+                        entry[1] = source
+                        self._queues.setdefault(priority, deque()).append(entry)
+                    self.counters["merged"] += 1
+                    return "merged"
+
+        if len(self) >= self.max_size:
+            # Make room by dropping the oldest topic of the lowest priority level
+            lowest = max((lvl for lvl, q in self._queues.items() if q), default=None)
+            if lowest is None or lowest < priority:
+                self.counters["dropped"] += 1
+                return "dropped"
+            self._queues[lowest].popleft()
+            self.counters["dropped"] += 1
+
+        self._queues.setdefault(priority, deque()).append([topic, source, now, words, 1])
+        self.counters["queued"] += 1
+        return "queued"
+
+    def pop(self, now=None):
+        """Return the next topic (highest priority, then oldest), or None."""
+        self.evict_expired(now)
+        for level in sorted(self._queues):
+            q = self._queues[level]
+            if q:
+                self.counters["served"] += 1
+                return q.popleft()[0]
+        return None
+
+    def snapshot(self):
+        """Queued topic strings in serving order."""
+        return [entry[0] for level in sorted(self._queues) for entry in self._queues[level]]
+
+    def stats(self):
+        """Counters plus the current queue length."""
+        return dict(self.counters, waiting=len(self))
@@ -0,0 +1,166 @@
+"""
+Token and cost accounting for Duet LLM.
+
+Every backend call reports its input/output token counts and duration to a
+shared UsageMeter, which keeps per-role, per-model totals, prices them from
+a table, and enforces soft (warn / downgrade) and hard (stop) budgets on
+tokens, dollars and local model compute seconds.
+"""
+
+import threading
+
+# USD per million tokens (input, output) by 'provider:model' prefix; the longest match wins.
+# Local inference is free; its budget is compute seconds.
+PRICING = {
+    "ollama": (0.0, 0.0),
+    "anthropic:claude-3-haiku": (0.25, 1.25),
+    "anthropic:claude-3-5-haiku": (0.80, 4.0),
+    "anthropic:claude-haiku-4": (1.0, 5.0),
+    "anthropic:claude-3-5-sonnet": (3.0, 15.0),
+    "anthropic:claude-3-7-sonnet": (3.0, 15.0),
+    "anthropic:claude-sonnet-4": (3.0, 15.0),
+    "anthropic:claude-opus-4": (15.0, 75.0),
+    "anthropic:claude-opus-4-5": (5.0, 25.0),
+    "anthropic": (3.0, 15.0),  # Unknown Claude model: assume Sonnet pricing
+}
+
+BUDGET_KEYS = ("usd", "tokens", "seconds")
+
+# Backends whose call time is local compute (the 'seconds' budget); hosted APIs are budgeted in dollars
+LOCAL_PROVIDERS = ("ollama",)
+
+
+class BudgetExceeded(Exception):
+    """Raised before a call once a hard budget is used up."""
+
+
+def price(key):
+    """(input, output) USD per million tokens for a 'provider:model' key."""
+    best = None
+    for prefix, rates in PRICING.items():
+        if key.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
+            best = (prefix, rates)
+    return best[1] if best else PRICING["anthropic"]
+
+
+def is_local(key):
+    """True for a 'provider:model' key that runs on local hardware."""
+    return key.partition(":")[0] in LOCAL_PROVIDERS
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token) when the provider did not report one."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def format_tokens(count):
+    return f"{count / 1000:.1f}k" if count >= 10000 else str(count)
+
+
+class UsageMeter:
+    """
+    Thread-safe running totals per (role, backend) with budget checks.
+
+    Usage:
+        meter = UsageMeter(hard={"usd": 5.0}, soft={"usd": 4.0})
+        meter.guard()                       # before a call; raises BudgetExceeded
+        meter.record("a", "anthropic:claude-haiku-4-5", 812, 34, 1.2)
+        if meter.check_soft(): ...          # once, when a soft budget is first crossed
+    """
+
+    def __init__(self, hard=None, soft=None):
+        """
+        Args:
+            hard: Budget -> limit ('usd', 'tokens', 'seconds' of local compute); reaching one stops the run
+            soft: Same keys; crossing one triggers a warning/downgrade once
+        """
+        self.hard = dict(hard or {})
+        self.soft = dict(soft or {})
+        self._lock = threading.Lock()
+        self._rows = {}  # (role, key) -> [calls, input_tokens, output_tokens, usd, seconds, estimated]
+        self._soft_fired = False
+
+    def record(self, role, key, input_tokens, output_tokens, seconds, estimated=False):
+        """Add one call's usage."""
+        rate_in, rate_out = price(key)
+        usd = (input_tokens * rate_in + output_tokens * rate_out) / 1_000_000
+        with self._lock:
+            row = self._rows.setdefault((role, key), [0, 0, 0, 0.0, 0.0, 0])
+            row[0] += 1
+            row[1] += input_tokens
+            row[2] += output_tokens
+            row[3] += usd
+            row[4] += seconds
+            row[5] += 1 if estimated else 0
+
+    def totals(self):
+        """
+        Overall {'calls', 'input_tokens', 'output_tokens', 'tokens', 'usd', 'seconds'}.
+        seconds counts local (Ollama) calls only; hosted API wall time is not compute on this machine.
+        """
+        with self._lock:
+            rows = list(self._rows.values())
+            local = [r for (_, key), r in self._rows.items() if is_local(key)]
+        totals = {
+            "calls": sum(r[0] for r in rows),
+            "input_tokens": sum(r[1] for r in rows),
+            "output_tokens": sum(r[2] for r in rows),
+            "usd": sum(r[3] for r in rows),
+            "seconds": sum(r[4] for r in local),
+        }
+        totals["tokens"] = totals["input_tokens"] + totals["output_tokens"]
+        return totals
+
+    def rows(self):
+        """Per (role, key) usage, sorted by cost then tokens."""
+        with self._lock:
+            items = [
+                {"role": role, "key": key, "calls": r[0], "input_tokens": r[1], "output_tokens": r[2],
+                 "usd": r[3], "seconds": r[4], "estimated": r[5]}
+                for (role, key), r in self._rows.items()
+            ]
+        return sorted(items, key=lambda r: (-r["usd"], -(r["input_tokens"] + r["output_tokens"])))
+
+    @staticmethod
+    def _over(limits, totals):
+        return [name for name, limit in limits.items() if limit > 0 and totals[name] >= limit]
+
+    def guard(self):
+        """Raise BudgetExceeded if a hard budget is used up (call before each request)."""
+        if not self.hard:
+            return
+        over = self._over(self.hard, self.totals())
+        if over:
+            raise BudgetExceeded(self.describe(over, self.hard))
+
+    def check_soft(self):
+        """Names of soft budgets crossed, returned only the first time any is crossed."""
+        if not self.soft or self._soft_fired:
+            return []
+        over = self._over(self.soft, self.totals())
+        if over:
+            self._soft_fired = True
+        return over
+
+    def describe(self, names, limits):
+        totals = self.totals()
+        parts = []
+        for name in names:
+            if name == "usd":
+                parts.append(f"${totals['usd']:.4f} of ${limits['usd']:.2f}")
+            elif name == "tokens":
+                parts.append(f"{totals['tokens']} of {int(limits['tokens'])} tokens")
+            else:
+                parts.append(f"{totals['seconds']:.0f}s of {limits['seconds']:.0f}s local compute")
+        return ", ".join(parts)
+
+    def summary_line(self):
+        """One-line running total for the terminal."""
+        t = self.totals()
+        line = (
+            f"{format_tokens(t['tokens'])} tokens (in {format_tokens(t['input_tokens'])} / "
+            f"out {format_tokens(t['output_tokens'])}), ${t['usd']:.4f}, {t['seconds']:.1f}s local compute"
+        )
+        if self.hard.get("usd"):
+            line += f" [{100 * t['usd'] / self.hard['usd']:.0f}% of ${self.hard['usd']:.2f}]"
+        return line
@@ -0,0 +1,204 @@
+"""
+Room whisper generation for Duet LLM.
+
+Whispers are generated on a background worker the moment a topic enters the
+queue, so the room persona's LLM call is off the A/B critical path. The main
+loop picks up the ready-made whisper at the next eligible turn.
+
+Icebreaker topics repeat every cycle, so their whispers are also precomputed
+in parallel at startup and cached on disk, keyed by the room persona, topic
+and model.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class WhisperPrefetcher:
+    """
+    Background room-whisper generator keyed by topic.
+
+    Usage:
+        prefetcher = WhisperPrefetcher(lambda topic: generate_whisper(...))
+        prefetcher.submit(topic)           # when the topic is queued
+        whisper = prefetcher.take(topic)   # when it is time to whisper
+        prefetcher.shutdown()
+    """
+
+    def __init__(self, make_whisper, max_workers=1):
+        """
+        Args:
+            make_whisper: Callable topic -> whisper text (runs on the worker)
+            max_workers: Concurrent whisper generations
+        """
+        self.make_whisper = make_whisper
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="whisper")
+        self._futures = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.ready_hits = 0  # whisper was already done when needed
+        self.waited = 0  # main loop had to wait for a running generation
+        self.fallbacks = 0  # generated synchronously (not prefetched or failed)
+        self.templated = 0  # not ready in time, caller-supplied fallback used instead
+
+    def submit(self, topic):
+        """Start generating a whisper for topic unless one is already pending."""
+        with self._lock:
+            if topic not in self._futures:
+                self._futures[topic] = self._executor.submit(self.make_whisper, topic)
+
+    def retain(self, topics):
+        """Forget prefetched whispers for topics no longer queued (expired, dropped)."""
+        keep = set(topics)
+        with self._lock:
+            for topic in list(self._futures):
+                if topic not in keep:
+                    self._futures.pop(topic).cancel()
+
+    def take(self, topic, fallback=None):
+        """
+        Return the whisper for topic, waiting if it is still being generated.
+        Falls back to a synchronous call if it was never submitted or failed.
+
+        With fallback (a callable topic -> text), a whisper that is not ready
+        yet is not waited for: fallback(topic) is returned instead.
+        """
+        with self._lock:
+            future = self._futures.pop(topic, None)
+
+        if fallback is not None and (future is None or not future.done()):
+            if future is not None:
+                future.cancel()
+            self.templated += 1
+            return fallback(topic)
+
+        if future is not None:
+            if future.done():
+                self.ready_hits += 1
+            else:
+                self.waited += 1
+            try:
+                return future.result()
+            except Exception as e:
+                print(f"[Whisper] Background generation failed ({type(e).__name__}), retrying inline")
+
+        self.fallbacks += 1
+        return self.make_whisper(topic)
+
+    def shutdown(self):
+        """Cancel pending work and stop the worker (does not wait for a running call)."""
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class WhisperCache:
+    """
+    On-disk whisper cache for fixed topics (icebreakers).
+
+    Entries are keyed by a hash of the room persona text, the topic and the
+    model, so editing personas/room.md or switching models invalidates them.
+    """
+
+    def __init__(self, path, persona_text, model):
+        """
+        Args:
+            path: JSON file location
+            persona_text: Full text of the room persona file
+            model: Backend key of the room role (e.g. 'ollama:mistral'; routed: 'ollama:a+ollama:b')
+        """
+        self.path = path
+        self.model = model
+        self.set_persona(persona_text)
+        self._fixed = set()
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                print(f"[Whisper] Ignoring unreadable whisper cache: {path}")
+
+    def set_persona(self, persona_text):
+        """Re-key lookups after the room persona changed (old entries simply stop matching)."""
+        self.persona_hash = hashlib.sha256(persona_text.encode("utf-8")).hexdigest()
+
+    def set_topics(self, topics):
+        """Replace the set of fixed topics served by wrap()."""
+        self._fixed = set(topics)
+
+    def key(self, topic):
+        raw = f"{self.persona_hash}\n{self.model}\n{topic}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, topic):
+        """Cached whisper for topic, or None."""
+        with self._lock:
+            entry = self._entries.get(self.key(topic))
+        return entry["whisper"] if entry else None
+
+    def put(self, topic, whisper):
+        """Store a whisper and write the cache file."""
+        with self._lock:
+            self._entries[self.key(topic)] = {"topic": topic, "model": self.model, "whisper": whisper}
+            self._save()
+
+    def _save(self):
+        """Write atomically so a crash never leaves a half-written file. Caller holds the lock."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def precompute(self, topics, make_whisper, workers=4):
+        """
+        Generate whispers for every uncached topic in parallel.
+
+        Returns (generated, already_cached). Failures are reported and skipped;
+        those topics are generated on demand later.
+        """
+        missing = [t for t in dict.fromkeys(topics) if self.get(t) is None]
+        cached = len(set(topics)) - len(missing)
+        if not missing:
+            return 0, cached
+
+        generated = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="whisper-precompute") as pool:
+            futures = {pool.submit(make_whisper, topic): topic for topic in missing}
+            for future in as_completed(futures):
+                topic = futures[future]
+                try:
+                    self.put(topic, future.result())
+                    generated += 1
+                except Exception as e:
+                    print(f"[Whisper] Precompute failed for '{topic}' ({type(e).__name__})")
+        return generated, cached
+
+    def wrap(self, make_whisper, topics):
+        """
+        Return a make_whisper that serves the fixed topics from the cache
+        (filling it on a miss) and passes any other topic straight through.
+        The fixed set can be replaced later with set_topics().
+        """
+        self.set_topics(topics)
+
+        def cached_make_whisper(topic):
+            if topic not in self._fixed:
+                return make_whisper(topic)
+            whisper = self.get(topic)
+            if whisper is None:
+                whisper = make_whisper(topic)
+                self.put(topic, whisper)
+            return whisper
+
+        return cached_make_whisper